@@ -8,6 +8,7 @@ from fastapi import HTTPException
 
 # Import the central LLM Service and the request schema
 from app.services.llm_service import LLMService
+from app.services.llm_scheduler import BULK, INTERACTIVE
 from .schema import CriteriaRequest
 
 logger = logging.getLogger("criteria_agent")
@@ -53,10 +54,11 @@ Job Description:
 {jd_text}
 """
 
-async def _generate_for_single_target(platform_name: str, jd_text: str, llm_service: LLMService) -> dict:
+async def _generate_for_single_target(platform_name: str, jd_text: str, llm_service: LLMService,
+                                     priority: str = INTERACTIVE) -> dict:
     """Async helper to generate criteria for one platform."""
     prompt = _build_prompt(platform_name, jd_text)
-    raw_response = await llm_service.generate_text(prompt)
+    raw_response = await llm_service.generate_text(prompt, priority=priority, agent="criteria_agent")
     try:
         # Reliable logic to clean up markdown fences from the LLM response
         cleaned_response = raw_response.strip()
@@ -76,9 +78,11 @@ async def generate_criteria(payload: CriteriaRequest, llm_service: LLMService) -
     Processes multiple targets concurrently if 'target' is 'all'.
     """
     targets = list(CRITERIA_FILE_MAP.keys()) if payload.target == "all" else [payload.target]
+    # The fan-out over every platform is bulk work: single-platform and other interactive calls go first
+    priority = BULK if payload.target == "all" else INTERACTIVE
 
     # Create a list of async tasks to run in parallel
-    tasks = [_generate_for_single_target(target, payload.jd_text, llm_service) for target in targets]
+    tasks = [_generate_for_single_target(target, payload.jd_text, llm_service, priority) for target in targets]
     
     # Run all tasks concurrently and wait for them to complete
     results = await asyncio.gather(*tasks)
@@ -1,12 +1,13 @@
 from fastapi import APIRouter, Depends, HTTPException
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, StreamingResponse
 from typing import Dict, Any
 from .schema import JDInput
-from .service import generate_job_description
+from .service import generate_job_description, stream_job_description
 
 # Import the service and dependency getter
 from app.services.llm_service import LLMService
 from app.core.dependencies import get_llm_service
+from app.utils.sse import SSE_HEADERS, sse_event
 
 # Create a router for this agent with a prefix
 router = APIRouter(tags=["Job Description Agent"])
@@ -14,6 +15,7 @@ router = APIRouter(tags=["Job Description Agent"])
 @router.post("/generate", summary="Generate a Job Description")
 async def generate_jd(
     payload: JDInput,
+    stream: bool = False,
     llm_service: LLMService = Depends(get_llm_service)
 ):
     """
@@ -23,7 +25,35 @@ async def generate_jd(
     This endpoint is asynchronous and uses dependency injection for the LLM service.
     
     Returns a structure compatible with Talent Matcher Agent.
+
+    With `?stream=true` the response is a text/event-stream of Server-Sent
+    Events instead: a `field` event ({"name", "value"}) as soon as each JD
+    field is generated, then a `done` event carrying the same body as the
+    non-streaming response, or an `error` event ({"status": false, "detail"})
+    if generation fails after the stream has started.
     """
+    if stream:
+        try:
+            events = await stream_job_description(payload, llm_service)
+        except HTTPException as e:
+            return JSONResponse(
+                status_code=e.status_code,
+                content={"status": False, "detail": e.detail}
+            )
+
+        async def sse_events():
+            try:
+                async for event, data in events:
+                    if event == "done":
+                        data = {"status": True, "job_role": payload.job_role, **data}
+                    yield sse_event(event, data)
+            except HTTPException as e:
+                yield sse_event("error", {"status": False, "detail": e.detail})
+            except Exception:
+                yield sse_event("error", {"status": False, "detail": "An internal server error occurred."})
+
+        return StreamingResponse(sse_events(), media_type="text/event-stream", headers=SSE_HEADERS)
+
     try:
         jd_json = await generate_job_description(payload, llm_service)
         
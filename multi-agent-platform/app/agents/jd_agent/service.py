@@ -1,12 +1,13 @@
 import os
 import logging
 import json
-from typing import Dict, Any
+from typing import Dict, Any, AsyncIterator, Tuple
 from fastapi import HTTPException
 
 # The service no longer needs to import the llm_service directly.
 # It will be passed in as an argument by the router.
 from app.services.llm_service import LLMService
+from app.utils.json_stream import JSONFieldStream
 
 # Import the schema and role map as before
 from .schema import JDInput, ROLE_FILE_MAP
@@ -59,15 +60,12 @@ def _parse_llm_output_to_json(llm_output: str) -> Dict[str, Any]:
         )
 
 
-async def generate_job_description(payload: JDInput, llm_service: LLMService) -> Dict[str, Any]:
-    """
-    Asynchronously generates a job description and returns it as a JSON object.
-    """
-    try:
-        template = _load_jd_template(payload.job_role)
-        user_input_snippet = payload.as_prompt_snippet()
+def _build_prompt(payload: JDInput) -> str:
+    """Builds the JD generation prompt from the role's template and the user's input."""
+    template = _load_jd_template(payload.job_role)
+    user_input_snippet = payload.as_prompt_snippet()
 
-        prompt = f"""
+    return f"""
 You are a professional HR assistant. Your task is to generate a detailed and structured Job Description.
 Use the provided template and fill in the details based on the user's input.
 
@@ -99,8 +97,17 @@ FOLLOW THIS RESPONSE JSON STRUCTURE ALWAYS. OUTPUT ONLY THE JSON OBJECT.
   "benefits": "string"
 }}
 """
+
+
+async def generate_job_description(payload: JDInput, llm_service: LLMService) -> Dict[str, Any]:
+    """
+    Asynchronously generates a job description and returns it as a JSON object.
+    """
+    try:
+        prompt = _build_prompt(payload)
+
         # We 'await' the result from the now-async llm_service method
-        generated_text = await llm_service.generate_text(prompt)
+        generated_text = await llm_service.generate_text(prompt, agent="jd_agent")
         
         # Parse the generated text to ensure it's valid JSON
         parsed_json = _parse_llm_output_to_json(generated_text)
@@ -112,4 +119,39 @@ FOLLOW THIS RESPONSE JSON STRUCTURE ALWAYS. OUTPUT ONLY THE JSON OBJECT.
         raise e
     except Exception as e:
         logger.error(f"An unexpected error occurred in the JD agent: {e}")
-        raise HTTPException(status_code=500, detail="An internal error occurred in the JD agent.")
\ No newline at end of file
+        raise HTTPException(status_code=500, detail="An internal error occurred in the JD agent.")
+
+
+async def stream_job_description(payload: JDInput, llm_service: LLMService) -> AsyncIterator[Tuple[str, Any]]:
+    """
+    Streaming version of `generate_job_description`. Waits for the model's
+    first chunk (errors before it raise HTTPException here) and returns an
+    async iterator of (event, data) pairs:
+
+    - ("field", {"name": ..., "value": ...}) as each JD field is completed
+    - ("done", {"job_description": {...}}) with the whole JD at the end
+    """
+    chunks = await llm_service.stream_text(_build_prompt(payload), agent="jd_agent")
+    return _jd_events(chunks)
+
+
+async def _jd_events(chunks: AsyncIterator[str]) -> AsyncIterator[Tuple[str, Any]]:
+    parser = JSONFieldStream()
+    parts = []
+    failed = False
+    async for chunk in chunks:
+        parts.append(chunk)
+        if failed:
+            continue
+        try:
+            fields = parser.feed(chunk)
+        except ValueError:
+            # Not JSON the parser can follow: the full output is parsed (or rejected) at the end
+            failed = True
+            continue
+        for name, value in fields:
+            yield "field", {"name": name, "value": value}
+    # Only a complete object is sent as is; anything else (including output cut off
+    # mid-object) goes through the non-streaming parser, which raises on invalid JSON
+    jd_json = parser.fields if parser.done and not failed else _parse_llm_output_to_json("".join(parts))
+    yield "done", {"job_description": jd_json}
@@ -1,15 +1,52 @@
 from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import StreamingResponse
 from .schemas import JobPostRequest
 from .service import JobPostAgentService
 from app.core.dependencies import get_llm_service
+from app.utils.sse import SSE_HEADERS, sse_event
 
 router = APIRouter(prefix="/job-post-agent", tags=["Job Post Agent"])
 
 @router.post("/generate")
 async def generate_job_post(
     request: JobPostRequest,
+    stream: bool = False,
     llm_service = Depends(get_llm_service)
 ):
+    """
+    With `?stream=true` the post is sent as Server-Sent Events while it is
+    generated: `chunk` events ({"text"}), then a `done` event with the same
+    body as the non-streaming response, or an `error` event if generation
+    fails after the stream has started.
+    """
+    if stream:
+        try:
+            chunks = await JobPostAgentService(llm_service).stream_post(
+                platform=request.platform,
+                job_description=request.job_description
+            )
+        except Exception as e:
+            raise HTTPException(
+                status_code=500,
+                detail={"status": False, "error": str(e)}
+            )
+
+        async def sse_events():
+            parts = []
+            try:
+                async for text in chunks:
+                    parts.append(text)
+                    yield sse_event("chunk", {"text": text})
+                yield sse_event("done", {
+                    "status": True,
+                    "platform": request.platform,
+                    "generated_post": "".join(parts).strip()
+                })
+            except Exception as e:
+                yield sse_event("error", {"status": False, "error": str(e)})
+
+        return StreamingResponse(sse_events(), media_type="text/event-stream", headers=SSE_HEADERS)
+
     try:
         service = JobPostAgentService(llm_service)
         result = await service.generate_post(
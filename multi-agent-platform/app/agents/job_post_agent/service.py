@@ -22,17 +22,28 @@ class JobPostAgentService:
             """
         }
 
-    async def generate_post(self, platform: str, job_description: str) -> dict:
+    def _build_prompt(self, platform: str, job_description: str) -> str:
         template = self.prompt_templates.get(platform)
         if not template:
             raise ValueError("Invalid platform specified.")
 
-        prompt = template.format(job_description=job_description)
+        return template.format(job_description=job_description)
+
+    async def generate_post(self, platform: str, job_description: str) -> dict:
+        prompt = self._build_prompt(platform, job_description)
         
         # --- CRITICAL CHANGE ---
         # Call the correct method from your LLMService ('generate_text')
         # and pass only the prompt.
-        response_text = await self.llm_service.generate_text(prompt=prompt)
+        response_text = await self.llm_service.generate_text(prompt=prompt, agent="job_post_agent")
         # --------------------
         
-        return {"result": response_text}
\ No newline at end of file
+        return {"result": response_text}
+
+    async def stream_post(self, platform: str, job_description: str):
+        """
+        Streaming version of `generate_post`: waits for the first chunk of the
+        post and returns an async iterator over it and the chunks that follow.
+        """
+        prompt = self._build_prompt(platform, job_description)
+        return await self.llm_service.stream_text(prompt, agent="job_post_agent")
@@ -35,7 +35,7 @@ class QuestionGenerationService:
         """
         
         # Pass the prompt and the file object to the LLM service
-        response_text = await self.llm_service.generate_text(prompt, files=[resume_file])
+        response_text = await self.llm_service.generate_text(prompt, files=[resume_file], agent="question_generator")
         
         cleaned_response = response_text.strip().replace("```json", "").replace("```", "").strip()
         try:
@@ -0,0 +1,105 @@
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Callable, Dict, List, Sequence
+
+import numpy as np
+
+logger = logging.getLogger("talent_matcher")
+
+
+class EncodeBatcher:
+    """
+    Coalesces encode calls from concurrent match requests into one model call.
+
+    Callers block in `encode` while a background thread gathers pending texts
+    until `max_batch_size` texts are waiting or `max_wait_ms` has passed since
+    the first one arrived, runs a single batched `encode_fn`, and hands each
+    caller back its own rows. On CPU a batch of 32 sentences costs little more
+    than a batch of one, so this raises throughput under concurrent load.
+
+    Calls with at least `max_batch_size` texts (e.g. a large /match-jobs batch)
+    are already batched and bypass the queue; `max_batch_size <= 1` disables
+    batching altogether.
+    """
+
+    def __init__(self, encode_fn: Callable[[List[str]], np.ndarray],
+                 max_batch_size: int = 32, max_wait_ms: float = 5.0):
+        self.encode_fn = encode_fn
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self.batches = 0
+        self.batched_texts = 0
+        self.largest_batch = 0
+        self._queue: "queue.Queue[tuple]" = queue.Queue()
+        self._worker = None
+        self._start_lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_batch_size > 1
+
+    def encode(self, texts: Sequence[str]) -> np.ndarray:
+        """Encodes `texts`, sharing a model call with other concurrent callers when possible."""
+        texts = list(texts)
+        if not self.enabled or len(texts) >= self.max_batch_size:
+            return self.encode_fn(texts)
+        self._ensure_worker()
+        future = Future()
+        self._queue.put((texts, future))
+        return future.result()
+
+    def _ensure_worker(self) -> None:
+        if self._worker is None:
+            with self._start_lock:
+                if self._worker is None:
+                    self._worker = threading.Thread(target=self._run, name="talent-matcher-encoder", daemon=True)
+                    self._worker.start()
+
+    def _run(self) -> None:
+        while True:
+            # STEP 1: Wait for the first request, then gather more until the batch is full or the wait is over
+            pending = [self._queue.get()]
+            size = len(pending[0][0])
+            deadline = time.monotonic() + self.max_wait
+            while size < self.max_batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                pending.append(item)
+                size += len(item[0])
+
+            # STEP 2: One model call for everything gathered, then split the rows back per caller
+            texts = [text for item_texts, _ in pending for text in item_texts]
+            try:
+                vectors = np.asarray(self.encode_fn(texts))
+            except Exception as e:
+                logger.error(f"Batched encode of {len(texts)} texts failed: {e}")
+                for _, future in pending:
+                    future.set_exception(e)
+                continue
+
+            self.batches += 1
+            self.batched_texts += len(texts)
+            self.largest_batch = max(self.largest_batch, len(texts))
+            start = 0
+            for item_texts, future in pending:
+                future.set_result(vectors[start:start + len(item_texts)])
+                start += len(item_texts)
+
+    def stats(self) -> Dict[str, float]:
+        return {
+            "enabled": self.enabled,
+            "max_batch_size": self.max_batch_size,
+            "max_wait_ms": self.max_wait * 1000,
+            "batches": self.batches,
+            "texts": self.batched_texts,
+            "mean_batch_size": self.batched_texts / self.batches if self.batches else 0.0,
+            "largest_batch": self.largest_batch,
+        }
@@ -0,0 +1,329 @@
+"""
+Offline benchmarks for the talent matcher.
+
+Uses synthetic, clustered embeddings so it runs without the sentence-transformer
+model or the employee data file:
+
+    python -m app.agents.talent_matcher.benchmark index --rows 200000
+
+The `backend` and `rerank` benchmarks are the exception: they load the real
+models and use profiles from the employee data file. The `shards` benchmark
+starts one worker process per shard, so run it on a machine with that many cores.
+The `extract` benchmark generates job descriptions from the skill taxonomy file.
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from app.agents.talent_matcher.index import ExactIndex, IVFIndex, normalize_rows, top_k
+from app.agents.talent_matcher.quantization import PRECISIONS, EmbeddingMatrix
+
+
+def synthetic_embeddings(rows: int, dim: int = 384, clusters: int = 256, seed: int = 0) -> np.ndarray:
+    """Generates normalised embeddings grouped around random cluster centres, like real profiles."""
+    rng = np.random.default_rng(seed)
+    centres = rng.standard_normal((clusters, dim)).astype(np.float32)
+    labels = rng.integers(0, clusters, rows)
+    noise = rng.standard_normal((rows, dim)).astype(np.float32) * 0.6
+    return normalize_rows(centres[labels] + noise)
+
+
+def _percentile_ms(samples, q) -> float:
+    return float(np.percentile(samples, q) * 1000)
+
+
+def _timed_search(index, queries, k, mask):
+    latencies, results = [], []
+    for query in queries:
+        start = time.perf_counter()
+        rows, _ = index.search(query, k, mask=mask)
+        latencies.append(time.perf_counter() - start)
+        results.append(rows)
+    return latencies, results
+
+
+def bench_index(args) -> None:
+    """Recall@k and latency of the IVF index against the exact index, with and without a filter."""
+    embeddings = synthetic_embeddings(args.rows, args.dim)
+    queries = synthetic_embeddings(args.queries, args.dim, seed=1)
+    rng = np.random.default_rng(2)
+    masks = {"none": None, f"{args.selectivity:.0%} pass": rng.random(args.rows) < args.selectivity}
+
+    exact = ExactIndex()
+    exact.build(embeddings)
+
+    start = time.perf_counter()
+    ivf = IVFIndex(nlist=args.nlist)
+    ivf.build(embeddings)
+    print(f"rows={args.rows} dim={args.dim} k={args.k} ivf_build={time.perf_counter() - start:.2f}s")
+    print(f"{'filter':<12} {'index':<14} {'recall':>8} {'p50 ms':>8} {'p99 ms':>8}")
+
+    for label, mask in masks.items():
+        exact_lat, truth = _timed_search(exact, queries, args.k, mask)
+        print(f"{label:<12} {'exact':<14} {1.0:>8.3f} {_percentile_ms(exact_lat, 50):>8.2f} {_percentile_ms(exact_lat, 99):>8.2f}")
+        for nprobe in args.nprobe:
+            ivf.nprobe = nprobe
+            lat, found = _timed_search(ivf, queries, args.k, mask)
+            recall = np.mean([len(np.intersect1d(t, f)) / max(1, len(t)) for t, f in zip(truth, found)])
+            print(f"{label:<12} {f'ivf nprobe={nprobe}':<14} {recall:>8.3f} {_percentile_ms(lat, 50):>8.2f} {_percentile_ms(lat, 99):>8.2f}")
+
+
+def bench_precision(args) -> None:
+    """Memory saved and ranking drift of float16 / int8 storage against float32, with and without re-scoring."""
+    embeddings = synthetic_embeddings(args.rows, args.dim)
+    queries = synthetic_embeddings(args.queries, args.dim, seed=1)
+    exact = EmbeddingMatrix.from_float32(embeddings)
+    truth = [top_k(exact.dot(query), args.k) for query in queries]
+
+    print(f"rows={args.rows} dim={args.dim} k={args.k} rescore_factor={args.rescore_factor}")
+    print(f"{'precision':<10} {'MiB':>8} {'saved':>7} {'overlap@k':>10} {'+rescore':>9} {'max |dscore|':>13} {'p50 ms':>8}")
+    for precision in PRECISIONS:
+        matrix = EmbeddingMatrix.from_float32(embeddings, precision, keep_full=True)
+        overlap, rescored, drift, latencies = [], [], [], []
+        for query, expected in zip(queries, truth):
+            start = time.perf_counter()
+            scores = matrix.dot(query)
+            latencies.append(time.perf_counter() - start)
+            found = top_k(scores, args.k)
+            overlap.append(len(np.intersect1d(found, expected)) / args.k)
+            drift.append(float(np.abs(scores - exact.dot(query)).max()))
+
+            candidates = top_k(scores, args.k * args.rescore_factor)
+            best = candidates[top_k(matrix.rescore(query, candidates), args.k)]
+            rescored.append(len(np.intersect1d(best, expected)) / args.k)
+
+        saved = 1 - matrix.nbytes / exact.nbytes
+        print(f"{precision:<10} {matrix.nbytes / 2**20:>8.1f} {saved:>7.0%} {np.mean(overlap):>10.3f} "
+              f"{np.mean(rescored):>9.3f} {np.max(drift):>13.5f} {_percentile_ms(latencies, 50):>8.2f}")
+
+
+def bench_backend(args) -> None:
+    """Load time, encode latency / throughput and score drift of the ONNX backends against PyTorch."""
+    from app.agents.talent_matcher.embedding import load_embedding_model, max_score_drift
+    from app.agents.talent_matcher.loader import build_profile_text, load_employees
+
+    texts = [build_profile_text(emp) for emp in load_employees(args.data)] or ["python developer"]
+    texts = (texts * (args.texts // len(texts) + 1))[:args.texts]
+    backends = [("torch", ""), ("onnx", "")] + [("onnx", quantization) for quantization in args.quantization]
+    reference = None
+
+    print(f"model={args.model} texts={len(texts)} threads={args.threads or 'default'}")
+    print(f"{'backend':<22} {'load s':>7} {'1 text ms':>10} {'batch texts/s':>14} {'max |dscore|':>13}")
+    for backend, quantization in backends:
+        start = time.perf_counter()
+        # Tolerance 1.0: always benchmark the export, whatever its drift
+        model, model_id = load_embedding_model(
+            args.model, backend, args.onnx_dir, quantization, args.threads, 0, tolerance=1.0, sample_texts=texts
+        )
+        load_seconds = time.perf_counter() - start
+        reference = reference or model
+
+        model.encode(texts[:args.batch_size], show_progress_bar=False)  # warm-up
+        single = []
+        for text in texts[:50]:
+            start = time.perf_counter()
+            model.encode([text], show_progress_bar=False)
+            single.append(time.perf_counter() - start)
+        start = time.perf_counter()
+        model.encode(texts, batch_size=args.batch_size, show_progress_bar=False)
+        throughput = len(texts) / (time.perf_counter() - start)
+        drift = max_score_drift(model, reference, texts[:256])
+        print(f"{model_id:<22.22} {load_seconds:>7.2f} {_percentile_ms(single, 50):>10.2f} {throughput:>14.0f} {drift:>13.5f}")
+
+
+def bench_rerank(args) -> None:
+    """Latency added by cross-encoder re-ranking of the top N candidates, cold and with cached pair scores."""
+    from app.agents.talent_matcher.cache import jd_hash
+    from app.agents.talent_matcher.loader import build_profile_text, load_employees
+    from app.agents.talent_matcher.rerank import CrossEncoderReranker
+
+    profiles = [build_profile_text(emp) for emp in load_employees(args.data)] or ["python developer"]
+    jds = [f"{args.jd} ({i})" for i in range(args.queries)]
+    print(f"model={args.model} queries={len(jds)} batch_size={args.batch_size}")
+    print(f"{'N':>5} {'cold p50 ms':>12} {'cold p95 ms':>12} {'cached p50 ms':>14}")
+    for n in args.n:
+        reranker = CrossEncoderReranker(args.model, cache_size=n * len(jds))
+        reranker.score(args.jd, "warm-up", profiles[:args.batch_size], args.batch_size)
+        candidates = (profiles * (n // len(profiles) + 1))[:n]
+        cold, cached = [], []
+        for jd in jds:
+            for samples in (cold, cached):
+                start = time.perf_counter()
+                reranker.score(jd, jd_hash(jd), candidates, args.batch_size)
+                samples.append(time.perf_counter() - start)
+        print(f"{n:>5} {_percentile_ms(cold, 50):>12.1f} {_percentile_ms(cold, 95):>12.1f} {_percentile_ms(cached, 50):>14.2f}")
+
+
+def bench_shards(args) -> None:
+    """Latency and throughput of scatter-gather search as the directory is split over 1..N shard processes."""
+    from concurrent.futures import ThreadPoolExecutor
+
+    from app.agents.talent_matcher.schemas import CandidateFilters
+    from app.agents.talent_matcher.shards import ShardPool
+
+    embeddings = synthetic_embeddings(args.rows, args.dim)
+    queries = synthetic_embeddings(args.queries, args.dim, seed=1)
+    rng = np.random.default_rng(2)
+    employees = [
+        {"Employee_ID": str(i + 1), "title": "Engineer", "skills": [], "Key_Credentials": "Bachelor of Science",
+         "experience_years": int(years)}
+        for i, years in enumerate(rng.integers(0, 15, args.rows))
+    ]
+    filters = CandidateFilters(min_degree="Bachelor", min_experience=2)
+
+    print(f"rows={args.rows} dim={args.dim} k={args.k} queries={args.queries} clients={args.clients} batch={args.batch}")
+    print(f"{'shards':>6} {'build s':>8} {'p50 ms':>8} {'p95 ms':>8} {'queries/s':>10} {'speed-up':>9}")
+    baseline = None
+    for shards in args.shards:
+        start = time.perf_counter()
+        pool = ShardPool(employees, embeddings, shards)
+        build_seconds = time.perf_counter() - start
+        try:
+            pool.search(queries[:1], [filters], args.k)  # warm-up
+            latencies = []
+            for query in queries:
+                start = time.perf_counter()
+                pool.search(query[None, :], [filters], args.k)
+                latencies.append(time.perf_counter() - start)
+
+            # Throughput: concurrent clients each sending batches of `batch` JDs
+            batches = [queries[i:i + args.batch] for i in range(0, len(queries), args.batch)]
+            start = time.perf_counter()
+            with ThreadPoolExecutor(args.clients) as clients:
+                list(clients.map(lambda batch: pool.search(batch, [filters] * len(batch), args.k), batches))
+            throughput = len(queries) / (time.perf_counter() - start)
+        finally:
+            pool.shutdown()
+        baseline = baseline or throughput
+        print(f"{shards:>6} {build_seconds:>8.2f} {_percentile_ms(latencies, 50):>8.2f} {_percentile_ms(latencies, 95):>8.2f} "
+              f"{throughput:>10.0f} {throughput / baseline:>8.2f}x")
+
+
+def synthetic_jds(count: int, taxonomy: dict, seed: int = 0) -> list:
+    """JD Agent style job descriptions built from random taxonomy terms and filler text."""
+    from app.agents.talent_matcher.schemas import JobDescriptionDetail
+
+    rng = np.random.default_rng(seed)
+    skill_terms = [term for canonical, synonyms in taxonomy.get("skills", {}).items() for term in [canonical, *synonyms]]
+    degree_terms = [term for canonical, synonyms in taxonomy.get("degrees", {}).items() for term in [canonical, *synonyms]]
+    filler = ("We are looking for a motivated engineer to join a fast-growing team building products "
+              "used by millions of customers. You will collaborate across functions and own delivery. ")
+    jds = []
+    for _ in range(count):
+        skills = rng.choice(skill_terms, size=min(8, len(skill_terms)), replace=False) if skill_terms else []
+        degree = rng.choice(degree_terms) if degree_terms else "Bachelor"
+        low = int(rng.integers(1, 8))
+        jds.append(JobDescriptionDetail(
+            required_skills=", ".join(skills),
+            preferred_skills="Communication, teamwork",
+            minimum_qualification=f"{degree} degree in Computer Science or a related field",
+            languages="English",
+            overview=filler * 3 + f"The role needs {low}-{low + 3} years of experience.",
+            key_responsibilities=filler,
+            key_skills_and_qualifications=filler + f"At least {low}+ years with {skills[0] if len(skills) else 'Python'}.",
+            desired_attributes="Curiosity",
+            benefits="Health insurance",
+        ))
+    return jds
+
+
+def bench_extract(args) -> None:
+    """Throughput of the taxonomy extractor on a large batch of JDs, against one regex per taxonomy term."""
+    import json
+    import re
+
+    from app.agents.talent_matcher.extractor import _JD_FIELDS, SkillExtractor, normalize_text
+
+    with open(args.taxonomy, "r", encoding="utf-8") as f:
+        taxonomy = json.load(f)
+    start = time.perf_counter()
+    extractor = SkillExtractor.from_file(args.taxonomy)
+    build_seconds = time.perf_counter() - start
+    jds = synthetic_jds(args.jds, taxonomy)
+    megabytes = sum(len(getattr(jd, field)) for jd in jds for field in _JD_FIELDS) / 2**20
+    print(f"jds={len(jds)} text={megabytes:.1f} MiB automaton_states={extractor.automaton.states} build={build_seconds * 1000:.0f} ms")
+    print(f"{'extractor':<22} {'JDs/s':>10} {'MiB/s':>8} {'p50 us':>8} {'p99 us':>8}")
+
+    terms = [(canonical, re.compile(r"(?<!\w)" + re.escape(normalize_text(term)) + r"(?!\w)"))
+             for canonical, synonyms in taxonomy.get("skills", {}).items() for term in [canonical, *synonyms]]
+
+    def per_term_regex(jd):
+        text = normalize_text(jd.required_skills)
+        return list(dict.fromkeys(canonical for canonical, pattern in terms if pattern.search(text)))
+
+    for label, extract in (("aho-corasick", extractor.extract_jd), ("regex per term, skills", per_term_regex)):
+        latencies = []
+        start = time.perf_counter()
+        for jd in jds:
+            began = time.perf_counter()
+            extract(jd)
+            latencies.append(time.perf_counter() - began)
+        seconds = time.perf_counter() - start
+        print(f"{label:<22} {len(jds) / seconds:>10.0f} {megabytes / seconds:>8.2f} "
+              f"{_percentile_ms(latencies, 50) * 1000:>8.0f} {_percentile_ms(latencies, 99) * 1000:>8.0f}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Talent matcher benchmarks")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    index_parser = sub.add_parser("index", help="ANN recall vs latency against exact search")
+    index_parser.add_argument("--rows", type=int, default=100_000)
+    index_parser.add_argument("--dim", type=int, default=384)
+    index_parser.add_argument("--queries", type=int, default=200)
+    index_parser.add_argument("--k", type=int, default=10)
+    index_parser.add_argument("--nlist", type=int, default=0)
+    index_parser.add_argument("--nprobe", type=int, nargs="+", default=[1, 4, 8, 16, 32])
+    index_parser.add_argument("--selectivity", type=float, default=0.2)
+    index_parser.set_defaults(func=bench_index)
+
+    precision_parser = sub.add_parser("precision", help="Memory and ranking drift of float16/int8 storage")
+    precision_parser.add_argument("--rows", type=int, default=100_000)
+    precision_parser.add_argument("--dim", type=int, default=384)
+    precision_parser.add_argument("--queries", type=int, default=100)
+    precision_parser.add_argument("--k", type=int, default=10)
+    precision_parser.add_argument("--rescore-factor", type=int, default=4)
+    precision_parser.set_defaults(func=bench_precision)
+
+    backend_parser = sub.add_parser("backend", help="PyTorch vs ONNX / int8 ONNX embedding backends")
+    backend_parser.add_argument("--model", default="all-MiniLM-L6-v2")
+    backend_parser.add_argument("--data", default="data/employees.jsonl")
+    backend_parser.add_argument("--onnx-dir", default="data/models/talent_matcher")
+    backend_parser.add_argument("--quantization", nargs="*", default=["avx2"])
+    backend_parser.add_argument("--threads", type=int, default=0)
+    backend_parser.add_argument("--texts", type=int, default=1000)
+    backend_parser.add_argument("--batch-size", type=int, default=32)
+    backend_parser.set_defaults(func=bench_backend)
+
+    rerank_parser = sub.add_parser("rerank", help="Cross-encoder re-ranking latency at different N")
+    rerank_parser.add_argument("--model", default="cross-encoder/ms-marco-MiniLM-L-6-v2")
+    rerank_parser.add_argument("--data", default="data/employees.jsonl")
+    rerank_parser.add_argument("--jd", default="Data analyst with Python, SQL and Tableau experience")
+    rerank_parser.add_argument("--n", type=int, nargs="+", default=[10, 20, 50, 100, 200])
+    rerank_parser.add_argument("--queries", type=int, default=20)
+    rerank_parser.add_argument("--batch-size", type=int, default=32)
+    rerank_parser.set_defaults(func=bench_rerank)
+
+    shards_parser = sub.add_parser("shards", help="Scatter-gather latency / throughput scaling over shard processes")
+    shards_parser.add_argument("--rows", type=int, default=1_000_000)
+    shards_parser.add_argument("--dim", type=int, default=384)
+    shards_parser.add_argument("--queries", type=int, default=200)
+    shards_parser.add_argument("--k", type=int, default=10)
+    shards_parser.add_argument("--shards", type=int, nargs="+", default=[1, 2, 4, 8])
+    shards_parser.add_argument("--clients", type=int, default=4)
+    shards_parser.add_argument("--batch", type=int, default=8)
+    shards_parser.set_defaults(func=bench_shards)
+
+    extract_parser = sub.add_parser("extract", help="Skill / degree / experience extraction throughput over many JDs")
+    extract_parser.add_argument("--taxonomy", default="data/skill_taxonomy.json")
+    extract_parser.add_argument("--jds", type=int, default=20_000)
+    extract_parser.set_defaults(func=bench_extract)
+
+    args = parser.parse_args()
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
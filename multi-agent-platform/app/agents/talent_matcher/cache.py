@@ -0,0 +1,13 @@
+import hashlib
+
+# The LRU cache is shared with the LLM service; re-exported for the talent matcher modules
+from app.utils.cache import LRUCache  # noqa: F401
+
+
+def jd_hash(jd_text: str) -> str:
+    """
+    Hash of a job description's normalized text (lower-cased, whitespace collapsed),
+    so JDs that differ only in formatting share cache entries.
+    """
+    normalized = " ".join(jd_text.lower().split())
+    return hashlib.blake2b(normalized.encode("utf-8"), digest_size=16).hexdigest()
@@ -0,0 +1,208 @@
+import re
+from enum import IntEnum
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+
+from app.agents.talent_matcher.loader import build_profile_text, keyword_tokens
+from app.agents.talent_matcher.sparse import BM25Index
+
+
+class DegreeLevel(IntEnum):
+    """Ordered degree levels, so "at or above" filters are a single integer comparison."""
+    NONE = 0
+    ASSOCIATE = 1
+    BACHELOR = 2
+    MASTER = 3
+    DOCTORATE = 4
+
+
+# Checked in order; the first pattern that matches decides the level
+_DEGREE_PATTERNS = [
+    (DegreeLevel.DOCTORATE, re.compile(r"\bph\.?\s?d\b|\bdoctor|\bd\.phil\b")),
+    (DegreeLevel.MASTER, re.compile(r"\bmaster|\bmba\b|\bm\.?sc\b|\bm\.s\.|\bm\.?tech\b|\bm\.e\.|\bm\.a\.|\bmca\b")),
+    (DegreeLevel.BACHELOR, re.compile(r"\bbachelor|\bb\.?sc\b|\bb\.s\.|\bb\.?tech\b|\bb\.e\.|\bb\.a\.|\bb\.?com\b|\bbca\b")),
+    (DegreeLevel.ASSOCIATE, re.compile(r"\bassociate|\bdiploma")),
+]
+
+
+def parse_degree_level(text: Optional[str]) -> DegreeLevel:
+    """Maps a credential or qualification string (e.g. "Master of Science", "PhD") to a DegreeLevel."""
+    text = (text or "").lower()
+    for level, pattern in _DEGREE_PATTERNS:
+        if pattern.search(text):
+            return level
+    return DegreeLevel.NONE
+
+
+def normalize_skill(skill: str) -> str:
+    return skill.strip().lower()
+
+
+class ColumnStore:
+    """
+    Columnar copy of the employee attributes used for candidate pre-filtering.
+
+    - experience: int32 array
+    - degree: DegreeLevel codes as an int8 array
+    - titles / credentials: lower-cased fixed-width string arrays
+    - skills: inverted index from normalised skill to a sorted array of rows
+    - keywords: per-row profile keyword sets, precomputed for match reasons
+    - sparse: BM25 inverted index over titles, skills and credentials
+
+    Every predicate evaluates to a NumPy boolean mask over all rows, so a
+    filter costs a handful of vectorised operations instead of a Python loop
+    over employee dicts. Like the store views, a ColumnStore is never modified
+    after it is published; `extended` returns a new one.
+    """
+
+    def __init__(self, experience: np.ndarray, degree: np.ndarray, titles: np.ndarray,
+                 credentials: np.ndarray, skill_index: Dict[str, np.ndarray],
+                 keywords: List[frozenset], sparse: BM25Index):
+        self.experience = experience
+        self.degree = degree
+        self.titles = titles
+        self.credentials = credentials
+        self.skill_index = skill_index
+        self.keywords = keywords
+        self.sparse = sparse
+
+    @classmethod
+    def from_employees(cls, employees: List[dict]) -> "ColumnStore":
+        empty = cls(
+            np.empty(0, dtype=np.int32),
+            np.empty(0, dtype=np.int8),
+            np.empty(0, dtype=np.str_),
+            np.empty(0, dtype=np.str_),
+            {},
+            [],
+            BM25Index({}, np.empty(0, dtype=np.float32)),
+        )
+        return empty.extended(employees)
+
+    def __len__(self) -> int:
+        return len(self.experience)
+
+    def extended(self, employees: List[dict]) -> "ColumnStore":
+        """Returns a new ColumnStore with `employees` appended as new rows."""
+        start = len(self)
+        skill_rows: Dict[str, List[int]] = {}
+        for row, emp in enumerate(employees, start=start):
+            for skill in {normalize_skill(s) for s in emp.get("skills", [])}:
+                skill_rows.setdefault(skill, []).append(row)
+
+        skill_index = dict(self.skill_index)
+        for skill, rows in skill_rows.items():
+            new_rows = np.array(rows, dtype=np.int64)
+            existing = skill_index.get(skill)
+            skill_index[skill] = new_rows if existing is None else np.concatenate([existing, new_rows])
+
+        return ColumnStore(
+            np.concatenate([self.experience, np.array([emp.get("experience_years", 0) for emp in employees], dtype=np.int32)]),
+            np.concatenate([self.degree, np.array([parse_degree_level(emp.get("Key_Credentials")) for emp in employees], dtype=np.int8)]),
+            np.concatenate([self.titles, np.array([emp.get("title", "").lower() for emp in employees], dtype=np.str_)]),
+            np.concatenate([self.credentials, np.array([emp.get("Key_Credentials", "").lower() for emp in employees], dtype=np.str_)]),
+            skill_index,
+            self.keywords + [keyword_tokens(build_profile_text(emp)) for emp in employees],
+            self.sparse.extended(employees),
+        )
+
+    def take(self, rows: np.ndarray) -> "ColumnStore":
+        """Returns a compacted ColumnStore holding only `rows`, renumbered from 0."""
+        remap = np.full(len(self), -1, dtype=np.int64)
+        remap[rows] = np.arange(len(rows))
+        skill_index = {}
+        for skill, skill_rows in self.skill_index.items():
+            kept = remap[skill_rows]
+            kept = kept[kept >= 0]
+            if len(kept):
+                skill_index[skill] = kept
+        return ColumnStore(
+            self.experience[rows], self.degree[rows], self.titles[rows], self.credentials[rows],
+            skill_index, [self.keywords[row] for row in rows], self.sparse.take(rows),
+        )
+
+    # --- Predicates -------------------------------------------------------
+
+    def experience_between(self, minimum: Optional[int] = None, maximum: Optional[int] = None) -> np.ndarray:
+        mask = np.ones(len(self), dtype=bool)
+        if minimum is not None:
+            mask &= self.experience >= minimum
+        if maximum is not None:
+            mask &= self.experience <= maximum
+        return mask
+
+    def degree_at_least(self, level: DegreeLevel) -> np.ndarray:
+        return self.degree >= int(level)
+
+    def credential_contains(self, text: str) -> np.ndarray:
+        return np.char.find(self.credentials, text.lower()) >= 0
+
+    def title_contains(self, text: str) -> np.ndarray:
+        return np.char.find(self.titles, text.lower()) >= 0
+
+    def has_skill(self, skill: str) -> np.ndarray:
+        mask = np.zeros(len(self), dtype=bool)
+        rows = self.skill_index.get(normalize_skill(skill))
+        if rows is not None:
+            mask[rows] = True
+        return mask
+
+    def has_all_skills(self, skills: Iterable[str]) -> np.ndarray:
+        mask = np.ones(len(self), dtype=bool)
+        for skill in skills:
+            mask &= self.has_skill(skill)
+        return mask
+
+    def has_any_skill(self, skills: Iterable[str]) -> np.ndarray:
+        mask = np.zeros(len(self), dtype=bool)
+        for skill in skills:
+            rows = self.skill_index.get(normalize_skill(skill))
+            if rows is not None:
+                mask[rows] = True
+        return mask
+
+    def evaluate(self, filters) -> np.ndarray:
+        """
+        Evaluates a CandidateFilters object to a boolean mask.
+        All predicates that are set are combined with AND.
+        """
+        mask = self.experience_between(filters.min_experience, filters.max_experience)
+        if filters.min_degree:
+            level = parse_degree_level(filters.min_degree)
+            if level is DegreeLevel.NONE:
+                # Unknown qualification wording: fall back to matching the credential text
+                mask &= self.credential_contains(filters.min_degree)
+            else:
+                mask &= self.degree_at_least(level)
+        if filters.must_have_skills:
+            mask &= self.has_all_skills(filters.must_have_skills)
+        if filters.any_of_skills:
+            mask &= self.has_any_skill(filters.any_of_skills)
+        if filters.title_contains:
+            mask &= self.title_contains(filters.title_contains)
+        return mask
+
+    def evaluate_rows(self, filters, rows: np.ndarray) -> np.ndarray:
+        """`evaluate` for only the given rows: a boolean mask aligned with `rows`, at a cost proportional to len(rows)."""
+        experience = self.experience[rows]
+        mask = np.ones(len(rows), dtype=bool)
+        if filters.min_experience is not None:
+            mask &= experience >= filters.min_experience
+        if filters.max_experience is not None:
+            mask &= experience <= filters.max_experience
+        if filters.min_degree:
+            level = parse_degree_level(filters.min_degree)
+            if level is DegreeLevel.NONE:
+                mask &= np.char.find(self.credentials[rows], filters.min_degree.lower()) >= 0
+            else:
+                mask &= self.degree[rows] >= int(level)
+        empty = np.empty(0, dtype=np.int64)
+        for skill in filters.must_have_skills:
+            mask &= np.isin(rows, self.skill_index.get(normalize_skill(skill), empty))
+        if filters.any_of_skills:
+            mask &= np.isin(rows, np.concatenate([self.skill_index.get(normalize_skill(skill), empty)
+                                                  for skill in filters.any_of_skills]))
+        if filters.title_contains:
+            mask &= np.char.find(self.titles[rows], filters.title_contains.lower()) >= 0
+        return mask
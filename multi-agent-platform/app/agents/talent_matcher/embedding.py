@@ -0,0 +1,149 @@
+import json
+import logging
+import os
+from typing import List, Sequence, Tuple
+
+import numpy as np
+from sentence_transformers import SentenceTransformer
+
+from app.agents.talent_matcher.index import normalize_rows
+
+logger = logging.getLogger("talent_matcher")
+
+BACKENDS = ("torch", "onnx")
+ONNX_QUANTIZATIONS = ("", "arm64", "avx2", "avx512", "avx512_vnni")
+
+# Profiles compared against the PyTorch model when an ONNX export is verified
+VERIFY_SAMPLE_SIZE = 256
+
+
+def embedding_model_id(model_name: str, backend: str, quantization: str = "") -> str:
+    """
+    Identifies the model *and* how it is run, so snapshots encoded by one
+    backend are not silently reused by another. The PyTorch backend keeps the
+    plain model name, so existing snapshots stay valid.
+    """
+    if backend == "torch":
+        return model_name
+    return f"{model_name}+onnx" + (f"-qint8-{quantization}" if quantization else "")
+
+
+def onnx_file_name(quantization: str = "") -> str:
+    return f"onnx/model_qint8_{quantization}.onnx" if quantization else "onnx/model.onnx"
+
+
+def max_score_drift(candidate, reference, texts: Sequence[str]) -> float:
+    """
+    Largest absolute difference between the cosine-similarity matrices of
+    `texts` under two models, i.e. how far any match score can move.
+    """
+    texts = list(texts)
+    a = normalize_rows(candidate.encode(texts, show_progress_bar=False))
+    b = normalize_rows(reference.encode(texts, show_progress_bar=False))
+    return float(np.abs(a @ a.T - b @ b.T).max()) if texts else 0.0
+
+
+def _session_options(intra_op_threads: int, inter_op_threads: int):
+    import onnxruntime
+
+    options = onnxruntime.SessionOptions()
+    if intra_op_threads > 0:
+        options.intra_op_num_threads = intra_op_threads
+    if inter_op_threads > 0:
+        options.inter_op_num_threads = inter_op_threads
+    options.graph_optimization_level = onnxruntime.GraphOptimizationLevel.ORT_ENABLE_ALL
+    return options
+
+
+def _export_onnx(model_name: str, export_dir: str, quantization: str, sample_texts: List[str],
+                 tolerance: float) -> None:
+    """
+    Exports the model to ONNX (and optionally an int8 dynamically-quantized
+    copy) into `export_dir`, then checks it against the PyTorch model.
+    The verification result is stored next to the model so later starts skip it.
+    """
+    from sentence_transformers import export_dynamic_quantized_onnx_model
+
+    file_name = onnx_file_name(quantization)
+    if not os.path.exists(os.path.join(export_dir, "onnx", "model.onnx")):
+        logger.info(f"Exporting {model_name} to ONNX in {export_dir}")
+        SentenceTransformer(model_name, backend="onnx", device="cpu").save_pretrained(export_dir)
+    if quantization and not os.path.exists(os.path.join(export_dir, file_name)):
+        logger.info(f"Quantizing ONNX model to int8 ({quantization})")
+        onnx_model = SentenceTransformer(export_dir, backend="onnx", device="cpu")
+        export_dynamic_quantized_onnx_model(onnx_model, quantization, export_dir)
+
+    candidate = SentenceTransformer(export_dir, backend="onnx", device="cpu", model_kwargs={"file_name": file_name})
+    reference = SentenceTransformer(model_name, device="cpu")
+    drift = max_score_drift(candidate, reference, sample_texts[:VERIFY_SAMPLE_SIZE])
+    passed = drift <= tolerance
+    with open(_verification_path(export_dir, quantization), "w", encoding="utf-8") as f:
+        json.dump({"file_name": file_name, "max_score_drift": drift, "tolerance": tolerance, "passed": passed}, f)
+    logger.info(f"ONNX model {file_name}: max cosine score drift {drift:.5f} (tolerance {tolerance})")
+
+
+def _verification_path(export_dir: str, quantization: str) -> str:
+    return os.path.join(export_dir, f"verification{'_' + quantization if quantization else ''}.json")
+
+
+def _verification(export_dir: str, quantization: str) -> dict:
+    """The stored verification result for an export, or {} if it was never verified."""
+    path = _verification_path(export_dir, quantization)
+    if not os.path.exists(path):
+        return {}
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def load_embedding_model(model_name: str, backend: str = "torch", onnx_dir: str = "",
+                         quantization: str = "", intra_op_threads: int = 0, inter_op_threads: int = 0,
+                         tolerance: float = 0.02, sample_texts: Sequence[str] = ()) -> Tuple[SentenceTransformer, str]:
+    """
+    Loads the sentence-transformer used to embed profiles and JDs.
+
+    - "torch": eager PyTorch, as before (thread counts applied through torch).
+    - "onnx": the model is exported once to `onnx_dir` (int8 dynamically
+      quantized when `quantization` names a target ISA) and served by
+      onnxruntime with the given intra/inter-op thread counts.
+
+    An ONNX export is only used if its cosine scores over `sample_texts`
+    stay within `tolerance` of the PyTorch model; otherwise this falls back
+    to PyTorch and logs an error.
+
+    Returns the model and its embedding_model_id for the backend actually used.
+    """
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown embedding backend: {backend}. Choose from: {', '.join(BACKENDS)}")
+    if quantization not in ONNX_QUANTIZATIONS:
+        raise ValueError(f"Unknown ONNX quantization: {quantization}. Choose from: {', '.join(q or '(none)' for q in ONNX_QUANTIZATIONS)}")
+
+    if backend == "onnx":
+        export_dir = os.path.join(onnx_dir, model_name.replace("/", "__"))
+        if not _verification(export_dir, quantization):
+            _export_onnx(model_name, export_dir, quantization, list(sample_texts), tolerance)
+        if _verification(export_dir, quantization)["max_score_drift"] <= tolerance:
+            model = SentenceTransformer(
+                export_dir,
+                backend="onnx",
+                device="cpu",
+                model_kwargs={
+                    "file_name": onnx_file_name(quantization),
+                    "provider": "CPUExecutionProvider",
+                    "session_options": _session_options(intra_op_threads, inter_op_threads),
+                },
+            )
+            return model, embedding_model_id(model_name, backend, quantization)
+        logger.error(f"ONNX model for {model_name} exceeds the score tolerance ({tolerance}); using PyTorch instead")
+
+    if intra_op_threads > 0 or inter_op_threads > 0:
+        import torch
+
+        if intra_op_threads > 0:
+            torch.set_num_threads(intra_op_threads)
+        if inter_op_threads > 0:
+            try:
+                torch.set_num_interop_threads(inter_op_threads)
+            except RuntimeError:
+                # Can only be set before torch starts any parallel work
+                logger.warning("torch inter-op thread count already fixed; ignoring setting")
+    return SentenceTransformer(model_name), embedding_model_id(model_name, "torch")
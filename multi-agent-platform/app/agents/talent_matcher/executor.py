@@ -0,0 +1,142 @@
+import asyncio
+import multiprocessing
+import threading
+import time
+from collections import deque
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Deque, Dict
+
+# Number of recent samples kept for the latency percentiles
+METRIC_WINDOW = 1000
+
+
+class QueueFullError(Exception):
+    """Raised when the matcher executor already has its maximum number of queued tasks."""
+
+
+class LatencyStats:
+    """Running count/mean/max plus percentiles over a window of recent samples (seconds)."""
+
+    def __init__(self, window: int = METRIC_WINDOW):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.recent: Deque[float] = deque(maxlen=window)
+
+    def add(self, seconds: float) -> None:
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+        self.recent.append(seconds)
+
+    def snapshot(self) -> Dict[str, float]:
+        recent = sorted(self.recent)
+
+        def percentile(q: float) -> float:
+            return recent[min(len(recent) - 1, int(q * len(recent)))] * 1000 if recent else 0.0
+
+        return {
+            "count": self.count,
+            "mean_ms": (self.total / self.count * 1000) if self.count else 0.0,
+            "p50_ms": percentile(0.50),
+            "p95_ms": percentile(0.95),
+            "p99_ms": percentile(0.99),
+            "max_ms": self.max * 1000,
+        }
+
+
+def _timed_call(fn: Callable, args: tuple):
+    """Runs fn in the worker and reports its wall-clock start and end times."""
+    started = time.time()
+    result = fn(*args)
+    return result, started, time.time()
+
+
+class BoundedExecutor:
+    """
+    Runs CPU-bound matcher work off the asyncio event loop.
+
+    Work goes to a thread or process pool with `max_workers` workers. At most
+    `max_queue` further tasks may wait for a worker; beyond that `run` raises
+    QueueFullError immediately so the endpoint can shed load with a 503
+    instead of queueing without bound. Queue wait and execution time are
+    recorded for every task.
+
+    In process mode each worker process runs `initializer` once (for example
+    to load its own matcher) and functions must be picklable module-level
+    callables. Work that must change this process's state (employee updates)
+    is passed with `local=True` and runs on a thread here instead, under the
+    same limits.
+    """
+
+    def __init__(self, kind: str = "thread", max_workers: int = 4, max_queue: int = 64,
+                 initializer: Callable = None):
+        if kind not in ("thread", "process"):
+            raise ValueError(f"Unknown executor kind: {kind}. Choose from: thread, process")
+        self.kind = kind
+        self.max_workers = max(1, max_workers)
+        self.max_queue = max(0, max_queue)
+        self.initializer = initializer
+        self._lock = threading.Lock()
+        self._pending = 0
+        self.rejected = 0
+        self.queue_wait = LatencyStats()
+        self.execution = LatencyStats()
+        self._pool = self._create_pool()
+        # Threads for `local` tasks; in thread mode they share the main pool
+        self._local_pool = (
+            ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="talent-matcher-local")
+            if kind == "process" else None
+        )
+
+    def _create_pool(self) -> Executor:
+        if self.kind == "process":
+            return ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=self.initializer,
+            )
+        return ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="talent-matcher")
+
+    async def run(self, fn: Callable, *args, local: bool = False) -> Any:
+        """
+        Runs fn(*args) on the pool and awaits its result, or raises QueueFullError.
+        With `local`, runs it on a thread in this process even in process mode.
+        """
+        with self._lock:
+            if self._pending >= self.max_workers + self.max_queue:
+                self.rejected += 1
+                raise QueueFullError(
+                    f"Talent matcher is at capacity ({self._pending} requests in progress or queued)"
+                )
+            self._pending += 1
+        submitted = time.time()
+        try:
+            loop = asyncio.get_running_loop()
+            pool = self._local_pool if local and self._local_pool is not None else self._pool
+            result, started, finished = await loop.run_in_executor(pool, _timed_call, fn, args)
+        finally:
+            with self._lock:
+                self._pending -= 1
+        self.queue_wait.add(max(0.0, started - submitted))
+        self.execution.add(finished - started)
+        return result
+
+    def shutdown(self) -> None:
+        self._pool.shutdown(wait=False, cancel_futures=True)
+        if self._local_pool is not None:
+            self._local_pool.shutdown(wait=False, cancel_futures=True)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            pending = self._pending
+        return {
+            "kind": self.kind,
+            "max_workers": self.max_workers,
+            "max_queue": self.max_queue,
+            "in_flight": min(pending, self.max_workers),
+            "queued": max(0, pending - self.max_workers),
+            "rejected": self.rejected,
+            "queue_wait": self.queue_wait.snapshot(),
+            "execution": self.execution.snapshot(),
+        }
@@ -0,0 +1,295 @@
+import json
+import logging
+import os
+from collections import deque
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from app.agents.talent_matcher.columns import DegreeLevel, normalize_skill, parse_degree_level
+
+logger = logging.getLogger("talent_matcher")
+
+# Lowest accepted degree when a JD names none
+DEFAULT_MIN_DEGREE = "Bachelor"
+
+# Used when the taxonomy file has no "degrees" section (or there is no file).
+# Bare two-letter abbreviations only count next to a degree word, so "MS Office" is not a master's.
+DEFAULT_DEGREES = {
+    "PhD": ["phd", "ph.d", "ph.d.", "doctorate", "doctoral degree", "doctor of philosophy"],
+    "Master": ["master", "masters", "m.s.", "ms degree", "ms in", "msc", "m.sc", "m.tech", "mtech", "m.e.", "mba", "mca"],
+    "Bachelor": ["bachelor", "bachelors", "b.s.", "bs degree", "bs in", "bsc", "b.sc", "b.tech", "btech", "b.e.", "b.a.",
+                 "ba degree", "ba in", "bca"],
+    "Associate": ["associate degree", "associates degree", "diploma"],
+}
+
+# Experience vocabulary: "<n> years", "<n>+ years", "<n>-<m> years", "up to <n> years".
+# <n> may be glued to the unit ("5yrs") or spelled out ("five years").
+_YEAR_TERMS = ("year", "years", "yr", "yrs")
+_NUMBER_WORDS = {
+    word: n for n, word in enumerate(
+        "zero one two three four five six seven eight nine ten eleven twelve thirteen fourteen "
+        "fifteen sixteen seventeen eighteen nineteen twenty".split()
+    )
+}
+_MAX_TERMS = ("up to", "upto", "at most", "maximum of", "max", "no more than")
+# Text allowed between a number and "years", and between the two ends of a range
+_YEAR_GAPS = frozenset(["", "+", "plus", "or more", "+ of", "of"])
+_RANGE_GAPS = frozenset(["-", "–", "—", "to"])
+# Larger numbers before "years" are not experience requirements ("founded 150 years ago")
+_MAX_YEARS = 50
+
+# Token kinds
+SKILL, DEGREE, YEARS, MAX, DIGIT, NUMBER = "skill", "degree", "years", "max", "digit", "number"
+
+# JD fields each requirement is read from, and the order they are scanned in
+SKILL_FIELDS = ("required_skills",)
+DEGREE_FIELDS = ("minimum_qualification",)
+EXPERIENCE_FIELDS = ("key_skills_and_qualifications", "overview")
+_JD_FIELDS = SKILL_FIELDS + DEGREE_FIELDS + EXPERIENCE_FIELDS
+
+
+def normalize_text(text: Optional[str]) -> str:
+    """Lower-cases text and collapses whitespace runs, so multi-word terms match across line breaks."""
+    return " ".join((text or "").lower().split())
+
+
+class AhoCorasick:
+    """
+    Multi-pattern matcher over characters: finds every occurrence of every
+    pattern in one left-to-right pass, however many patterns there are.
+
+    Patterns map to a payload; `scan` yields (end, length, payload) for each
+    occurrence, longest pattern first among those ending at the same position.
+    """
+
+    def __init__(self, patterns: Dict[str, Any]):
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[List[Tuple[int, Any]]] = [[]]
+        for pattern, payload in patterns.items():
+            state = 0
+            for ch in pattern:
+                nxt = self._goto[state].get(ch)
+                if nxt is None:
+                    nxt = len(self._goto)
+                    self._goto[state][ch] = nxt
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._out.append([])
+                state = nxt
+            self._out[state].append((len(pattern), payload))
+
+        # Breadth-first, so a state's failure link is final before its children use it
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in self._goto[state].items():
+                queue.append(nxt)
+                fail = self._fail[state]
+                while fail and ch not in self._goto[fail]:
+                    fail = self._fail[fail]
+                target = self._goto[fail].get(ch, 0)
+                self._fail[nxt] = target if target != nxt else 0
+                self._out[nxt] = self._out[nxt] + self._out[self._fail[nxt]]
+
+    @property
+    def states(self) -> int:
+        return len(self._goto)
+
+    def scan(self, text: str):
+        goto, fail, out = self._goto, self._fail, self._out
+        state = 0
+        for end, ch in enumerate(text, 1):
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            if out[state]:
+                for length, payload in out[state]:
+                    yield end, length, payload
+
+
+class JDRequirements:
+    """What a job description asks for: normalised skills, lowest accepted degree and experience range."""
+
+    __slots__ = ("skills", "degree", "min_experience", "max_experience")
+
+    def __init__(self, skills: List[str], degree: Optional[str], min_experience: Optional[int],
+                 max_experience: Optional[int]):
+        self.skills = skills
+        self.degree = degree
+        self.min_experience = min_experience
+        self.max_experience = max_experience
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {name: getattr(self, name) for name in self.__slots__}
+
+
+class SkillExtractor:
+    """
+    Compiled extractor for skills, degrees and years of experience in JD text.
+
+    Built once from a taxonomy of canonical skill and degree names with their
+    synonyms ("k8s" → "Kubernetes", "B.Tech" → "Bachelor"). All terms, plus the
+    experience vocabulary, go into one Aho-Corasick automaton, so a JD is read
+    in a single pass whatever the size of the taxonomy. Matches must sit on word
+    boundaries, and overlapping matches resolve to the leftmost, then longest
+    ("machine learning", not "learning").
+
+    Canonical skill names should be spelled as in the employee data, so the
+    extracted skills can go straight into `must_have_skills` / `any_of_skills`.
+    """
+
+    def __init__(self, skills: Dict[str, List[str]], degrees: Optional[Dict[str, List[str]]] = None):
+        degrees = degrees or DEFAULT_DEGREES
+        self.synonyms: Dict[str, str] = {}
+        patterns: Dict[str, Tuple[str, Any]] = {}
+        for canonical, synonyms in skills.items():
+            for term in [canonical, *synonyms]:
+                key = normalize_text(term)
+                self.synonyms[normalize_skill(key)] = canonical
+                patterns[key] = (SKILL, canonical)
+
+        self.degree_levels: Dict[str, DegreeLevel] = {}
+        for canonical, synonyms in degrees.items():
+            level = parse_degree_level(canonical)
+            if level == DegreeLevel.NONE:
+                raise ValueError(f"Unrecognised degree name '{canonical}' in the skill taxonomy")
+            self.degree_levels[canonical] = level
+            for term in [canonical, *synonyms]:
+                patterns[normalize_text(term)] = (DEGREE, canonical)
+
+        for term in _YEAR_TERMS:
+            patterns[term] = (YEARS, None)
+        for term in _MAX_TERMS:
+            patterns[term] = (MAX, None)
+        for word, n in _NUMBER_WORDS.items():
+            patterns.setdefault(word, (NUMBER, n))
+        # Digits are scanned by the automaton too, so numbers are found in the same pass
+        for digit in "0123456789":
+            patterns[digit] = (DIGIT, None)
+        patterns.pop("", None)
+        self.automaton = AhoCorasick(patterns)
+
+    @classmethod
+    def from_file(cls, path: str) -> "SkillExtractor":
+        """
+        Loads a taxonomy file: {"skills": {canonical: [synonyms]}, "degrees": {canonical: [synonyms]}}.
+        Without the file, only degrees and experience are extracted.
+        """
+        if not path or not os.path.exists(path):
+            logger.warning(f"Skill taxonomy {path or '(none)'} not found; extracting degrees and experience only")
+            return cls({})
+        with open(path, "r", encoding="utf-8") as f:
+            taxonomy = json.load(f)
+        extractor = cls(taxonomy.get("skills", {}), taxonomy.get("degrees"))
+        logger.info(f"Skill taxonomy loaded from {path}: {len(extractor.synonyms)} skill terms, "
+                    f"{extractor.automaton.states} automaton states")
+        return extractor
+
+    def canonical_skill(self, skill: str) -> str:
+        """The canonical name of a skill or synonym ("k8s" → "Kubernetes"); unknown skills are returned unchanged."""
+        return self.synonyms.get(normalize_skill(skill), skill)
+
+    def canonical_skills(self, skills: Iterable[str]) -> List[str]:
+        """Canonical names of `skills`, without duplicates, in order."""
+        return list(dict.fromkeys(self.canonical_skill(skill) for skill in skills))
+
+    def tokens(self, text: str) -> List[Tuple[int, int, str, Any]]:
+        """
+        (start, end, kind, value) for every taxonomy term and standalone number in
+        normalised `text`, left to right, without overlaps. The text is read once,
+        by the automaton; the rest works on its matches.
+        """
+        found, digit_runs, unit_starts = [], [], set()
+        for end, length, (kind, value) in self.automaton.scan(text):
+            start = end - length
+            if kind == YEARS:
+                unit_starts.add(start)
+            if kind == DIGIT:
+                if digit_runs and digit_runs[-1][1] == start:
+                    digit_runs[-1][1] = end
+                else:
+                    digit_runs.append([start, end])
+                continue
+            # Word boundaries, on the sides where the term itself starts / ends with a word character
+            # (a unit may follow its number directly: "5years")
+            before = text[start - 1] if start > 0 else ""
+            if text[start].isalnum() and (before.isalpha() if kind == YEARS else before.isalnum()):
+                continue
+            if text[end - 1].isalnum() and end < len(text) and text[end].isalnum():
+                continue
+            found.append((start, end, kind, value))
+
+        # Numbers are runs of digits not glued to a word ("5+", "3-5", "5yrs", but not "k8s" or "ue5")
+        for start, end in digit_runs:
+            if (start == 0 or not text[start - 1].isalnum()) and (end == len(text) or not text[end].isalpha() or end in unit_starts):
+                found.append((start, end, NUMBER, int(text[start:end])))
+
+        # Leftmost-longest: among overlapping matches keep the earliest, then the longest
+        found.sort(key=lambda token: (token[0], token[0] - token[1]))
+        tokens, last_end = [], 0
+        for token in found:
+            if token[0] >= last_end:
+                tokens.append(token)
+                last_end = token[1]
+        return tokens
+
+    def _experience(self, text: str, tokens: List[Tuple[int, int, str, Any]]) -> Tuple[Optional[int], Optional[int]]:
+        """The first experience requirement among `tokens`, as (min, max) years."""
+        for i, (start, _, kind, _) in enumerate(tokens):
+            if kind != YEARS or i == 0:
+                continue
+            n_start, n_end, n_kind, high = tokens[i - 1]
+            if n_kind != NUMBER or high > _MAX_YEARS or text[n_end:start].strip(" ") not in _YEAR_GAPS:
+                continue
+            if i >= 2:
+                p_start, p_end, p_kind, low = tokens[i - 2]
+                if p_kind == NUMBER and text[p_end:n_start].strip(" ") in _RANGE_GAPS:
+                    return min(low, high), max(low, high)
+                if p_kind == MAX and text[p_end:n_start].strip(" ") == "":
+                    return 0, high
+            return high, None
+        return None, None
+
+    def _requirements(self, text: str, skill_tokens, degree_tokens, experience_tokens) -> JDRequirements:
+        skills = list(dict.fromkeys(value for _, _, kind, value in skill_tokens if kind == SKILL))
+        # "Bachelor's or Master's" accepts a bachelor's degree: the lowest level mentioned is the requirement
+        degrees = [value for _, _, kind, value in degree_tokens if kind == DEGREE]
+        degree = min(degrees, key=self.degree_levels.__getitem__) if degrees else None
+        min_experience, max_experience = self._experience(text, experience_tokens)
+        return JDRequirements(skills, degree, min_experience, max_experience)
+
+    def extract(self, text: str) -> JDRequirements:
+        """Skills, degree and experience mentioned anywhere in `text`."""
+        text = normalize_text(text)
+        tokens = self.tokens(text)
+        return self._requirements(text, tokens, tokens, tokens)
+
+    def extract_jd(self, job_description) -> JDRequirements:
+        """
+        Requirements of a JD Agent job description, read in one pass over its
+        fields: skills from required_skills, the degree from
+        minimum_qualification and experience from key_skills_and_qualifications
+        and overview.
+        """
+        # Fields are joined with newlines, which normalised text never contains,
+        # so no match or experience phrase can span two fields
+        parts = [normalize_text(getattr(job_description, field, "")) for field in _JD_FIELDS]
+        text = "\n".join(parts)
+        bounds, offset = [], 0
+        for part in parts:
+            bounds.append((offset, offset + len(part)))
+            offset += len(part) + 1
+
+        by_field: Dict[str, list] = {field: [] for field in _JD_FIELDS}
+        tokens = self.tokens(text)
+        field = 0
+        for token in tokens:
+            while token[0] > bounds[field][1]:
+                field += 1
+            by_field[_JD_FIELDS[field]].append(token)
+        return self._requirements(
+            text,
+            [token for name in SKILL_FIELDS for token in by_field[name]],
+            [token for name in DEGREE_FIELDS for token in by_field[name]],
+            [token for name in EXPERIENCE_FIELDS for token in by_field[name]],
+        )
@@ -0,0 +1,241 @@
+import copy
+import logging
+from abc import ABC, abstractmethod
+from typing import Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from app.agents.talent_matcher.quantization import EmbeddingMatrix, as_matrix
+
+logger = logging.getLogger("talent_matcher")
+
+# Upper bound on the number of scores materialised at once by batched exact search
+BATCH_SCORE_ELEMENTS = 1 << 25
+
+
+def normalize_rows(vectors: np.ndarray) -> np.ndarray:
+    """
+    L2-normalises embeddings so that a plain inner product equals cosine similarity.
+    Accepts a single vector or a matrix of row vectors.
+    """
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+
+def top_k(scores: np.ndarray, k: int) -> np.ndarray:
+    """
+    Returns the positions of the k highest scores, best first.
+    Uses argpartition so only the selected k entries are fully sorted.
+    """
+    if k <= 0 or scores.size == 0:
+        return np.empty(0, dtype=np.int64)
+    if k >= scores.size:
+        return np.argsort(-scores, kind="stable")
+    part = np.argpartition(-scores, k - 1)[:k]
+    return part[np.argsort(-scores[part], kind="stable")]
+
+
+class VectorIndex(ABC):
+    """
+    Base class for the talent matcher's vector indexes.
+
+    Embeddings are expected to be L2-normalised, so the inner product is the
+    cosine score. They are held as an EmbeddingMatrix (float32, float16 or
+    int8), and all scoring goes through it. `search` takes an optional boolean row mask; rows where the
+    mask is False are never returned, which lets the matcher push its degree
+    and experience predicates into the search itself.
+    """
+
+    name = "base"
+
+    def __init__(self):
+        self.embeddings: Optional[EmbeddingMatrix] = None
+
+    @abstractmethod
+    def build(self, embeddings) -> None:
+        """Indexes `embeddings` (a float32 array or an EmbeddingMatrix)."""
+
+    @abstractmethod
+    def search(
+        self, query: np.ndarray, k: int, mask: Optional[np.ndarray] = None
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Returns (row_ids, scores) for the best k rows, sorted by descending score."""
+
+    def search_batch(
+        self, queries: np.ndarray, k: int, masks: Optional[np.ndarray] = None
+    ) -> Iterator[Tuple[np.ndarray, np.ndarray]]:
+        """
+        Searches several queries, yielding (row_ids, scores) per query in order.
+        `masks` is an optional (n_queries, n_rows) boolean array with one filter per query.
+        """
+        for i, query in enumerate(queries):
+            yield self.search(query, k, mask=None if masks is None else masks[i])
+
+    @abstractmethod
+    def with_rows(self, embeddings: EmbeddingMatrix, rows: np.ndarray) -> "VectorIndex":
+        """
+        Returns a copy of the index over `embeddings` with `rows` added.
+        The original index is left untouched, so searches already running on it stay consistent.
+        """
+
+    def __len__(self) -> int:
+        return 0 if self.embeddings is None else len(self.embeddings)
+
+
+class ExactIndex(VectorIndex):
+    """Brute-force inner product over every row. Always returns the true top-k."""
+
+    name = "exact"
+
+    def build(self, embeddings) -> None:
+        self.embeddings = as_matrix(embeddings)
+
+    def search(self, query, k, mask=None):
+        scores = self.embeddings.dot(query)
+        if mask is not None:
+            scores = np.where(mask, scores, -np.inf)
+            k = min(k, int(np.count_nonzero(mask)))
+        rows = top_k(scores, k)
+        return rows, scores[rows]
+
+    def search_batch(self, queries, k, masks=None):
+        # Score a block of queries against every row with one matrix product
+        chunk = max(1, BATCH_SCORE_ELEMENTS // max(1, len(self.embeddings)))
+        for start in range(0, len(queries), chunk):
+            scores = self.embeddings.dot_batch(queries[start:start + chunk])
+            block = None
+            if masks is not None:
+                block = masks[start:start + chunk]
+                scores = np.where(block, scores, -np.inf)
+            for i, row_scores in enumerate(scores):
+                kk = k if block is None else min(k, int(np.count_nonzero(block[i])))
+                rows = top_k(row_scores, kk)
+                yield rows, row_scores[rows]
+
+    def with_rows(self, embeddings, rows):
+        index = ExactIndex()
+        index.build(embeddings)
+        return index
+
+
+class IVFIndex(VectorIndex):
+    """
+    Inverted-file approximate index.
+
+    Rows are clustered with spherical k-means into `nlist` cells. A query scores
+    the centroids, then only scans the rows of the `nprobe` closest cells. When
+    a mask is given it is applied to each probed cell before scoring, and more
+    cells are probed until at least k rows survive the filter.
+
+    An index built from no rows has no cells and finds nothing; the first rows
+    added to it train the cells.
+    """
+
+    name = "ivf"
+
+    def __init__(self, nlist: int = 0, nprobe: int = 8, n_iter: int = 10,
+                 train_sample: int = 50_000, seed: int = 0):
+        super().__init__()
+        self.nlist = nlist
+        self.nprobe = nprobe
+        self.n_iter = n_iter
+        self.train_sample = train_sample
+        self.seed = seed
+        self.centroids: Optional[np.ndarray] = None
+        self.lists: List[np.ndarray] = []
+
+    def build(self, embeddings) -> None:
+        embeddings = self.embeddings = as_matrix(embeddings)
+        n = len(embeddings)
+        if n == 0:
+            self.centroids, self.lists = None, []
+            logger.info("IVF index built empty")
+            return
+        nlist = self.nlist or int(np.sqrt(n))
+        nlist = max(1, min(nlist, n))
+
+        rng = np.random.default_rng(self.seed)
+        if n > self.train_sample:
+            sample = embeddings.vectors(np.sort(rng.choice(n, self.train_sample, replace=False)))
+        else:
+            sample = embeddings.vectors(slice(None))
+
+        # Spherical k-means on the training sample
+        centroids = sample[rng.choice(len(sample), nlist, replace=False)].astype(np.float32)
+        for _ in range(self.n_iter):
+            assignment = self._assign(as_matrix(sample), centroids)
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, assignment, sample)
+            empty = np.bincount(assignment, minlength=nlist) == 0
+            sums[empty] = centroids[empty]
+            centroids = normalize_rows(sums)
+
+        self.centroids = centroids
+        assignment = self._assign(embeddings, centroids)
+        order = np.argsort(assignment, kind="stable")
+        bounds = np.searchsorted(assignment[order], np.arange(nlist + 1))
+        self.lists = [order[bounds[c]:bounds[c + 1]] for c in range(nlist)]
+        logger.info(f"IVF index built: {n} rows in {nlist} cells")
+
+    @staticmethod
+    def _assign(vectors: EmbeddingMatrix, centroids: np.ndarray, chunk: int = 65_536) -> np.ndarray:
+        """Nearest centroid (by inner product) for each row, computed in chunks to bound memory."""
+        out = np.empty(len(vectors), dtype=np.int64)
+        for start in range(0, len(vectors), chunk):
+            block = vectors.vectors(slice(start, start + chunk))
+            out[start:start + chunk] = np.argmax(block @ centroids.T, axis=1)
+        return out
+
+    def search(self, query, k, mask=None):
+        if self.centroids is None:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+        nlist = len(self.lists)
+        order = np.argsort(-(self.centroids @ query))
+        step = max(1, min(self.nprobe, nlist))
+
+        candidates = []
+        found = 0
+        probed = 0
+        while probed < nlist and (probed < step or found < k):
+            for cell in order[probed:probed + step]:
+                rows = self.lists[cell]
+                if mask is not None:
+                    rows = rows[mask[rows]]
+                candidates.append(rows)
+                found += len(rows)
+            probed += step
+
+        rows = np.concatenate(candidates) if candidates else np.empty(0, dtype=np.int64)
+        scores = self.embeddings.dot(query, rows)
+        best = top_k(scores, k)
+        return rows[best], scores[best]
+
+    def with_rows(self, embeddings, rows):
+        index = copy.copy(self)
+        if self.centroids is None:
+            # Nothing to extend yet: train the cells on the rows we now have
+            index.build(embeddings)
+            return index
+        index.embeddings = as_matrix(embeddings)
+        index.lists = list(self.lists)
+        if len(rows):
+            assignment = self._assign(as_matrix(embeddings.vectors(rows)), self.centroids)
+            for cell in np.unique(assignment):
+                index.lists[cell] = np.concatenate([self.lists[cell], rows[assignment == cell]])
+        return index
+
+
+INDEX_TYPES = {
+    ExactIndex.name: ExactIndex,
+    IVFIndex.name: IVFIndex,
+}
+
+
+def create_index(index_type: str = "exact", **options) -> VectorIndex:
+    """Instantiates a vector index by name ("exact" or "ivf")."""
+    index_cls = INDEX_TYPES.get(index_type)
+    if index_cls is None:
+        raise ValueError(f"Unknown vector index type: {index_type}. Choose from: {', '.join(INDEX_TYPES)}")
+    return index_cls(**options)
@@ -0,0 +1,293 @@
+import asyncio
+import logging
+import os
+import threading
+import time
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+from typing import Any, Dict, List, Optional, Tuple
+
+logger = logging.getLogger("talent_matcher")
+
+
+class NotReadyError(Exception):
+    """Raised when the talent matcher is still starting up (or failed to start)."""
+
+
+class ServiceLoader:
+    """
+    Builds the TalentMatcherService on a background thread.
+
+    Importing the service pulls in torch and the model, and building it loads
+    the data file and encodes every new profile, which can take minutes. The
+    loader lets the app bind its port and answer health checks immediately:
+    `start` kicks off the build, `status` reports its phases and progress for
+    the readiness probe, and `get` / `wait_ready` hand out the service once it
+    is built (or raise NotReadyError when the deadline passes first).
+    """
+
+    def __init__(self):
+        self._future: Future = Future()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self._started_at: Optional[float] = None
+        self._phase_started_at: Optional[float] = None
+        self.phase = "pending"
+        self.phases: List[Dict[str, Any]] = []
+        self.done = 0
+        self.total = 0
+
+    def start(self) -> None:
+        """Starts the background build once; later calls do nothing."""
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._started_at = time.monotonic()
+            self._thread = threading.Thread(target=self._build, name="talent-matcher-warmup", daemon=True)
+            self._thread.start()
+
+    def _build(self) -> None:
+        try:
+            self.progress("import")
+            from app.agents.talent_matcher.service import TalentMatcherService
+
+            service = TalentMatcherService(progress=self.progress)
+            self.progress("ready")
+            self._future.set_result(service)
+        except BaseException as e:
+            logger.error(f"Talent matcher failed to start: {e}", exc_info=True)
+            self.progress("failed")
+            self._future.set_exception(e)
+
+    def progress(self, phase: str, done: int = 0, total: int = 0) -> None:
+        """Called by the service as it starts: a new phase name, or progress within the current one."""
+        now = time.monotonic()
+        if phase != self.phase:
+            if self._phase_started_at is not None:
+                seconds = now - self._phase_started_at
+                self.phases.append({"phase": self.phase, "seconds": round(seconds, 3)})
+                logger.info(f"Talent matcher startup: {self.phase} took {seconds:.2f}s")
+            self.phase = phase
+            self._phase_started_at = now
+            if phase == "ready":
+                logger.info(f"Talent matcher ready after {now - self._started_at:.2f}s")
+        self.done, self.total = done, total
+
+    @property
+    def ready(self) -> bool:
+        return self._future.done() and self._future.exception() is None
+
+    def get(self, timeout: float = 0):
+        """Returns the service, waiting up to `timeout` seconds for it, or raises NotReadyError."""
+        self.start()
+        try:
+            return self._future.result(timeout=timeout)
+        except FutureTimeoutError:
+            raise NotReadyError(self._not_ready_message())
+        except Exception as e:
+            raise NotReadyError(f"Talent matcher failed to start: {e}")
+
+    async def wait_ready(self, timeout: float = 0):
+        """Async version of `get`: waits without blocking the event loop."""
+        self.start()
+        if not self._future.done() and timeout > 0:
+            waiter = asyncio.wrap_future(self._future)
+            # The build's error is reported by `get`; mark it retrieved here
+            waiter.add_done_callback(lambda done: done.cancelled() or done.exception())
+            # asyncio.wait returns on timeout without cancelling the shared build future,
+            # and on completion without raising the build's error
+            await asyncio.wait({waiter}, timeout=timeout)
+        if not self._future.done():
+            raise NotReadyError(self._not_ready_message())
+        return self.get()
+
+    def _not_ready_message(self) -> str:
+        return f"Talent matcher is starting up ({self.phase})"
+
+    def status(self) -> Dict[str, Any]:
+        error = None
+        if self._future.done() and self._future.exception() is not None:
+            error = str(self._future.exception())
+        status = {
+            "ready": self.ready,
+            "phase": self.phase,
+            "elapsed_seconds": round(time.monotonic() - self._started_at, 3) if self._started_at else 0.0,
+            "phases": list(self.phases),
+            "error": error,
+        }
+        if self.total:
+            status["progress"] = {"done": self.done, "total": self.total}
+        return status
+
+
+def build_tenant_service(data_path: str, snapshot_dir: str, shared):
+    """Builds a tenant's TalentMatcherService, reusing the models of the `shared` default service. Tenants are never sharded."""
+    from app.agents.talent_matcher.service import TalentMatcherService
+
+    return TalentMatcherService(data_path=data_path, snapshot_dir=snapshot_dir, shared=shared, shards=0)
+
+
+def create_tenant_registry(default_service):
+    """A TenantRegistry configured from settings, around the given default-service getter."""
+    from app.core.config import settings
+    from app.agents.talent_matcher.tenants import TenantRegistry
+
+    return TenantRegistry(
+        default_service,
+        build_tenant_service,
+        tenants_dir=settings.TALENT_MATCHER_TENANTS_DIR,
+        snapshot_dir=settings.TALENT_MATCHER_SNAPSHOT_DIR,
+        memory_budget=settings.TALENT_MATCHER_TENANT_MEMORY_MB * 2**20,
+    )
+
+
+class ChangeFeed:
+    """
+    Employee upserts/deletes made in the main process, for the process-pool workers.
+
+    Each worker holds its own copy of the employee data. Rather than restarting
+    the pool after every change, the retained changes are sent along with each
+    match task; the worker applies the ones newer than its position and reports
+    the position back. Replaying a change is harmless (upserts carry their
+    employee IDs), so a worker that loaded its data after a change was saved
+    ends up in the same state.
+
+    When changes are saved, the feed only waits for workers that reported in the
+    last `worker_timeout` seconds, and keeps at most `max_changes` changes (0 = no
+    limit). A worker that falls behind the dropped changes reloads the saved data,
+    which holds them. Otherwise a worker could not catch up that way, so changes
+    are dropped only once all `workers` workers have applied them.
+
+    Writers hold `write_lock` across applying a change and recording it, so the
+    feed lists changes in the order they were applied.
+    """
+
+    def __init__(self, workers: int, enabled: bool = True, changes_saved: bool = False,
+                 max_changes: int = 0, worker_timeout: float = 300.0):
+        self.workers = workers
+        self.enabled = enabled
+        self.changes_saved = changes_saved
+        self.max_changes = max_changes if changes_saved else 0
+        self.worker_timeout = worker_timeout
+        self.write_lock = threading.Lock()
+        self._lock = threading.Lock()
+        self._entries: List[tuple] = []  # (position, recorded_at, tenant_id, op, payload)
+        self._position = 0
+        self._dropped = (0, 0.0)  # (position, recorded_at) of the last change dropped
+        self._workers: Dict[int, tuple] = {}  # worker pid -> (position applied, last reported)
+
+    def record(self, tenant_id: Optional[str], op: str, payload: list) -> None:
+        """Adds a change: op "upsert" with the stored records, or "delete" with the deleted IDs."""
+        if not self.enabled:
+            return
+        with self._lock:
+            self._position += 1
+            self._entries.append((self._position, time.time(), tenant_id, op, payload))
+            if self.max_changes and len(self._entries) > self.max_changes:
+                self._drop_through(self._entries[-self.max_changes - 1][0])
+
+    def pending(self) -> Tuple[tuple, List[tuple]]:
+        """
+        The changes some worker may not have applied yet, and the (position,
+        recorded_at) of the last change dropped before them.
+        """
+        with self._lock:
+            return self._dropped, list(self._entries)
+
+    def acknowledge(self, pid: int, position: int) -> None:
+        """Notes how far a worker has got, and drops the changes every worker still waited for has applied."""
+        now = time.time()
+        with self._lock:
+            previous = self._workers.get(pid, (0, now))[0]
+            self._workers[pid] = (max(position, previous), now)
+            if self.changes_saved:
+                # A worker that stopped reporting (it exited, or gets no work) reloads if it falls behind
+                self._workers = {
+                    worker: state for worker, state in self._workers.items()
+                    if now - state[1] <= self.worker_timeout
+                }
+            elif len(self._workers) < self.workers:
+                return
+            self._drop_through(min(state[0] for state in self._workers.values()))
+
+    def _drop_through(self, position: int) -> None:
+        kept = [entry for entry in self._entries if entry[0] > position]
+        if len(kept) < len(self._entries):
+            self._dropped = self._entries[len(self._entries) - len(kept) - 1][:2]
+            self._entries = kept
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "position": self._position,
+                "pending": len(self._entries),
+                "dropped_through": self._dropped[0],
+                "workers": {pid: state[0] for pid, state in self._workers.items()},
+            }
+
+
+# --- Process-pool workers ---
+# With TALENT_MATCHER_EXECUTOR=process each worker process loads its own matcher
+# (embeddings come from the memory-mapped snapshot, so this is cheap after the
+# first start) and match requests are pickled to it. Tenants are loaded per worker.
+# Employee changes reach the workers through the main process's ChangeFeed.
+# Workers do not shard: process workers and TALENT_MATCHER_SHARDS are alternative
+# ways of using several cores. Role shortlists are served by the main process only.
+_worker_tenants = None
+_worker_position = 0
+_changes_saved = False
+_loaded_at = 0.0
+
+def init_worker():
+    """Process pool initializer: builds this worker's default TalentMatcherService and tenant registry."""
+    global _changes_saved
+    from app.core.config import settings
+
+    # The main process saves the changes; workers only replay them
+    _changes_saved = settings.TALENT_MATCHER_PERSIST_UPDATES
+    settings.TALENT_MATCHER_PERSIST_UPDATES = False
+    _load_worker()
+
+def _load_worker() -> None:
+    global _worker_tenants, _loaded_at
+    from app.agents.talent_matcher.service import TalentMatcherService
+
+    # Taken before reading the data: every change recorded earlier was saved before it
+    _loaded_at = time.time()
+    default_service = TalentMatcherService(shards=0, shortlists=False)
+    _worker_tenants = create_tenant_registry(lambda: default_service)
+
+def _catch_up(dropped) -> None:
+    """Reloads the saved data if the feed dropped changes this worker never applied."""
+    global _worker_position
+    position, recorded_at = dropped
+    if position <= _worker_position:
+        return
+    if _loaded_at < recorded_at:
+        logger.info(f"Worker {os.getpid()} fell behind the change feed (at {_worker_position}, "
+                    f"dropped through {position}); reloading the saved employee data")
+        _load_worker()
+    _worker_position = position
+
+def _apply_changes(changes) -> None:
+    global _worker_position
+    for position, _, tenant_id, op, payload in changes:
+        if position <= _worker_position:
+            continue
+        # A tenant this worker has not loaded will read the saved changes when it loads
+        if not _changes_saved or _worker_tenants.is_loaded(tenant_id):
+            service = _worker_tenants.get(tenant_id)
+            if op == "upsert":
+                service.upsert_employees(payload)
+            else:
+                service.delete_employees(payload)
+        _worker_position = position
+
+def match_in_worker(requests, tenant_id=None, changes=(), dropped=(0, 0.0)):
+    """
+    Matches a list of JobRequests for a tenant inside a worker process, after
+    catching up with the ChangeFeed (`dropped` and `changes` as returned by its
+    `pending`). Returns the matches, this worker's pid and its feed position.
+    """
+    _catch_up(dropped)
+    _apply_changes(changes)
+    return list(_worker_tenants.get(tenant_id).match_many(requests)), os.getpid(), _worker_position
@@ -1,4 +1,5 @@
 import json
+import os
 
 def load_employees(filepath: str):
     employees = []
@@ -6,3 +7,72 @@ def load_employees(filepath: str):
         for line in f:
             employees.append(json.loads(line))
     return employees
+
+def live_data_path(filepath: str) -> str:
+    """Where upserts/deletes to a data file are saved (employees.jsonl -> employees.live.jsonl); the file itself is never rewritten."""
+    root, ext = os.path.splitext(filepath)
+    return f"{root}.live{ext or '.jsonl'}"
+
+def change_log_path(filepath: str) -> str:
+    """Where upserts/deletes are appended until they are folded into the live file (employees.changes.jsonl)."""
+    root, ext = os.path.splitext(filepath)
+    return f"{root}.changes{ext or '.jsonl'}"
+
+def append_changes(filepath: str, upserts=(), deletes=()):
+    """Appends upserted records and deleted IDs to a change log, one JSON line each."""
+    with open(filepath, "a", encoding="utf-8") as f:
+        for record in upserts:
+            f.write(json.dumps({"upsert": record}) + "\n")
+        for employee_id in deletes:
+            f.write(json.dumps({"delete": employee_id}) + "\n")
+        f.flush()
+        os.fsync(f.fileno())
+
+def replay_changes(employees, filepath: str):
+    """
+    Applies a change log to employee records (which carry their Employee_ID).
+    Returns the resulting records and the number of changes applied.
+    """
+    if not os.path.exists(filepath):
+        return employees, 0
+    by_id = {emp["Employee_ID"]: emp for emp in employees}
+    changes = 0
+    with open(filepath, "r", encoding="utf-8") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            try:
+                change = json.loads(line)
+            except ValueError:
+                # A line cut short by a crash mid-write; nothing after it was acknowledged
+                break
+            if "upsert" in change:
+                record = change["upsert"]
+                by_id[record["Employee_ID"]] = record
+            else:
+                by_id.pop(change["delete"], None)
+            changes += 1
+    return list(by_id.values()), changes
+
+def count_changes(filepath: str) -> int:
+    """Number of changes in a change log (0 if there is none)."""
+    if not os.path.exists(filepath):
+        return 0
+    with open(filepath, "r", encoding="utf-8") as f:
+        return sum(1 for line in f if line.strip())
+
+def save_employees(filepath: str, employees):
+    """Atomically rewrites the JSONL data file with the given employee records."""
+    tmp_path = f"{filepath}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        for emp in employees:
+            f.write(json.dumps(emp) + "\n")
+    os.replace(tmp_path, filepath)
+
+def build_profile_text(emp: dict) -> str:
+    """Combines the fields of an employee profile that are embedded and keyword-matched."""
+    return f"{emp.get('title', '')} {', '.join(emp.get('skills', []))} {emp.get('Key_Credentials', '')}"
+
+def keyword_tokens(text: str) -> frozenset:
+    """Lower-cased words longer than three characters, as used for match reasons."""
+    return frozenset(word.lower().strip(',.:;') for word in text.split() if len(word) > 3)
@@ -0,0 +1,77 @@
+import base64
+import binascii
+import bisect
+import json
+from typing import Any, Optional
+
+import numpy as np
+
+
+class InvalidCursorError(ValueError):
+    """Raised for a cursor that is malformed or belongs to a different query."""
+
+
+class Ranking:
+    """
+    Every candidate passing a query's filters, in ranked order, for one store view.
+
+    Candidates are ordered by descending score with ties broken by employee
+    ID, so the order is total and a position can be found again from the
+    (score, employee_id) of the last candidate a client saw. Only the row
+    numbers, scores and IDs are kept; result dicts are built page by page.
+    """
+
+    def __init__(self, query_key: str, view: Any, rows: np.ndarray, scores: np.ndarray, employee_ids: np.ndarray,
+                 jd_keywords: frozenset, sparse_terms: Optional[list] = None):
+        order = np.lexsort((employee_ids, -scores))
+        self.query_key = query_key
+        self.view = view
+        self.rows = rows[order]
+        self.scores = scores[order]
+        self.employee_ids = employee_ids[order]
+        # What match reasons are computed from: JD keywords, or the JD's BM25 terms with hybrid retrieval
+        self.jd_keywords = jd_keywords
+        self.sparse_terms = sparse_terms
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def position_after(self, score: float, employee_id: str) -> int:
+        """Index of the first candidate ranked after (score, employee_id)."""
+        negated = -self.scores
+        lo = int(np.searchsorted(negated, -score, side="left"))
+        hi = int(np.searchsorted(negated, -score, side="right"))
+        return lo + bisect.bisect_right(self.employee_ids[lo:hi].tolist(), employee_id)
+
+    def cursor_after(self, position: int) -> str:
+        """Cursor for the page that starts after the candidate at `position`."""
+        return encode_cursor(self.query_key, float(self.scores[position]), str(self.employee_ids[position]))
+
+    def start_of(self, cursor: Optional[str]) -> int:
+        """Position of the first candidate of the page `cursor` points to (0 without a cursor)."""
+        if not cursor:
+            return 0
+        return self.position_after(*decode_cursor(cursor, self.query_key))
+
+
+def encode_cursor(query_key: str, score: float, employee_id: str) -> str:
+    """
+    An opaque cursor pointing just after the given candidate. Keyset cursors
+    stay valid when the directory changes between pages: the next page starts
+    after that candidate in the current ranking, so unchanged candidates are
+    neither repeated nor skipped.
+    """
+    payload = json.dumps({"q": query_key, "s": float(score).hex(), "id": employee_id}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str, query_key: str):
+    """Returns the (score, employee_id) a cursor points after, checking that it was issued for `query_key`."""
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        score, employee_id, key = float.fromhex(payload["s"]), str(payload["id"]), payload["q"]
+    except (binascii.Error, ValueError, KeyError, TypeError) as e:
+        raise InvalidCursorError(f"Invalid cursor: {e}")
+    if key != query_key:
+        raise InvalidCursorError("Cursor was issued for a different job description or filters")
+    return score, employee_id
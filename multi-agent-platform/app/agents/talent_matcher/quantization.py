@@ -0,0 +1,176 @@
+from typing import Optional, Tuple, Union
+
+import numpy as np
+
+PRECISIONS = ("float32", "float16", "int8")
+
+# Rows converted to float32 at a time while scoring a compact matrix
+SCORE_CHUNK_ROWS = 4096
+
+
+def quantize(vectors: np.ndarray, precision: str) -> Tuple[np.ndarray, Optional[np.ndarray]]:
+    """
+    Converts float32 row vectors to the given storage precision.
+
+    Returns (codes, scales). For "int8" each row is quantized symmetrically
+    with its own scale (max |value| / 127), so a row is recovered as
+    codes * scale; the other precisions have no scales.
+    """
+    vectors = np.asarray(vectors, dtype=np.float32)
+    if precision == "float32":
+        return vectors, None
+    if precision == "float16":
+        return vectors.astype(np.float16), None
+    if precision == "int8":
+        scales = np.abs(vectors).max(axis=1) / 127.0 if len(vectors) else np.empty(0, dtype=np.float32)
+        scales = np.where(scales == 0, 1.0, scales).astype(np.float32)
+        codes = np.clip(np.rint(vectors / scales[:, None]), -127, 127).astype(np.int8)
+        return codes, scales
+    raise ValueError(f"Unknown embedding precision: {precision}. Choose from: {', '.join(PRECISIONS)}")
+
+
+def _writable(array: Optional[np.ndarray]) -> bool:
+    return array is None or (not isinstance(array, np.memmap) and array.flags.writeable)
+
+
+class EmbeddingMatrix:
+    """
+    Row-major embedding matrix stored as float32, float16 or int8 (+ per-row scales).
+
+    Scoring runs directly on the compact codes, converting one chunk of rows
+    at a time, so the full float32 matrix is never materialised. An optional
+    float32 `full` matrix can be kept for re-scoring top candidates exactly;
+    when it comes from the memory-mapped snapshot it stays on disk and only
+    the re-scored rows are paged in.
+    """
+
+    def __init__(self, codes: np.ndarray, scales: Optional[np.ndarray] = None,
+                 full: Optional[np.ndarray] = None):
+        self.codes = codes
+        self.scales = scales
+        self.full = full
+
+    @classmethod
+    def from_float32(cls, vectors: np.ndarray, precision: str = "float32",
+                     keep_full: bool = False) -> "EmbeddingMatrix":
+        codes, scales = quantize(vectors, precision)
+        full = vectors if keep_full and precision != "float32" else None
+        return cls(codes, scales, full)
+
+    @property
+    def precision(self) -> str:
+        return self.codes.dtype.name
+
+    @property
+    def dim(self) -> int:
+        return self.codes.shape[1]
+
+    @property
+    def shape(self) -> Tuple[int, int]:
+        return self.codes.shape
+
+    @property
+    def nbytes(self) -> int:
+        """Bytes used by the compact representation used for scoring."""
+        return self.codes.nbytes + (0 if self.scales is None else self.scales.nbytes)
+
+    def __len__(self) -> int:
+        return len(self.codes)
+
+    def head(self, n: int) -> "EmbeddingMatrix":
+        """The first n rows, sharing memory with this matrix."""
+        return EmbeddingMatrix(
+            self.codes[:n],
+            None if self.scales is None else self.scales[:n],
+            None if self.full is None else self.full[:n],
+        )
+
+    def take(self, rows: np.ndarray) -> "EmbeddingMatrix":
+        """A compacted copy holding only `rows`."""
+        return EmbeddingMatrix(
+            np.ascontiguousarray(self.codes[rows]),
+            None if self.scales is None else self.scales[rows],
+            None if self.full is None else np.ascontiguousarray(self.full[rows]),
+        )
+
+    def vectors(self, rows: Union[np.ndarray, slice, list]) -> np.ndarray:
+        """float32 vectors for `rows` (exact if a full copy is kept, otherwise dequantized)."""
+        if self.full is not None:
+            return np.asarray(self.full[rows], dtype=np.float32)
+        vectors = np.asarray(self.codes[rows], dtype=np.float32)
+        if self.scales is not None:
+            vectors *= self.scales[rows][..., None]
+        return vectors
+
+    def dot(self, query: np.ndarray, rows: Optional[np.ndarray] = None) -> np.ndarray:
+        """Inner product of `query` with every row (or only `rows`)."""
+        if rows is not None:
+            return self._scale(self._as_float(self.codes[rows]) @ query, rows)
+        if self.precision == "float32":
+            return self.codes @ query
+        scores = np.empty(len(self), dtype=np.float32)
+        for start in range(0, len(self), SCORE_CHUNK_ROWS):
+            chunk = slice(start, start + SCORE_CHUNK_ROWS)
+            scores[chunk] = self._scale(self._as_float(self.codes[chunk]) @ query, chunk)
+        return scores
+
+    def dot_batch(self, queries: np.ndarray) -> np.ndarray:
+        """(n_queries, n_rows) inner products."""
+        if self.precision == "float32":
+            return queries @ self.codes.T
+        scores = np.empty((len(queries), len(self)), dtype=np.float32)
+        for start in range(0, len(self), SCORE_CHUNK_ROWS):
+            chunk = slice(start, start + SCORE_CHUNK_ROWS)
+            block = queries @ self._as_float(self.codes[chunk]).T
+            if self.scales is not None:
+                block *= self.scales[chunk]
+            scores[:, chunk] = block
+        return scores
+
+    def rescore(self, query: np.ndarray, rows: np.ndarray) -> np.ndarray:
+        """float32 scores for `rows`, using the full-precision copy when there is one."""
+        if self.full is None:
+            return self.dot(query, rows)
+        return np.asarray(self.full[rows], dtype=np.float32) @ query
+
+    def appended(self, start: int, vectors: np.ndarray) -> "EmbeddingMatrix":
+        """
+        Writes float32 `vectors` at row `start`, in place when there is spare
+        writable capacity, otherwise into a new buffer twice as large.
+        Returns the buffer matrix (callers publish `head(start + len(vectors))`).
+        """
+        end = start + len(vectors)
+        codes, scales = quantize(vectors, self.precision)
+        target = self
+        if end > len(self) or not (_writable(self.codes) and _writable(self.scales) and _writable(self.full)):
+            capacity = max(end, 2 * len(self), 1024)
+            target = EmbeddingMatrix(
+                _grown(self.codes, start, capacity),
+                None if self.scales is None else _grown(self.scales, start, capacity),
+                None if self.full is None else _grown(self.full, start, capacity),
+            )
+        target.codes[start:end] = codes
+        if target.scales is not None:
+            target.scales[start:end] = scales
+        if target.full is not None:
+            target.full[start:end] = vectors
+        return target
+
+    def _as_float(self, codes: np.ndarray) -> np.ndarray:
+        return codes if codes.dtype == np.float32 else codes.astype(np.float32)
+
+    def _scale(self, scores: np.ndarray, rows) -> np.ndarray:
+        return scores if self.scales is None else scores * self.scales[rows]
+
+
+def _grown(array: np.ndarray, start: int, capacity: int) -> np.ndarray:
+    grown = np.empty((capacity,) + array.shape[1:], dtype=array.dtype)
+    grown[:start] = array[:start]
+    return grown
+
+
+def as_matrix(embeddings) -> EmbeddingMatrix:
+    """Wraps a plain float32 array as an EmbeddingMatrix; EmbeddingMatrix instances pass through."""
+    if isinstance(embeddings, EmbeddingMatrix):
+        return embeddings
+    return EmbeddingMatrix(np.asarray(embeddings, dtype=np.float32))
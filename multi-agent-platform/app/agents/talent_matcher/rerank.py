@@ -0,0 +1,108 @@
+import logging
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from app.agents.talent_matcher.cache import LRUCache
+from app.agents.talent_matcher.snapshot import profile_hash
+
+logger = logging.getLogger("talent_matcher")
+
+# Weight of the newest measurement in the running per-pair latency estimate
+LATENCY_SMOOTHING = 0.2
+
+
+class CrossEncoderReranker:
+    """
+    Second-stage re-ranker: scores (JD, profile) pairs with a local cross-encoder.
+
+    The model is loaded on first use, so deployments that never re-rank pay
+    nothing for it. Pair scores are cached by (JD hash, profile hash), so
+    repeated searches only run inference for profiles they have not seen.
+
+    Uncached pairs are scored in batches of `batch_size`. With a latency
+    budget, a batch is only started if the running per-pair latency estimate
+    says it fits in what is left of the budget; otherwise scoring stops and
+    only the pairs scored so far are re-ranked.
+    """
+
+    def __init__(self, model_name: str, cache_size: int):
+        self.model_name = model_name
+        self.cache = LRUCache(cache_size)
+        self._model = None
+        self._load_lock = threading.Lock()
+        self._seconds_per_pair: Optional[float] = None
+        self.requests = 0
+        self.pairs_scored = 0
+        self.budget_exhausted = 0
+
+    @property
+    def model(self):
+        if self._model is None:
+            with self._load_lock:
+                if self._model is None:
+                    from sentence_transformers import CrossEncoder
+
+                    start = time.perf_counter()
+                    self._model = CrossEncoder(self.model_name)
+                    logger.info(f"Cross-encoder {self.model_name} loaded in {time.perf_counter() - start:.2f}s")
+        return self._model
+
+    def score(self, jd_text: str, jd_key: str, profile_texts: List[str], batch_size: int = 32,
+              budget_ms: Optional[float] = None) -> Tuple[np.ndarray, int]:
+        """
+        Cross-encoder scores for `profile_texts`, which must be in first-stage order.
+
+        Returns (scores, scored): only the first `scored` entries are valid. It
+        is len(profile_texts) unless the latency budget ran out, in which case
+        the remaining profiles keep their first-stage order after the scored ones.
+        """
+        start = time.perf_counter()
+        self.requests += 1
+        keys = [(jd_key, profile_hash(text, self.model_name)) for text in profile_texts]
+        scores = np.full(len(profile_texts), np.nan, dtype=np.float32)
+        for i, key in enumerate(keys):
+            cached = self.cache.get(key)
+            if cached is not None:
+                scores[i] = cached
+
+        missing = np.flatnonzero(np.isnan(scores))
+        for offset in range(0, len(missing), batch_size):
+            batch = missing[offset:offset + batch_size]
+            if budget_ms is not None and self._seconds_per_pair is not None:
+                remaining = budget_ms / 1000 - (time.perf_counter() - start)
+                if self._seconds_per_pair * len(batch) > remaining:
+                    self.budget_exhausted += 1
+                    logger.info(f"Re-rank budget of {budget_ms:.0f} ms exhausted after {offset} of {len(missing)} new pairs")
+                    break
+
+            batch_start = time.perf_counter()
+            batch_scores = np.asarray(
+                self.model.predict([(jd_text, profile_texts[i]) for i in batch], batch_size=len(batch), show_progress_bar=False),
+                dtype=np.float32,
+            )
+            per_pair = (time.perf_counter() - batch_start) / len(batch)
+            self._seconds_per_pair = per_pair if self._seconds_per_pair is None else (
+                LATENCY_SMOOTHING * per_pair + (1 - LATENCY_SMOOTHING) * self._seconds_per_pair
+            )
+            self.pairs_scored += len(batch)
+            for i, value in zip(batch, batch_scores):
+                scores[i] = value
+                self.cache.put(keys[i], float(value))
+
+        # Re-rank only the leading run of scored profiles; later ones keep first-stage order
+        unscored = np.flatnonzero(np.isnan(scores))
+        return scores, int(unscored[0]) if len(unscored) else len(scores)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "model": self.model_name,
+            "loaded": self._model is not None,
+            "requests": self.requests,
+            "pairs_scored": self.pairs_scored,
+            "budget_exhausted": self.budget_exhausted,
+            "ms_per_pair": (self._seconds_per_pair or 0.0) * 1000,
+            "pair_cache": self.cache.stats(),
+        }
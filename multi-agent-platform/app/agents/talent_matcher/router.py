@@ -1,12 +1,137 @@
-from fastapi import APIRouter, HTTPException
-from .schemas import JobRequest, TalentMatchApiResponse
-from .service import TalentMatcherService
+import csv
+import io
+import json
+import logging
+from typing import Literal, Optional
+from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import JSONResponse, StreamingResponse
+from .schemas import (
+    JobRequest,
+    RankingQuery,
+    MatchPageRequest,
+    MatchPageApiResponse,
+    RoleMatchRequest,
+    RoleMatchApiResponse,
+    TalentMatchApiResponse,
+    BatchJobRequest,
+    BatchTalentMatchApiResponse,
+    EmployeeUpsertRequest,
+    EmployeeDeleteRequest,
+    EmployeeMutationApiResponse,
+)
+from .lifecycle import ServiceLoader, NotReadyError, ChangeFeed, create_tenant_registry, init_worker, match_in_worker
+from .tenants import UnknownTenantError
+from .executor import BoundedExecutor, QueueFullError
+from app.core.config import settings
 
 router = APIRouter(tags=["Talent Matcher"])
-service = TalentMatcherService()
+logger = logging.getLogger("talent_matcher")
+
+# The service (model, data, index) is built in the background; the app starts
+# serving immediately and /ready reports progress. main.py starts the build on
+# startup, and the first request starts it if nothing else has.
+matcher = ServiceLoader()
+
+# Other tenants' matchers are loaded on first use and share the default one's models
+tenants = create_tenant_registry(matcher.get)
+
+TENANT_QUERY = Query(None, description="Tenant whose employee directory to use (the default directory if omitted)")
+
+# Matching is CPU-bound (encoding + scoring), so it runs on a bounded worker pool
+# instead of the event loop. When the pool's queue is full, requests get a 503.
+executor = BoundedExecutor(
+    kind=settings.TALENT_MATCHER_EXECUTOR,
+    max_workers=settings.TALENT_MATCHER_WORKERS,
+    max_queue=settings.TALENT_MATCHER_MAX_QUEUE,
+    initializer=init_worker if settings.TALENT_MATCHER_EXECUTOR == "process" else None,
+)
+
+# Worker processes hold their own copy of the index and replay employee changes
+# from this feed. With a shared store they switch to each newly published
+# generation by themselves, so the feed is not needed.
+change_feed = ChangeFeed(
+    settings.TALENT_MATCHER_WORKERS,
+    enabled=executor.kind == "process" and not settings.TALENT_MATCHER_SHARED_STORE,
+    changes_saved=settings.TALENT_MATCHER_PERSIST_UPDATES,
+    max_changes=settings.TALENT_MATCHER_CHANGE_FEED_SIZE,
+)
+
+# Jobs matched per executor task when streaming, so results flow while later jobs wait
+STREAM_CHUNK_JOBS = 16
+
+# Ranked candidates turned into result rows per write when exporting
+EXPORT_CHUNK_ROWS = 500
+
+EXPORT_CSV_COLUMNS = ["rank", "employee_id", "name", "title", "score", "experience_years", "reasons"]
+
+def _match_batch(tenant_id, jobs):
+    # Resolved on the worker thread, so loading a cold tenant never blocks the event loop
+    return list(tenants.get(tenant_id).match_many(jobs))
+
+async def run_matches(jobs, tenant_id: Optional[str] = None):
+    """
+    Matches `jobs` on the executor: in a worker process, or on a thread sharing this process's index.
+    Waits up to TALENT_MATCHER_READY_TIMEOUT for startup to finish, then raises NotReadyError.
+    """
+    await matcher.wait_ready(settings.TALENT_MATCHER_READY_TIMEOUT)
+    if executor.kind == "process":
+        dropped, changes = change_feed.pending()
+        matches, pid, position = await executor.run(match_in_worker, jobs, tenant_id, changes, dropped)
+        change_feed.acknowledge(pid, position)
+        return matches
+    return await executor.run(_match_batch, tenant_id, jobs)
+
+def _rank_batch(tenant_id, request):
+    service = tenants.get(tenant_id)
+    return service, service.rank(request)
+
+async def run_ranking(request: RankingQuery, tenant_id: Optional[str] = None):
+    """
+    Ranks the whole candidate pool for `request`. Returns (service, ranking).
+    Rankings are read page by page in this process, so with process workers
+    they are computed on a local executor thread rather than in a worker.
+    """
+    await matcher.wait_ready(settings.TALENT_MATCHER_READY_TIMEOUT)
+    return await executor.run(_rank_batch, tenant_id, request, local=True)
+
+def _upsert_batch(tenant_id, records):
+    with change_feed.write_lock:
+        result = tenants.get(tenant_id).upsert_employees(records)
+        # Send the records with the IDs they were stored under, so workers replay the same change
+        change_feed.record(tenant_id, "upsert", [
+            dict(record, Employee_ID=emp_id) for record, emp_id in zip(records, result["employee_ids"])
+        ])
+    return result
+
+def _delete_batch(tenant_id, employee_ids):
+    with change_feed.write_lock:
+        result = tenants.get(tenant_id).delete_employees(employee_ids)
+        if result["employee_ids"]:
+            change_feed.record(tenant_id, "delete", result["employee_ids"])
+    return result
+
+async def run_mutation(fn, tenant_id: Optional[str], *args):
+    """
+    Applies an employee upsert/delete on the executor, so updates share the
+    matcher's worker and queue limits (and its 503s). They always run in this
+    process, which owns the employee data, even with process workers.
+    """
+    await matcher.wait_ready(settings.TALENT_MATCHER_READY_TIMEOUT)
+    return await executor.run(fn, tenant_id, *args, local=True)
+
+def _unknown_tenant_error(e: UnknownTenantError) -> HTTPException:
+    return HTTPException(status_code=404, detail={"status": False, "data": [], "error": str(e)})
+
+def _busy_error(e: Exception) -> HTTPException:
+    logger.warning(f"Rejecting match request: {e}")
+    return HTTPException(
+        status_code=503,
+        detail={"status": False, "data": [], "error": str(e)},
+        headers={"Retry-After": "1"},
+    )
 
 @router.post("/match-job", response_model=TalentMatchApiResponse, summary="Match Employees to Job Description")
-async def match_job(request: JobRequest):
+async def match_job(request: JobRequest, tenant_id: Optional[str] = TENANT_QUERY):
     """
     Receives a job description (from JD Agent output), finds matching employee profiles, 
     and returns them wrapped in a standardized API response.
@@ -15,8 +140,8 @@ async def match_job(request: JobRequest):
     Optionally, you can override the degree and experience requirements.
     """
     try:
-        # Call the matching service to get a list of matched employees
-        matched_employees = service.match(request)
+        # Call the matching service (off the event loop) to get a list of matched employees
+        matched_employees = (await run_matches([request], tenant_id))[0]
         
         # Return the successful response structure
         return {
@@ -25,10 +150,12 @@ async def match_job(request: JobRequest):
             "message": f"Found {len(matched_employees)} matching candidates for {request.job_role}"
         }
 
+    except (QueueFullError, NotReadyError) as e:
+        raise _busy_error(e)
+    except UnknownTenantError as e:
+        raise _unknown_tenant_error(e)
     except Exception as e:
         # Log the error for debugging
-        import logging
-        logger = logging.getLogger("talent_matcher")
         logger.error(f"Error during job matching: {e}", exc_info=True)
         
         # Return a 500 error with details
@@ -41,7 +168,301 @@ async def match_job(request: JobRequest):
             }
         )
 
+@router.post("/match-role", response_model=RoleMatchApiResponse, summary="Match Employees to a Catalogue Role")
+async def match_role(request: RoleMatchRequest):
+    """
+    Returns the top candidates for a role from the JD Agent catalogue, straight
+    from its materialized shortlist (the role's template, default filters, the
+    default tenant). No JD is encoded and nothing is scored, so this answers
+    in microseconds. `shortlist` reports how far the list is behind employee
+    changes, which are merged in the background.
+    """
+    try:
+        service = await matcher.wait_ready(settings.TALENT_MATCHER_READY_TIMEOUT)
+    except NotReadyError as e:
+        raise _busy_error(e)
+    if service.shortlists is None:
+        raise HTTPException(
+            status_code=400,
+            detail={"status": False, "data": [], "error": "Role shortlists are disabled (TALENT_MATCHER_SHORTLIST_DEPTH=0 or a sharded directory)"}
+        )
+    try:
+        matches, staleness = service.shortlists.get(request.job_role, request.top_k)
+    except KeyError:
+        raise HTTPException(
+            status_code=404,
+            detail={"status": False, "data": [], "error": f"'{request.job_role}' is not a JD Agent catalogue role"}
+        )
+    return {
+        "status": True,
+        "data": matches,
+        "shortlist": staleness,
+        "message": f"Found {len(matches)} matching candidates for {request.job_role}"
+    }
+
+@router.post("/match-jobs", response_model=BatchTalentMatchApiResponse, summary="Match Employees to Several Job Descriptions")
+async def match_jobs(request: BatchJobRequest, stream: bool = False, tenant_id: Optional[str] = TENANT_QUERY):
+    """
+    Matches a batch of job descriptions in one call. All JDs are encoded together
+    and scored against the directory in one matrix operation.
+    
+    With `?stream=true` the response is NDJSON: one line per job, written as soon
+    as that job's results are ready, e.g.
+    {"index": 0, "job_role": "...", "matches": [...]}
+    Streamed jobs are matched in chunks of STREAM_CHUNK_JOBS.
+    """
+    if stream:
+        jobs = request.jobs
+        try:
+            # Match the first chunk before starting the response, so a full queue is still a 503
+            first = await run_matches(jobs[:STREAM_CHUNK_JOBS], tenant_id)
+        except (QueueFullError, NotReadyError) as e:
+            raise _busy_error(e)
+        except UnknownTenantError as e:
+            raise _unknown_tenant_error(e)
+        except Exception as e:
+            logger.error(f"Error during streamed batch matching: {e}", exc_info=True)
+            raise HTTPException(
+                status_code=500,
+                detail={"status": False, "data": [], "error": f"An internal server error occurred: {str(e)}"}
+            )
+
+        async def ndjson_lines():
+            index, chunk = 0, first
+            try:
+                while True:
+                    for matches in chunk:
+                        yield json.dumps({"index": index, "job_role": jobs[index].job_role, "matches": matches}) + "\n"
+                        index += 1
+                    if index >= len(jobs):
+                        break
+                    chunk = await run_matches(jobs[index:index + STREAM_CHUNK_JOBS], tenant_id)
+            except Exception as e:
+                logger.error(f"Error during streamed batch matching: {e}", exc_info=True)
+                yield json.dumps({"index": index, "error": f"An internal server error occurred: {str(e)}"}) + "\n"
+
+        return StreamingResponse(ndjson_lines(), media_type="application/x-ndjson")
+
+    try:
+        results = [
+            {"index": index, "job_role": job.job_role, "matches": matches}
+            for index, (job, matches) in enumerate(zip(request.jobs, await run_matches(request.jobs, tenant_id)))
+        ]
+        return {
+            "status": True,
+            "data": results,
+            "message": f"Matched {len(results)} job descriptions"
+        }
+    except (QueueFullError, NotReadyError) as e:
+        raise _busy_error(e)
+    except UnknownTenantError as e:
+        raise _unknown_tenant_error(e)
+    except Exception as e:
+        logger.error(f"Error during batch job matching: {e}", exc_info=True)
+        raise HTTPException(
+            status_code=500,
+            detail={"status": False, "data": [], "error": f"An internal server error occurred: {str(e)}"}
+        )
+
+@router.post("/match-job/page", response_model=MatchPageApiResponse, summary="Page Through All Matching Employees")
+async def match_job_page(request: MatchPageRequest, tenant_id: Optional[str] = TENANT_QUERY):
+    """
+    Returns one page of every candidate that passes the filters, in score order.
+
+    Pass the returned `next_cursor` as `cursor` to get the next page. Cursors
+    point after the last candidate of a page (by score and employee ID), so
+    they stay valid when employees are added or removed in between. The full
+    ranking is cached briefly, so later pages do not re-score the directory.
+    """
+    try:
+        service, ranking = await run_ranking(request, tenant_id)
+        page = service.match_page(ranking, request.cursor, request.page_size)
+        return {
+            "status": True,
+            "data": page,
+            "message": f"Returned {len(page['matches'])} of {page['total']} matching candidates for {request.job_role}"
+        }
+    except (QueueFullError, NotReadyError) as e:
+        raise _busy_error(e)
+    except UnknownTenantError as e:
+        raise _unknown_tenant_error(e)
+    except ValueError as e:
+        # Invalid cursors, and sharded deployments
+        raise HTTPException(status_code=400, detail={"status": False, "data": [], "error": str(e)})
+    except Exception as e:
+        logger.error(f"Error during paginated matching: {e}", exc_info=True)
+        raise HTTPException(
+            status_code=500,
+            detail={"status": False, "data": [], "error": f"An internal server error occurred: {str(e)}"}
+        )
+
+@router.post("/match-job/export", summary="Export All Matching Employees")
+async def export_matches(
+    request: RankingQuery,
+    format: Literal["ndjson", "csv"] = "ndjson",
+    limit: Optional[int] = Query(None, ge=1, description="Export only the best N candidates"),
+    tenant_id: Optional[str] = TENANT_QUERY,
+):
+    """
+    Streams every candidate that passes the filters, in score order, as NDJSON
+    (one match per line) or CSV. Rows are written in chunks of
+    EXPORT_CHUNK_ROWS as they are built, so neither the result list nor the
+    document is ever held in memory as a whole.
+    """
+    try:
+        service, ranking = await run_ranking(request, tenant_id)
+    except (QueueFullError, NotReadyError) as e:
+        raise _busy_error(e)
+    except UnknownTenantError as e:
+        raise _unknown_tenant_error(e)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail={"status": False, "data": [], "error": str(e)})
+    except Exception as e:
+        logger.error(f"Error during match export: {e}", exc_info=True)
+        raise HTTPException(
+            status_code=500,
+            detail={"status": False, "data": [], "error": f"An internal server error occurred: {str(e)}"}
+        )
+    end = len(ranking) if limit is None else min(limit, len(ranking))
+
+    def ndjson_lines():
+        for start in range(0, end, EXPORT_CHUNK_ROWS):
+            results = service.ranked_results(ranking, start, min(start + EXPORT_CHUNK_ROWS, end))
+            yield "".join(json.dumps(result) + "\n" for result in results)
+
+    def csv_rows():
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(EXPORT_CSV_COLUMNS)
+        for start in range(0, end, EXPORT_CHUNK_ROWS):
+            for rank, result in enumerate(service.ranked_results(ranking, start, min(start + EXPORT_CHUNK_ROWS, end)), start + 1):
+                writer.writerow([rank, result["employee_id"], result["name"], result["title"], result["score"],
+                                 result["experience_years"], "; ".join(result["reasons"])])
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+        if not end:
+            yield buffer.getvalue()
+
+    if format == "csv":
+        return StreamingResponse(
+            csv_rows(),
+            media_type="text/csv",
+            headers={"Content-Disposition": 'attachment; filename="matches.csv"'},
+        )
+    return StreamingResponse(ndjson_lines(), media_type="application/x-ndjson")
+
+@router.post("/employees/upsert", response_model=EmployeeMutationApiResponse, summary="Add or Update Employees")
+async def upsert_employees(request: EmployeeUpsertRequest, tenant_id: Optional[str] = TENANT_QUERY):
+    """
+    Adds new employee profiles or updates existing ones (matched by employee_id).
+    
+    Only profiles whose title, skills or credentials changed are re-encoded, and
+    the index is updated in place. Match requests running at the same time keep
+    using the previous version of the index until the update is published.
+    """
+    try:
+        result = await run_mutation(_upsert_batch, tenant_id, [employee.to_record() for employee in request.employees])
+        return {
+            "status": True,
+            "data": result,
+            "message": f"Upserted {len(result['employee_ids'])} employees"
+        }
+    except HTTPException:
+        raise
+    except (QueueFullError, NotReadyError) as e:
+        raise _busy_error(e)
+    except UnknownTenantError as e:
+        raise _unknown_tenant_error(e)
+    except Exception as e:
+        logger.error(f"Error during employee upsert: {e}", exc_info=True)
+        raise HTTPException(
+            status_code=500,
+            detail={"status": False, "error": f"An internal server error occurred: {str(e)}"}
+        )
+
+@router.post("/employees/delete", response_model=EmployeeMutationApiResponse, summary="Delete Employees")
+async def delete_employees(request: EmployeeDeleteRequest, tenant_id: Optional[str] = TENANT_QUERY):
+    """Removes employee profiles from the matcher by employee_id."""
+    try:
+        result = await run_mutation(_delete_batch, tenant_id, request.employee_ids)
+        return {
+            "status": True,
+            "data": result,
+            "message": f"Deleted {len(result['employee_ids'])} of {len(request.employee_ids)} employees"
+        }
+    except HTTPException:
+        raise
+    except (QueueFullError, NotReadyError) as e:
+        raise _busy_error(e)
+    except UnknownTenantError as e:
+        raise _unknown_tenant_error(e)
+    except Exception as e:
+        logger.error(f"Error during employee delete: {e}", exc_info=True)
+        raise HTTPException(
+            status_code=500,
+            detail={"status": False, "error": f"An internal server error occurred: {str(e)}"}
+        )
+
+@router.delete("/employees/{employee_id}", response_model=EmployeeMutationApiResponse, summary="Delete an Employee")
+async def delete_employee(employee_id: str, tenant_id: Optional[str] = TENANT_QUERY):
+    """Removes a single employee profile from the matcher."""
+    try:
+        result = await run_mutation(_delete_batch, tenant_id, [employee_id])
+        if not result["employee_ids"]:
+            raise HTTPException(
+                status_code=404,
+                detail={"status": False, "error": f"Employee '{employee_id}' not found"}
+            )
+        return {"status": True, "data": result, "message": f"Deleted employee {employee_id}"}
+    except HTTPException:
+        raise
+    except (QueueFullError, NotReadyError) as e:
+        raise _busy_error(e)
+    except UnknownTenantError as e:
+        raise _unknown_tenant_error(e)
+    except Exception as e:
+        logger.error(f"Error during employee delete: {e}", exc_info=True)
+        raise HTTPException(
+            status_code=500,
+            detail={"status": False, "error": f"An internal server error occurred: {str(e)}"}
+        )
+
+@router.get("/stats", summary="Talent Matcher Statistics")
+def stats():
+    """
+    Returns runtime statistics for the executor, caches, tenants, shards, role
+    shortlists and change feed. The service parts are omitted while it is still starting.
+    """
+    data = {"executor": executor.stats()}
+    if change_feed.enabled:
+        data["change_feed"] = change_feed.stats()
+    if matcher.ready:
+        service = matcher.get()
+        data.update({
+            "encoder": service.encoder.stats(),
+            "jd_embedding_cache": service.jd_cache.stats(),
+            "result_cache": service.result_cache.stats(),
+            "reranker": service.reranker.stats(),
+            "tenants": tenants.stats(),
+        })
+        if service.shards is not None:
+            data["shards"] = service.shards.stats()
+        if service.shortlists is not None:
+            data["shortlists"] = service.shortlists.stats()
+    return {"status": True, "data": data}
+
+@router.get("/ready", summary="Readiness Check")
+def readiness_check():
+    """
+    Readiness probe: 200 once the model and index are loaded, otherwise 503.
+    The body reports the current startup phase, the time each finished phase
+    took, encoding progress and, if startup failed, the error.
+    """
+    status = matcher.status()
+    return JSONResponse(status_code=200 if status["ready"] else 503, content={"status": status["ready"], "data": status})
+
 @router.get("/health", summary="Health Check")
 def health_check():
-    """Returns a simple status to confirm the talent matcher is running."""
+    """Liveness check: answers as soon as the app is up, even while the matcher is still loading."""
     return {"status": "ok", "agent": "Talent Matcher"}
\ No newline at end of file
@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field, field_validator
-from typing import List, Optional, Union, Dict, Any
+from typing import List, Literal, Optional, Union, Dict, Any
 
 class JobDescriptionDetail(BaseModel):
     """Schema for the detailed job description structure from JD Agent."""
@@ -13,14 +13,35 @@ class JobDescriptionDetail(BaseModel):
     desired_attributes: str
     benefits: str
 
-class JobRequest(BaseModel):
-    """Schema for the incoming job matching request - accepts JD Agent output in multiple formats."""
+class CandidateFilters(BaseModel):
+    """
+    Structured pre-filters applied to the employee directory before ranking.
+    Every predicate that is set must hold (they are combined with AND).
+    """
+    min_experience: Optional[int] = Field(None, ge=0, description="Minimum years of experience (inclusive)")
+    max_experience: Optional[int] = Field(None, ge=0, description="Maximum years of experience (inclusive)")
+    min_degree: Optional[str] = Field(None, description="Lowest accepted degree, e.g. 'Bachelor', 'Master', 'PhD'")
+    must_have_skills: List[str] = Field(default_factory=list, description="Candidates must have all of these skills")
+    any_of_skills: List[str] = Field(default_factory=list, description="Candidates must have at least one of these skills")
+    title_contains: Optional[str] = Field(None, description="Case-insensitive substring of the current job title")
+
+class RerankOptions(BaseModel):
+    """Second-stage re-ranking of the first-stage candidates with a cross-encoder."""
+    top_n: int = Field(20, ge=1, le=200, description="Number of first-stage candidates to re-rank")
+    batch_size: int = Field(32, ge=1, le=256, description="(JD, profile) pairs per cross-encoder forward pass")
+    budget_ms: Optional[float] = Field(None, gt=0, description="Latency budget; candidates not scored in time keep their first-stage order")
+
+class RankingQuery(BaseModel):
+    """A job description and the criteria candidates are filtered by; the base of every match request."""
     job_role: str = Field(..., description="The job role title")
     job_description: Union[JobDescriptionDetail, Dict[str, Any]] = Field(..., description="Detailed job description from JD Agent")
     
     # Optional overrides if you want to customize matching criteria
     required_degree: Optional[str] = Field(None, description="Override degree requirement (extracted from job_description if not provided)")
     min_years_experience: Optional[int] = Field(None, description="Override minimum years (extracted from job_description if not provided)")
+    filters: Optional[CandidateFilters] = Field(None, description="Additional structured filters (skills, title, experience range)")
+    min_score: Optional[float] = Field(None, ge=-1.0, le=1.0, description="Drop candidates whose similarity score (the fused score with hybrid retrieval) is below this value")
+    skills_filter: Optional[Literal["all", "any"]] = Field(None, description="Also filter on the skills recognised in job_description.required_skills: 'all' adds them to must_have_skills, 'any' to any_of_skills")
     
     @field_validator("job_description", mode="before")
     @classmethod
@@ -34,6 +55,16 @@ class JobRequest(BaseModel):
             return JobDescriptionDetail(**value)
         return value
 
+class JobRequest(RankingQuery):
+    """Schema for the incoming job matching request - accepts JD Agent output in multiple formats."""
+    top_k: int = Field(5, ge=1, le=100, description="Maximum number of candidates to return")
+    rerank: Optional[RerankOptions] = Field(None, description="Re-rank the top candidates with a cross-encoder")
+
+class MatchPageRequest(RankingQuery):
+    """Schema for one page of the full ranked candidate pool."""
+    page_size: int = Field(50, ge=1, le=500, description="Number of candidates per page")
+    cursor: Optional[str] = Field(None, description="next_cursor from the previous page; omit for the first page")
+
 class MatchResponse(BaseModel):
     """Schema for a single employee match."""
     employee_id: str
@@ -42,6 +73,7 @@ class MatchResponse(BaseModel):
     score: float
     experience_years: int
     reasons: List[str]
+    rerank_score: Optional[float] = None
 
     class Config:
         from_attributes = True
@@ -50,4 +82,96 @@ class TalentMatchApiResponse(BaseModel):
     """The final, wrapped API response schema."""
     status: bool
     data: List[MatchResponse]
-    message: Optional[str] = None
\ No newline at end of file
+    message: Optional[str] = None
+
+class MatchPage(BaseModel):
+    """One page of ranked candidates."""
+    matches: List[MatchResponse]
+    total: int = Field(..., description="Candidates in the whole ranking")
+    next_cursor: Optional[str] = Field(None, description="Cursor for the next page; null on the last page")
+
+class MatchPageApiResponse(BaseModel):
+    """The wrapped API response for a page of matches."""
+    status: bool
+    data: MatchPage
+    message: Optional[str] = None
+
+class RoleMatchRequest(BaseModel):
+    """Schema for matching a JD Agent catalogue role from its precomputed shortlist."""
+    job_role: str = Field(..., description="A role from the JD Agent catalogue (ROLE_FILE_MAP)")
+    top_k: int = Field(5, ge=1, le=100, description="Maximum number of candidates to return")
+
+class ShortlistStatus(BaseModel):
+    """How up to date a role shortlist is with the employee index."""
+    shortlist_version: int = Field(..., description="Employee index version the shortlist reflects")
+    index_version: int = Field(..., description="Current employee index version")
+    stale: bool = Field(..., description="Whether employee changes are not reflected yet")
+    pending_updates: int = Field(..., description="Employee updates waiting to be merged in")
+    age_seconds: float = Field(..., description="Seconds since the shortlists were last refreshed")
+    lag_seconds: float = Field(..., description="Seconds since the oldest change not reflected yet (0 when up to date)")
+
+class RoleMatchApiResponse(BaseModel):
+    """The wrapped API response for a catalogue role match."""
+    status: bool
+    data: List[MatchResponse]
+    shortlist: ShortlistStatus
+    message: Optional[str] = None
+
+class BatchJobRequest(BaseModel):
+    """Schema for matching several job descriptions in one call."""
+    jobs: List[JobRequest] = Field(..., min_length=1, max_length=200, description="The job descriptions to match")
+
+class JobMatchResult(BaseModel):
+    """The matches for one job in a batch request."""
+    index: int
+    job_role: str
+    matches: List[MatchResponse]
+
+class BatchTalentMatchApiResponse(BaseModel):
+    """The wrapped API response for batch matching."""
+    status: bool
+    data: List[JobMatchResult]
+    message: Optional[str] = None
+
+class EmployeeProfile(BaseModel):
+    """Schema for an employee profile sent to the talent matcher's upsert endpoint."""
+    employee_id: Optional[str] = Field(None, description="Stable employee ID. A new ID is assigned when omitted.")
+    name: str
+    title: str
+    skills: List[str] = Field(default_factory=list)
+    key_credentials: str = Field("", description="Highest qualification, e.g. 'Master of Science'")
+    experience_years: int = 0
+
+    def to_record(self) -> Dict[str, Any]:
+        """Converts the profile to the record format used in data/employees.jsonl."""
+        record = {
+            "name": self.name,
+            "title": self.title,
+            "skills": self.skills,
+            "Key_Credentials": self.key_credentials,
+            "experience_years": self.experience_years,
+        }
+        if self.employee_id:
+            record["Employee_ID"] = self.employee_id
+        return record
+
+class EmployeeUpsertRequest(BaseModel):
+    """Schema for a batch of employee inserts/updates."""
+    employees: List[EmployeeProfile] = Field(..., min_length=1)
+
+class EmployeeDeleteRequest(BaseModel):
+    """Schema for a batch of employee deletions."""
+    employee_ids: List[str] = Field(..., min_length=1)
+
+class EmployeeMutationResult(BaseModel):
+    """Outcome of an upsert or delete batch."""
+    employee_ids: List[str]
+    index_version: int
+    total_employees: int
+    encoded: int = 0
+
+class EmployeeMutationApiResponse(BaseModel):
+    """The wrapped API response for employee upserts and deletes."""
+    status: bool
+    data: EmployeeMutationResult
+    message: Optional[str] = None
@@ -1,71 +1,299 @@
-import re
-from sentence_transformers import SentenceTransformer
-from sklearn.metrics.pairwise import cosine_similarity
-from app.agents.talent_matcher.loader import load_employees 
+import os
+import threading
+import numpy as np
+from app.core.config import settings
+from app.agents.talent_matcher.loader import (
+    load_employees, save_employees, live_data_path, change_log_path, append_changes, replay_changes, count_changes,
+    build_profile_text, keyword_tokens,
+)
+from app.agents.talent_matcher.index import create_index, normalize_rows, top_k
+from app.agents.talent_matcher.quantization import EmbeddingMatrix
+from app.agents.talent_matcher.snapshot import data_digest, load_or_build_embeddings, load_snapshot_employees
+from app.agents.talent_matcher.store import COMPACTION_RATIO, MIN_COMPACTION_ROWS, EmployeeStore
+from app.agents.talent_matcher.shards import ShardPool
+from app.agents.talent_matcher.shared_store import SharedSnapshotStore, publish_lock
+from app.agents.talent_matcher.shortlists import RoleShortlists, catalogue_roles
+from app.agents.talent_matcher.batcher import EncodeBatcher
+from app.agents.talent_matcher.cache import LRUCache, jd_hash
+from app.agents.talent_matcher.pagination import Ranking
+from app.agents.talent_matcher.embedding import load_embedding_model
+from app.agents.talent_matcher.extractor import DEFAULT_MIN_DEGREE, SkillExtractor
+from app.agents.talent_matcher.rerank import CrossEncoderReranker
+from app.agents.talent_matcher.sparse import FUSION_METHODS, fuse, hybrid_candidates, prune_mask, query_terms
+from app.agents.talent_matcher.schemas import CandidateFilters
+
+# Keywords that are listed first in the match reasons
+IMPORTANT_KEYWORDS = frozenset([
+    'python', 'sql', 'power', 'data', 'analysis', 'excel',
+    'tableau', 'visualization', 'machine', 'learning', 'aws',
+    'azure', 'cloud', 'java', 'javascript', 'react', 'node',
+])
+
+# Profiles encoded per call at startup, so progress can be reported between calls
+STARTUP_ENCODE_CHUNK = 1024
+
+# Candidates scored per call when ranking the whole pool, to bound temporary copies
+RANK_CHUNK_ROWS = 65536
 
 class TalentMatcherService:
-    def __init__(self):
+    def __init__(self, index_type: str = None, progress=None, data_path: str = None,
+                 snapshot_dir: str = None, shared: "TalentMatcherService" = None, shards: int = None,
+                 shortlists: bool = None):
         """
         Initializes the service, loads employee data, and pre-computes
         all employee profile embeddings for performance.
+
+        Index, precision, backend, retrieval, sharding and shortlist options
+        come from the TALENT_MATCHER_* settings (see doc.md); `index_type`,
+        `shards` and `shortlists` override theirs. `data_path` / `snapshot_dir`
+        default to the configured ones; tenants pass their own, plus `shared`
+        (the default service) to reuse its models and caches. `progress(phase,
+        done=0, total=0)` is called as startup moves through its phases.
         """
-        # 1. Initialize the model
-        self.model = SentenceTransformer("all-MiniLM-L6-v2")
-        self.employees = load_employees("data/employees.jsonl")
-        
-        # 2. Pre-process employee data
-        all_profile_texts = []
-        for i, emp in enumerate(self.employees):
-            # Add a unique STRING ID to satisfy the response schema
-            emp["Employee_ID"] = str(i + 1)
-            
-            # Combine relevant fields into a single string for embedding
-            profile_text = f"{emp.get('title', '')} {', '.join(emp.get('skills', []))} {emp.get('Key_Credentials', '')}"
-            all_profile_texts.append(profile_text)
-
-        # 3. Pre-compute all employee embeddings in a single batch operation (very fast)
-        self.employee_embeddings = self.model.encode(all_profile_texts, show_progress_bar=False)
+        progress = progress or (lambda phase, done=0, total=0: None)
+
+        # 1. Load employee data
+        progress("data load")
+        self.data_path = data_path or settings.TALENT_MATCHER_DATA_PATH
+        # Saved upserts/deletes take the place of the (read-only) seed file: the live file,
+        # plus the log of changes made since it was last rewritten
+        self.live_path = live_data_path(self.data_path)
+        self.log_path = change_log_path(self.data_path)
+        source_path = self.live_path if os.path.exists(self.live_path) else self.data_path
+        snapshot_dir = settings.TALENT_MATCHER_SNAPSHOT_DIR if snapshot_dir is None else snapshot_dir
+        # A snapshot built from this exact data already holds the records, IDs included
+        source_digest = data_digest(source_path, self.log_path) if snapshot_dir else None
+        employees = load_snapshot_employees(snapshot_dir, source_digest)
+        if employees is None:
+            employees = load_employees(source_path)
+            for i, emp in enumerate(employees):
+                # Keep a stored STRING ID if there is one, otherwise fall back to the row number
+                emp["Employee_ID"] = str(emp.get("Employee_ID") or i + 1)
+            employees, self._logged_changes = replay_changes(employees, self.log_path)
+        else:
+            self._logged_changes = count_changes(self.log_path)
+
+        # 2. Pre-process employee data: combine relevant fields into a single string for embedding
+        all_profile_texts = [build_profile_text(emp) for emp in employees]
+
+        # 3. Initialize the model on the configured backend (a new ONNX export is
+        #    checked against PyTorch on a sample of the profiles), or share the default service's
+        progress("model load")
+        if shared is not None:
+            self.model_name, self.model, self.model_id = shared.model_name, shared.model, shared.model_id
+            self.encoder, self.jd_cache, self.reranker = shared.encoder, shared.jd_cache, shared.reranker
+            self.extractor = shared.extractor
+        else:
+            self.model_name = settings.TALENT_MATCHER_MODEL
+            self.model, self.model_id = load_embedding_model(
+                self.model_name,
+                backend=settings.TALENT_MATCHER_BACKEND,
+                onnx_dir=settings.TALENT_MATCHER_ONNX_DIR,
+                quantization=settings.TALENT_MATCHER_ONNX_QUANTIZATION,
+                intra_op_threads=settings.TALENT_MATCHER_INTRA_OP_THREADS,
+                inter_op_threads=settings.TALENT_MATCHER_INTER_OP_THREADS,
+                tolerance=settings.TALENT_MATCHER_BACKEND_TOLERANCE,
+                sample_texts=all_profile_texts,
+            )
+            print(f"🧠 Embedding model loaded: {self.model_id}")
+            self.encoder = EncodeBatcher(
+                lambda texts: self.model.encode(texts, show_progress_bar=False),
+                max_batch_size=settings.TALENT_MATCHER_ENCODE_BATCH_SIZE,
+                max_wait_ms=settings.TALENT_MATCHER_ENCODE_MAX_WAIT_MS,
+            )
+            self.jd_cache = LRUCache(settings.TALENT_MATCHER_JD_CACHE_SIZE, settings.TALENT_MATCHER_JD_CACHE_TTL)
+            self.reranker = CrossEncoderReranker(settings.TALENT_MATCHER_RERANK_MODEL, settings.TALENT_MATCHER_RERANK_CACHE_SIZE)
+            self.extractor = SkillExtractor.from_file(settings.TALENT_MATCHER_SKILL_TAXONOMY)
+        self.result_cache = LRUCache(settings.TALENT_MATCHER_RESULT_CACHE_SIZE, settings.TALENT_MATCHER_RESULT_CACHE_TTL)
+        self.ranking_cache = LRUCache(settings.TALENT_MATCHER_RANKING_CACHE_SIZE, settings.TALENT_MATCHER_RANKING_CACHE_TTL)
+        self._result_cache_version = 0
+
+        # 4. Load or pre-compute all employee embeddings (L2-normalised, so the index
+        #    can score with a plain inner product). Unchanged profiles come from the
+        #    snapshot, which is keyed by the model *and* backend.
+        progress("encode")
+        self.shared_store = settings.TALENT_MATCHER_SHARED_STORE
+        if self.shared_store and not snapshot_dir:
+            raise ValueError("TALENT_MATCHER_SHARED_STORE needs a TALENT_MATCHER_SNAPSHOT_DIR to publish into")
+
+        def encode_with_progress(texts):
+            chunks = []
+            for start in range(0, len(texts), STARTUP_ENCODE_CHUNK):
+                progress("encode", start, len(texts))
+                chunks.append(self._encode_profiles(texts[start:start + STARTUP_ENCODE_CHUNK]))
+            progress("encode", len(texts), len(texts))
+            if not chunks:
+                # An empty directory still needs the model's dimension for the rows added later
+                return np.empty((0, self._encode_profiles([""]).shape[1]), dtype=np.float32)
+            return np.concatenate(chunks)
+
+        if self.shared_store:
+            # One worker at a time refreshes the shared generation; the rest then find it up to date
+            with publish_lock(snapshot_dir):
+                employee_embeddings = load_or_build_embeddings(
+                    snapshot_dir, self.model_id, employees, all_profile_texts, encode_with_progress,
+                    precision=settings.TALENT_MATCHER_PRECISION, source_digest=source_digest,
+                )
+        else:
+            employee_embeddings = load_or_build_embeddings(
+                snapshot_dir, self.model_id, employees, all_profile_texts, encode_with_progress,
+                source_digest=source_digest,
+            )
         print("✅ Employee profiles pre-computed successfully.")
 
-    def _extract_degree_from_jd(self, job_description) -> str:
+        # 5. Convert to the configured storage precision
+        self.rescore_factor = settings.TALENT_MATCHER_RESCORE_FACTOR
+        self.retrieval = settings.TALENT_MATCHER_RETRIEVAL
+        if self.retrieval not in ("dense", "hybrid"):
+            raise ValueError(f"Unknown retrieval mode: {self.retrieval}. Choose from: dense, hybrid")
+        if settings.TALENT_MATCHER_FUSION not in FUSION_METHODS:
+            raise ValueError(f"Unknown fusion method: {settings.TALENT_MATCHER_FUSION}. Choose from: {', '.join(FUSION_METHODS)}")
+        shards = settings.TALENT_MATCHER_SHARDS if shards is None else shards
+        if shards > 1 and self.shared_store:
+            raise ValueError("TALENT_MATCHER_SHARDS and TALENT_MATCHER_SHARED_STORE cannot be combined")
+        if shards > 1 and self.retrieval == "hybrid":
+            raise ValueError("Hybrid retrieval needs directory-wide BM25 statistics and cannot be sharded; "
+                             "set TALENT_MATCHER_RETRIEVAL=dense or TALENT_MATCHER_SHARDS=0")
+
+        # 6. Build the employee store and its vector index over the embeddings,
+        #    or hand the embeddings to the shard worker processes
+        progress("index build")
+        index_type = index_type or settings.TALENT_MATCHER_INDEX
+        index_options = {}
+        if index_type == "ivf":
+            index_options = {"nlist": settings.TALENT_MATCHER_IVF_NLIST, "nprobe": settings.TALENT_MATCHER_IVF_NPROBE}
+        self.store, self.shards = None, None
+        if shards > 1:
+            self.shards = ShardPool(
+                employees, employee_embeddings, shards, settings.TALENT_MATCHER_PRECISION,
+                self.rescore_factor, index_type, index_options,
+            )
+            print(f"🧩 Employees split over {shards} shard processes: {self.shards.sizes}")
+        elif self.shared_store:
+            self.store = SharedSnapshotStore(
+                snapshot_dir, self.model_id, settings.TALENT_MATCHER_PRECISION, self.rescore_factor > 0,
+                lambda: create_index(index_type, **index_options), on_publish=self._save_live,
+            )
+            print(f"🔗 Attached to shared snapshot generation {self.store.generation}")
+        else:
+            matrix = EmbeddingMatrix.from_float32(
+                employee_embeddings, settings.TALENT_MATCHER_PRECISION, keep_full=self.rescore_factor > 0
+            )
+            float32_bytes = len(matrix) * matrix.dim * 4
+            print(f"💾 Embeddings stored as {matrix.precision}: {matrix.nbytes / 2**20:.1f} MiB "
+                  f"({100 * (1 - matrix.nbytes / max(1, float32_bytes)):.0f}% smaller than float32)")
+            self.store = EmployeeStore(employees, matrix, lambda: create_index(index_type, **index_options))
+        self._write_lock = threading.Lock()
+
+        # 7. Materialize the catalogue roles' shortlists
+        self.shortlists = None
+        if shortlists is None:
+            shortlists = settings.TALENT_MATCHER_SHORTLIST_DEPTH > 0
+        if shortlists and shared is None and self.store is not None:
+            progress("shortlists")
+            self.shortlists = RoleShortlists(
+                self, catalogue_roles(), settings.TALENT_MATCHER_SHORTLIST_DEPTH, settings.TALENT_MATCHER_SHORTLIST_BUFFER
+            )
+            print(f"📌 Materialized shortlists for {len(self.shortlists.roles)} catalogue roles")
+
+    def memory_bytes(self) -> int:
         """
-        Extracts degree requirement from job description.
-        Looks in minimum_qualification field.
+        Approximate resident size of this service's employee data: the
+        embedding matrix (plus a float32 copy held in memory for re-scoring)
+        and about 1 KiB per row for the index, filter columns and profiles.
+        Memory-mapped snapshot data is not counted, nor are shard processes.
         """
-        qualification = job_description.minimum_qualification.lower()
-        
-        # Check for common degree types
-        if "master" in qualification or "m.s." in qualification or "msc" in qualification:
-            return "Master"
-        elif "bachelor" in qualification or "b.s." in qualification or "bsc" in qualification or "b.tech" in qualification:
-            return "Bachelor"
-        elif "phd" in qualification or "doctorate" in qualification:
-            return "PhD"
-        
-        return "Bachelor"  # Default fallback
+        if self.shards is not None:
+            return 0
+        view = self.store.view
+        embeddings = view.embeddings
+        full = embeddings.full
+        full_bytes = 0 if full is None or isinstance(full, np.memmap) else full.nbytes
+        return embeddings.nbytes + full_bytes + 1024 * len(view.employees)
+
+    def close(self) -> None:
+        """Stops the shard worker processes and the shortlist refresher, if any."""
+        if self.shards is not None:
+            self.shards.shutdown()
+        if self.shortlists is not None:
+            self.shortlists.close()
 
-    def _extract_experience_from_jd(self, job_description) -> int:
+    def _encode_profiles(self, texts):
+        return self.model.encode(texts, show_progress_bar=False)
+
+    def upsert_employees(self, records) -> dict:
         """
-        Extracts minimum years of experience from job description.
-        Looks in key_skills_and_qualifications and overview fields.
+        Inserts or updates employee profiles without rebuilding the index.
+        Only profiles whose embedded text changed are re-encoded.
         """
-        # Combine relevant fields
-        text = f"{job_description.key_skills_and_qualifications} {job_description.overview}".lower()
-        
-        # Look for patterns like "5+ years", "5 years", "minimum of 5 years"
-        patterns = [
-            r'minimum\s+of\s+(\d+)\s*\+?\s*years',
-            r'(\d+)\s*\+\s*years',
-            r'(\d+)\s+years',
-            r'at least\s+(\d+)\s*years'
-        ]
-        
-        for pattern in patterns:
-            match = re.search(pattern, text)
-            if match:
-                return int(match.group(1))
-        
-        return 0  # Default to 0 if no experience specified
+        if self.shards is not None:
+            return self._upsert_sharded(records)
+        with self._write_lock:
+            view, ids, encoded = self.store.upsert(records, self._encode_profiles)
+            if self.shortlists is not None:
+                self.shortlists.notify(view, ids)
+            if not self.shared_store:
+                # A shared store persists while it holds the publish lock
+                self._persist(upserts=[view.employees[view.id_to_row[emp_id]] for emp_id in dict.fromkeys(ids)])
+        print(f"✅ Upserted {len(records)} employees ({encoded} re-encoded), index version {view.version}")
+        return {"employee_ids": ids, "encoded": encoded, "index_version": view.version, "total_employees": view.size}
+
+    def _upsert_sharded(self, records) -> dict:
+        """Upserts into the shard processes; the coordinator keeps no profile texts, so every record is encoded."""
+        with self._write_lock:
+            vectors = normalize_rows(self._encode_profiles([build_profile_text(record) for record in records]))
+            ids = self.shards.upsert(records, vectors)
+            self._persist(upserts=[dict(record, Employee_ID=emp_id) for record, emp_id in zip(records, ids)])
+        print(f"✅ Upserted {len(records)} employees across shards, index version {self.shards.version}")
+        return {"employee_ids": ids, "encoded": len(records), "index_version": self.shards.version,
+                "total_employees": self.shards.size}
+
+    def delete_employees(self, employee_ids) -> dict:
+        """Removes employee profiles from the matcher."""
+        employee_ids = [str(emp_id) for emp_id in employee_ids]
+        if self.shards is not None:
+            with self._write_lock:
+                deleted = self.shards.delete(employee_ids)
+                if deleted:
+                    self._persist(deletes=deleted)
+            print(f"🗑️ Deleted {len(deleted)} employees across shards, index version {self.shards.version}")
+            return {"employee_ids": deleted, "index_version": self.shards.version, "total_employees": self.shards.size}
+        with self._write_lock:
+            view, deleted = self.store.delete(employee_ids)
+            if deleted and self.shortlists is not None:
+                self.shortlists.notify(view, deleted)
+            if deleted and not self.shared_store:
+                self._persist(deletes=deleted)
+        print(f"🗑️ Deleted {len(deleted)} employees, index version {view.version}")
+        return {"employee_ids": deleted, "index_version": view.version, "total_employees": view.size}
+
+    def _persist(self, upserts=(), deletes=()) -> None:
+        """
+        Saves changes (and their IDs) so they survive a restart. They are appended
+        to the change log, which is folded into the live file once it outgrows
+        the store's compaction threshold, so an edit costs O(changed records).
+        """
+        if not settings.TALENT_MATCHER_PERSIST_UPDATES:
+            return
+        append_changes(self.log_path, upserts, deletes)
+        self._logged_changes += len(upserts) + len(deletes)
+        total = self.shards.size if self.shards is not None else self.store.view.size
+        if self._logged_changes >= MIN_COMPACTION_ROWS and self._logged_changes > COMPACTION_RATIO * total:
+            live = self.shards.live_employees() if self.shards is not None else self.store.view.live_employees()
+            self._save_live(live)
+
+    def _save_live(self, employees) -> None:
+        """
+        Rewrites the live file with every profile and drops the change log. A
+        shared store calls this on each publish, as it writes a whole new snapshot generation anyway.
+        """
+        if not settings.TALENT_MATCHER_PERSIST_UPDATES:
+            return
+        save_employees(self.live_path, employees)
+        # Replaying a log the live file already contains is harmless, so a crash between the two is safe
+        if os.path.exists(self.log_path):
+            os.remove(self.log_path)
+        self._logged_changes = 0
 
     def _create_comprehensive_jd_text(self, job_description) -> str:
         """
@@ -83,79 +311,376 @@ class TalentMatcherService:
         Desired Attributes: {job_description.desired_attributes}
         """
 
+    def _resolve_filters(self, request) -> CandidateFilters:
+        """
+        Combines the request's structured filters with the degree and experience
+        requirements (explicit overrides first, otherwise extracted from the JD).
+
+        Skills are canonicalised through the skill taxonomy ("k8s" → "Kubernetes"),
+        and with `skills_filter` the skills recognised in the JD's required_skills
+        are added to must_have_skills ("all") or any_of_skills ("any").
+        """
+        filters = request.filters.model_copy() if request.filters else CandidateFilters()
+        needs_jd = (
+            (not filters.min_degree and not request.required_degree)
+            or (filters.min_experience is None and request.min_years_experience is None)
+            or request.skills_filter
+        )
+        # One pass over the JD fields extracts everything that is not given explicitly
+        requirements = self.extractor.extract_jd(request.job_description) if needs_jd else None
+
+        if not filters.min_degree:
+            filters.min_degree = request.required_degree or requirements.degree or DEFAULT_MIN_DEGREE
+        if filters.min_experience is None:
+            if request.min_years_experience is not None:
+                filters.min_experience = request.min_years_experience
+            else:
+                filters.min_experience = requirements.min_experience or 0
+
+        must_have, any_of = filters.must_have_skills, filters.any_of_skills
+        if request.skills_filter == "all":
+            must_have = must_have + requirements.skills
+        elif request.skills_filter == "any":
+            any_of = any_of + requirements.skills
+        filters.must_have_skills = self.extractor.canonical_skills(must_have)
+        filters.any_of_skills = self.extractor.canonical_skills(any_of)
+        return filters
+
     def match(self, request):
         """
         Matches employees to the job description from JD Agent.
         """
-        # Extract or use provided matching criteria
-        required_degree = request.required_degree or self._extract_degree_from_jd(request.job_description)
-        min_experience = request.min_years_experience if request.min_years_experience is not None else self._extract_experience_from_jd(request.job_description)
-        
-        print(f"📋 Matching criteria: Degree={required_degree}, Experience={min_experience}+ years")
-        
-        # STEP 1: Filter by degree and experience first
-        filtered_indices = [
-            i for i, emp in enumerate(self.employees)
-            if required_degree in emp.get("Key_Credentials", "")
-            and emp.get("experience_years", 0) >= min_experience
+        return next(self.match_many([request]))
+
+    def match_many(self, requests):
+        """
+        Matches employees to several job descriptions at once, yielding the
+        results for each request in order.
+
+        All JDs are encoded in one batched call and scored against the whole
+        directory with one matrix operation (one filter mask per job), so the
+        cost of N jobs is far below N separate match calls. Because results are
+        yielded job by job, callers can stream them as they are produced.
+
+        Only the returned top-k candidates are turned into result dicts: the
+        index selects them with argpartition, profile keywords are precomputed
+        in the column store, and each JD is tokenized once.
+
+        Repeated JDs are cheap: JD embeddings are cached by the hash of the
+        normalized JD text, and whole results by (JD hash, filters, top_k,
+        min_score, index version). The result cache is cleared whenever the
+        employee index changes.
+        """
+        # Read one consistent view of the employee table for the whole batch (shards hold their own)
+        view = self.store.view if self.shards is None else None
+        version = view.version if view is not None else self.shards.version
+        self._sync_cache_version(version)
+
+        # STEP 1: Resolve each job's criteria, build its JD text and look up cached results
+        all_filters = [self._resolve_filters(request) for request in requests]
+        jd_texts = [self._create_comprehensive_jd_text(request.job_description) for request in requests]
+        jd_keys = [jd_hash(text) for text in jd_texts]
+        result_keys = [
+            (key, filters.model_dump_json(), request.top_k, request.min_score,
+             request.rerank.model_dump_json() if request.rerank else None, version)
+            for key, filters, request in zip(jd_keys, all_filters, requests)
         ]
+        cached = [self.result_cache.get(key) if self.result_cache.enabled else None for key in result_keys]
+        misses = [i for i, results in enumerate(cached) if results is None]
+
+        # STEP 2: Embed the JDs that missed (cached embeddings first, the rest in one batch)
+        fresh = iter(())
+        if misses:
+            search = self._search_many if view is not None else self._search_sharded
+            fresh = search(
+                view,
+                [requests[i] for i in misses],
+                [all_filters[i] for i in misses],
+                [jd_texts[i] for i in misses],
+                [jd_keys[i] for i in misses],
+                self._embed_jds([jd_texts[i] for i in misses], [jd_keys[i] for i in misses]),
+            )
+
+        for i, results in enumerate(cached):
+            if results is not None:
+                print(f"⚡ Served {requests[i].job_role} from the result cache")
+                yield list(results)
+                continue
+            results, complete = next(fresh)
+            if complete:
+                # Results cut short by a re-rank latency budget are not cached
+                self.result_cache.put(result_keys[i], results)
+            yield results
 
-        if not filtered_indices:
-            print("⚠️ No candidates match the basic criteria")
-            return []
+    def _sync_cache_version(self, version: int) -> None:
+        """Drops cached results and rankings once the employee index has changed."""
+        if version != self._result_cache_version:
+            self.result_cache.clear()
+            self.ranking_cache.clear()
+            self._result_cache_version = version
 
-        # Get the corresponding filtered employees and their pre-computed embeddings
-        filtered_employees = [self.employees[i] for i in filtered_indices]
-        filtered_embeddings = self.employee_embeddings[filtered_indices]
+    def rank(self, request) -> Ranking:
+        """
+        Ranks every candidate that passes the request's filters and min_score,
+        for paging through or exporting the whole pool (top_k and rerank do
+        not apply). Scores are computed as for match_many, over all candidates.
+
+        With hybrid retrieval this fuses over the whole filtered pool, while
+        match_many fuses over the union of its dense and BM25 top
+        TALENT_MATCHER_FUSION_DEPTH lists. "weighted" fusion gives a candidate
+        the same score either way, as both normalise by the best keyword
+        match, which the union always holds. "rrf" scores depend on ranks
+        within the fused set, so they differ between the two.
 
-        # STEP 2: Create comprehensive job description text and encode it
+        Rankings are cached briefly by (JD hash, filters, min_score, index
+        version), so fetching the next page or an export right after a page
+        does not re-score the directory.
+        """
+        if self.shards is not None:
+            raise ValueError("Ranking the whole candidate pool is not supported with TALENT_MATCHER_SHARDS")
+        view = self.store.view
+        self._sync_cache_version(view.version)
+
+        filters = self._resolve_filters(request)
         jd_text = self._create_comprehensive_jd_text(request.job_description)
-        job_embedding = self.model.encode(jd_text)
-
-        # STEP 3: Calculate cosine similarity against all filtered candidates at once
-        scores = cosine_similarity([job_embedding], filtered_embeddings)[0]
-
-        # STEP 4: Build the results
-        results = []
-        for i, emp in enumerate(filtered_employees):
-            profile_text = f"{emp.get('title', '')} {', '.join(emp.get('skills', []))} {emp.get('Key_Credentials', '')}"
-            results.append({
-                "employee_id": emp["Employee_ID"],
-                "name": emp.get("name", "N/A"),
-                "title": emp.get("title", "N/A"),
-                "score": float(scores[i]),
-                "experience_years": emp.get("experience_years", 0),
-                "reasons": self._extract_reasons(jd_text, profile_text, request.job_description)
-            })
-
-        # STEP 5: Sort by score and return the top 5
-        results.sort(key=lambda x: x["score"], reverse=True)
-        print(f"✅ Found {len(results)} matches, returning top 5")
-        return results[:5]
-
-    def _extract_reasons(self, jd: str, profile: str, job_description):
-        """
-        Extract overlapping keywords with enhanced logic to include
-        specific skills from the job description.
-        """
-        # Get required skills as individual keywords
-        required_skills = job_description.required_skills.lower()
-        languages = job_description.languages.lower()
-        
-        # Combine and clean
-        jd_keywords = set(word.lower().strip(',.:;') for word in jd.split() if len(word) > 3)
-        profile_keywords = set(word.lower().strip(',.:;') for word in profile.split() if len(word) > 3)
-        
+        jd_key = jd_hash(jd_text)
+        query_key = jd_hash(f"{jd_key} {filters.model_dump_json()} {request.min_score!r}")
+        cached = self.ranking_cache.get((query_key, view.version))
+        if cached is not None:
+            return cached
+
+        job_embedding = self._embed_jds([jd_text], [jd_key])[0]
+        rows = np.flatnonzero(view.columns.evaluate(filters) & view.alive)
+        scores = np.concatenate(
+            [view.embeddings.rescore(job_embedding, rows[start:start + RANK_CHUNK_ROWS])
+             for start in range(0, len(rows), RANK_CHUNK_ROWS)]
+        ) if len(rows) else np.empty(0, dtype=np.float32)
+        terms = None
+        if self.retrieval == "hybrid":
+            terms = query_terms(jd_text)
+            scores = fuse(
+                scores,
+                view.columns.sparse.scores(terms)[rows],
+                settings.TALENT_MATCHER_FUSION,
+                settings.TALENT_MATCHER_SPARSE_WEIGHT,
+                settings.TALENT_MATCHER_RRF_K,
+            )
+        if request.min_score is not None:
+            keep = scores >= request.min_score
+            rows, scores = rows[keep], scores[keep]
+
+        employee_ids = np.array([view.employees[row]["Employee_ID"] for row in rows], dtype=np.str_)
+        ranking = Ranking(query_key, view, rows, scores.astype(np.float32), employee_ids, keyword_tokens(jd_text), terms)
+        self.ranking_cache.put((query_key, view.version), ranking)
+        print(f"📊 Ranked {len(ranking)} candidates for {request.job_role}")
+        return ranking
+
+    def match_page(self, ranking: Ranking, cursor=None, page_size: int = 50) -> dict:
+        """One page of a ranking: the candidates after `cursor`, and the cursor of the next page."""
+        start = ranking.start_of(cursor)
+        end = min(start + page_size, len(ranking))
+        return {
+            "matches": self.ranked_results(ranking, start, end),
+            "total": len(ranking),
+            "next_cursor": ranking.cursor_after(end - 1) if end < len(ranking) else None,
+        }
+
+    def ranked_results(self, ranking: Ranking, start: int, end: int) -> list:
+        """Result dicts for positions [start, end) of a ranking."""
+        view = ranking.view
+        return [
+            self._build_result(
+                view.employees[row],
+                score,
+                view.columns.sparse.matching_terms(ranking.sparse_terms, row)[:7] if ranking.sparse_terms is not None
+                else self._extract_reasons(ranking.jd_keywords, view.columns.keywords[row]),
+            )
+            for row, score in zip(ranking.rows[start:end], ranking.scores[start:end])
+        ]
+
+    def _embed_jds(self, jd_texts, keys) -> np.ndarray:
+        """Normalised JD embeddings, taken from the JD cache where possible and encoded otherwise."""
+        vectors = [self.jd_cache.get(key) for key in keys]
+        missing = [i for i, vector in enumerate(vectors) if vector is None]
+        if missing:
+            # One batched encode, shared with other requests encoding at the same time
+            encoded = normalize_rows(self.encoder.encode([jd_texts[i] for i in missing]))
+            for i, vector in zip(missing, encoded):
+                vectors[i] = vector
+                self.jd_cache.put(keys[i], vector)
+        return np.stack(vectors)
+
+    def _search_many(self, view, requests, all_filters, jd_texts, jd_keys, job_embeddings):
+        """
+        Searches the index for already-embedded JDs and yields (results, complete)
+        for each job; complete is False if re-ranking ran out of its latency budget.
+        """
+        # STEP 3: Evaluate each job's criteria as vectorised column masks
+        masks = np.stack([view.columns.evaluate(filters) & view.alive for filters in all_filters])
+
+        # STEP 3b (hybrid): BM25-score every profile against the JD terms and, if
+        #          pruning is on, only let the best keyword matches through to dense scoring
+        hybrid = self.retrieval == "hybrid"
+        search_masks, sparse_terms, sparse_scores = masks, [None] * len(requests), [None] * len(requests)
+        if hybrid:
+            sparse_terms = [query_terms(text) for text in jd_texts]
+            sparse_scores = [view.columns.sparse.scores(terms) for terms in sparse_terms]
+            if settings.TALENT_MATCHER_SPARSE_PRUNE > 0:
+                search_masks = np.stack([
+                    prune_mask(scores, mask, settings.TALENT_MATCHER_SPARSE_PRUNE)
+                    for scores, mask in zip(sparse_scores, masks)
+                ])
+
+        # STEP 4: Search the vector index for each job's top-k candidates that pass its filter.
+        #         When re-scoring, fetch extra candidates from the compact scores first;
+        #         when fusing, fetch enough dense candidates to fuse with the BM25 ones.
+        k = max(request.top_k for request in requests)
+        if hybrid:
+            k = max(k, settings.TALENT_MATCHER_FUSION_DEPTH)
+        elif self.rescore_factor > 0:
+            k *= self.rescore_factor
+        k = max([k] + [request.rerank.top_n for request in requests if request.rerank])
+        hits = view.index.search_batch(job_embeddings, k, masks=search_masks)
+
+        for request, filters, mask, search_mask, jd_text, jd_key, job_embedding, terms, bm25, (rows, scores) in zip(
+            requests, all_filters, masks, search_masks, jd_texts, jd_keys, job_embeddings, sparse_terms, sparse_scores, hits
+        ):
+            print(f"📋 Matching criteria: Degree={filters.min_degree}+, Experience={filters.min_experience}+ years")
+            if not mask.any():
+                print("⚠️ No candidates match the basic criteria")
+                yield [], True
+                continue
+
+            if hybrid:
+                # Fuse the dense and BM25 rankings over the union of both candidate lists
+                # (rank() fuses over the whole pool; see its docstring for how the scores compare)
+                rows = hybrid_candidates(rows, bm25, search_mask, settings.TALENT_MATCHER_FUSION_DEPTH)
+                scores = fuse(
+                    view.embeddings.rescore(job_embedding, rows),
+                    bm25[rows],
+                    settings.TALENT_MATCHER_FUSION,
+                    settings.TALENT_MATCHER_SPARSE_WEIGHT,
+                    settings.TALENT_MATCHER_RRF_K,
+                )
+                order = top_k(scores, len(scores))
+                rows, scores = rows[order], scores[order]
+            elif self.rescore_factor > 0 and len(rows):
+                scores = view.embeddings.rescore(job_embedding, rows)
+                order = top_k(scores, len(scores))
+                rows, scores = rows[order], scores[order]
+
+            # STEP 5: Drop candidates below the minimum score (hits are sorted by descending score)
+            if request.min_score is not None:
+                keep = scores >= request.min_score
+                rows, scores = rows[keep], scores[keep]
+
+            # STEP 5b: Optionally re-rank the first top_n with the cross-encoder, then keep the top-k
+            rerank_scores, complete = None, True
+            if request.rerank and len(rows):
+                order, rerank_scores, complete = self._rerank(
+                    request.rerank, jd_text, jd_key, [view.employees[row] for row in rows]
+                )
+                rows, scores = rows[order], scores[order]
+            rows, scores = rows[:request.top_k], scores[:request.top_k]
+
+            # STEP 6: Build results and reasons for the returned candidates only
+            jd_keywords = keyword_tokens(jd_text)
+            results = [
+                self._build_result(
+                    view.employees[row],
+                    score,
+                    view.columns.sparse.matching_terms(terms, row)[:7] if hybrid
+                    else self._extract_reasons(jd_keywords, view.columns.keywords[row]),
+                    None if rerank_scores is None else rerank_scores[i],
+                )
+                for i, (row, score) in enumerate(zip(rows, scores))
+            ]
+
+            print(f"✅ Found {int(mask.sum())} matches, returning top {len(results)}")
+            yield results, complete
+
+    def _search_sharded(self, view, requests, all_filters, jd_texts, jd_keys, job_embeddings):
+        """
+        `_search_many` for a sharded directory: the shard processes filter and
+        search their own rows (re-scoring in float32 if configured), and only
+        the merged top-k comes back here for min_score, re-ranking and results.
+        """
+        # STEP 3-4: Scatter the filters and JD embeddings to every shard, gather the merged top-k
+        k = max([request.top_k for request in requests] + [request.rerank.top_n for request in requests if request.rerank])
+        gathered = self.shards.search(job_embeddings, all_filters, k)
+
+        for request, filters, jd_text, jd_key, (hits, matching) in zip(requests, all_filters, jd_texts, jd_keys, gathered):
+            print(f"📋 Matching criteria: Degree={filters.min_degree}+, Experience={filters.min_experience}+ years")
+            if not matching:
+                print("⚠️ No candidates match the basic criteria")
+                yield [], True
+                continue
+
+            # STEP 5: Drop candidates below the minimum score (hits are sorted by descending score)
+            if request.min_score is not None:
+                hits = [hit for hit in hits if hit[0] >= request.min_score]
+
+            # STEP 5b: Optionally re-rank the first top_n with the cross-encoder, then keep the top-k
+            rerank_scores, complete = None, True
+            if request.rerank and hits:
+                order, rerank_scores, complete = self._rerank(request.rerank, jd_text, jd_key, [emp for _, emp, _ in hits])
+                hits = [hits[i] for i in order]
+            hits = hits[:request.top_k]
+
+            # STEP 6: Build results and reasons for the returned candidates only
+            jd_keywords = keyword_tokens(jd_text)
+            results = [
+                self._build_result(
+                    emp, score, self._extract_reasons(jd_keywords, keywords),
+                    None if rerank_scores is None else rerank_scores[i],
+                )
+                for i, (score, emp, keywords) in enumerate(hits)
+            ]
+
+            print(f"✅ Found {matching} matches, returning top {len(results)}")
+            yield results, complete
+
+    def _build_result(self, emp, score, reasons, rerank_score=None) -> dict:
+        result = {
+            "employee_id": emp["Employee_ID"],
+            "name": emp.get("name", "N/A"),
+            "title": emp.get("title", "N/A"),
+            "score": float(score),
+            "experience_years": emp.get("experience_years", 0),
+            "reasons": reasons,
+        }
+        if rerank_score is not None:
+            result["rerank_score"] = None if np.isnan(rerank_score) else float(rerank_score)
+        return result
+
+    def _rerank(self, options, jd_text, jd_key, employees):
+        """
+        Re-orders the first `options.top_n` of the ranked `employees` by cross-encoder score.
+        Returns the new order (positions into `employees`), the cross-encoder scores
+        in that order (NaN where not scored) and whether every pair was scored
+        within the latency budget.
+        """
+        n = min(options.top_n, len(employees))
+        pair_scores, scored = self.reranker.score(
+            jd_text, jd_key, [build_profile_text(emp) for emp in employees[:n]],
+            batch_size=options.batch_size, budget_ms=options.budget_ms,
+        )
+        order = np.concatenate([np.argsort(-pair_scores[:scored], kind="stable"), np.arange(scored, len(employees))])
+        rerank_scores = np.full(len(employees), np.nan, dtype=np.float32)
+        rerank_scores[:scored] = pair_scores[:scored]
+        return order, rerank_scores[order], scored == n
+
+    def _extract_reasons(self, jd_keywords: frozenset, profile_keywords: frozenset):
+        """
+        Extract overlapping keywords between the JD and a profile, listing
+        well-known skills first. Both keyword sets are computed up front.
+        """
         # Find overlaps
         overlaps = jd_keywords & profile_keywords
         
-        # Filter to most relevant (limit to 5-7 key reasons)
-        important_keywords = ['python', 'sql', 'power', 'data', 'analysis', 'excel', 
-                            'tableau', 'visualization', 'machine', 'learning', 'aws', 
-                            'azure', 'cloud', 'java', 'javascript', 'react', 'node']
-        
-        relevant_reasons = [kw for kw in overlaps if kw in important_keywords]
-        other_reasons = [kw for kw in overlaps if kw not in important_keywords]
+        relevant_reasons = [kw for kw in overlaps if kw in IMPORTANT_KEYWORDS]
+        other_reasons = [kw for kw in overlaps if kw not in IMPORTANT_KEYWORDS]
         
         # Prioritize important keywords and limit total
-        return sorted(relevant_reasons)[:5] + sorted(other_reasons)[:2]
\ No newline at end of file
+        return sorted(relevant_reasons)[:5] + sorted(other_reasons)[:2]
+
@@ -0,0 +1,189 @@
+import hashlib
+import heapq
+import itertools
+import logging
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from app.agents.talent_matcher.index import create_index, top_k
+from app.agents.talent_matcher.loader import build_profile_text
+from app.agents.talent_matcher.quantization import EmbeddingMatrix
+from app.agents.talent_matcher.store import EmployeeStore
+
+logger = logging.getLogger("talent_matcher")
+
+
+def shard_of(employee_id: str, shards: int) -> int:
+    """Stable shard number of an employee, so updates always reach the shard holding it."""
+    digest = hashlib.blake2b(str(employee_id).encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "little") % shards
+
+
+# --- Shard worker processes ---
+# Each worker holds one shard: an EmployeeStore (embeddings, vector index,
+# filter columns) over its slice of the employees. Every shard has exactly one
+# worker, so tasks run in submission order and an update submitted before a
+# search is always applied before it.
+_shard: Optional[EmployeeStore] = None
+_rescore_factor = 0
+
+
+def _init_shard(employees: List[dict], embeddings: np.ndarray, precision: str, rescore_factor: int,
+                index_type: str, index_options: dict) -> None:
+    global _shard, _rescore_factor
+    _rescore_factor = rescore_factor
+    matrix = EmbeddingMatrix.from_float32(embeddings, precision, keep_full=rescore_factor > 0)
+    _shard = EmployeeStore(employees, matrix, lambda: create_index(index_type, **index_options))
+
+
+def _shard_search(job_embeddings: np.ndarray, all_filters: list, k: int) -> List[Tuple[list, int]]:
+    """
+    Per job: this shard's top-k hits as (score, employee, profile keywords)
+    tuples sorted by descending score, and the number of rows passing the filter.
+    """
+    view = _shard.view
+    masks = np.stack([view.columns.evaluate(filters) & view.alive for filters in all_filters])
+    search_k = k * _rescore_factor if _rescore_factor > 0 else k
+    found = []
+    for job_embedding, mask, (rows, scores) in zip(job_embeddings, masks, view.index.search_batch(job_embeddings, search_k, masks=masks)):
+        if _rescore_factor > 0 and len(rows):
+            scores = view.embeddings.rescore(job_embedding, rows)
+            order = top_k(scores, k)
+            rows, scores = rows[order], scores[order]
+        hits = [(float(score), view.employees[row], view.columns.keywords[row]) for row, score in zip(rows, scores)]
+        found.append((hits, int(mask.sum())))
+    return found
+
+
+def _shard_upsert(records: List[dict], vectors: np.ndarray) -> int:
+    by_text = {build_profile_text(record): vector for record, vector in zip(records, vectors)}
+    view, _, _ = _shard.upsert(records, lambda texts: np.stack([by_text[text] for text in texts]))
+    return view.size
+
+
+def _shard_delete(employee_ids: List[str]) -> List[str]:
+    return _shard.delete(employee_ids)[1]
+
+
+def _shard_live_employees() -> List[dict]:
+    return _shard.view.live_employees()
+
+
+def _shard_stats() -> Dict[str, Any]:
+    view = _shard.view
+    return {"employees": view.size, "rows": len(view.employees), "embedding_mb": view.embeddings.nbytes / 2**20}
+
+
+class ShardPool:
+    """
+    Scatter-gather matching over employee shards held by local worker processes.
+
+    Employees are assigned to `shards` worker processes by a hash of their ID.
+    Each worker holds only its shard's embeddings, vector index and filter
+    columns, so the directory can outgrow one process, and the shards score a
+    request in parallel on separate cores. A search is sent to every shard,
+    each returns its own top-k, and the sorted per-shard lists are merged with
+    a heap into the global top-k (exact: every global top-k row is in its own
+    shard's top-k).
+
+    Upserts and deletes are routed to the owning shard. `version` increases on
+    every change, like the store's view version.
+    """
+
+    def __init__(self, employees: List[dict], embeddings: np.ndarray, shards: int, precision: str = "float32",
+                 rescore_factor: int = 0, index_type: str = "exact", index_options: Optional[dict] = None):
+        self.shards = shards
+        self.version = 0
+        self._lock = threading.Lock()
+        assignment = np.array([shard_of(emp["Employee_ID"], shards) for emp in employees], dtype=np.int64)
+        numeric = [int(emp["Employee_ID"]) for emp in employees if emp["Employee_ID"].isdigit()]
+        self._next_id = max(numeric, default=0) + 1
+
+        context = multiprocessing.get_context("spawn")
+        self._workers: List[ProcessPoolExecutor] = []
+        for shard in range(shards):
+            rows = np.flatnonzero(assignment == shard)
+            self._workers.append(ProcessPoolExecutor(
+                max_workers=1,
+                mp_context=context,
+                initializer=_init_shard,
+                initargs=([employees[row] for row in rows], np.ascontiguousarray(embeddings[rows], dtype=np.float32),
+                          precision, rescore_factor, index_type, index_options or {}),
+            ))
+        # Wait until every shard has built its index, so startup reports it as part of the index build
+        self.sizes = [stats["employees"] for stats in self._gather(_shard_stats)]
+        logger.info(f"Sharded {len(employees)} employees over {shards} worker processes: {self.sizes}")
+
+    def _gather(self, fn, *args) -> list:
+        """Runs fn on every shard in parallel and returns the results in shard order."""
+        futures = [worker.submit(fn, *args) for worker in self._workers]
+        return [future.result() for future in futures]
+
+    @property
+    def size(self) -> int:
+        return sum(self.sizes)
+
+    def search(self, job_embeddings: np.ndarray, all_filters: list, k: int) -> List[Tuple[list, int]]:
+        """
+        Searches every shard and merges their results. Per job, returns the
+        global top-k as (score, employee, profile keywords) tuples sorted by
+        descending score, and the number of employees passing the filter.
+        """
+        per_shard = self._gather(_shard_search, job_embeddings, all_filters, k)
+        merged = []
+        for job_results in zip(*per_shard):
+            hits = heapq.merge(*(shard_hits for shard_hits, _ in job_results), key=lambda hit: -hit[0])
+            merged.append((list(itertools.islice(hits, k)), sum(matching for _, matching in job_results)))
+        return merged
+
+    def upsert(self, records: List[dict], vectors: np.ndarray) -> List[str]:
+        """Routes new or updated employees (with their normalised embeddings) to their shards. Returns their IDs."""
+        with self._lock:
+            records = [dict(record) for record in records]
+            for record in records:
+                if record.get("Employee_ID"):
+                    record["Employee_ID"] = str(record["Employee_ID"])
+                else:
+                    record["Employee_ID"] = str(self._next_id)
+                if record["Employee_ID"].isdigit():
+                    self._next_id = max(self._next_id, int(record["Employee_ID"]) + 1)
+
+            assignment = np.array([shard_of(record["Employee_ID"], self.shards) for record in records], dtype=np.int64)
+            futures = {}
+            for shard in np.unique(assignment).tolist():
+                rows = np.flatnonzero(assignment == shard)
+                futures[shard] = self._workers[shard].submit(_shard_upsert, [records[row] for row in rows], vectors[rows])
+            for shard, future in futures.items():
+                self.sizes[shard] = future.result()
+            self.version += 1
+            return [record["Employee_ID"] for record in records]
+
+    def delete(self, employee_ids: List[str]) -> List[str]:
+        """Removes employees from their shards. Returns the IDs that existed."""
+        with self._lock:
+            by_shard: Dict[int, List[str]] = {}
+            for employee_id in employee_ids:
+                by_shard.setdefault(shard_of(employee_id, self.shards), []).append(employee_id)
+            futures = {shard: self._workers[shard].submit(_shard_delete, ids) for shard, ids in by_shard.items()}
+            deleted = set()
+            for shard, future in futures.items():
+                removed = future.result()
+                self.sizes[shard] -= len(removed)
+                deleted.update(removed)
+            if deleted:
+                self.version += 1
+            return [employee_id for employee_id in employee_ids if employee_id in deleted]
+
+    def live_employees(self) -> List[dict]:
+        return [emp for shard in self._gather(_shard_live_employees) for emp in shard]
+
+    def stats(self) -> Dict[str, Any]:
+        return {"shards": self.shards, "version": self.version, "per_shard": self._gather(_shard_stats)}
+
+    def shutdown(self) -> None:
+        for worker in self._workers:
+            worker.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,207 @@
+import logging
+import os
+import threading
+from contextlib import contextmanager
+from typing import Callable, List, Optional, Tuple
+
+import numpy as np
+
+from app.agents.talent_matcher.columns import ColumnStore
+from app.agents.talent_matcher.index import VectorIndex, normalize_rows
+from app.agents.talent_matcher.loader import build_profile_text
+from app.agents.talent_matcher.snapshot import (
+    MANIFEST_FILE,
+    EmbeddingSnapshot,
+    SnapshotEmployees,
+    employee_columns,
+    profile_hash,
+)
+from app.agents.talent_matcher.store import StoreView
+
+logger = logging.getLogger("talent_matcher")
+
+LOCK_FILE = ".publish.lock"
+
+
+@contextmanager
+def publish_lock(directory: str):
+    """
+    Exclusive lock on a snapshot directory, held while a generation is built and
+    published, so only one process on the host encodes or writes at a time.
+    """
+    import fcntl
+
+    os.makedirs(directory, exist_ok=True)
+    with open(os.path.join(directory, LOCK_FILE), "a") as f:
+        fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
+
+
+class SharedSnapshotStore:
+    """
+    Employee table shared by every worker process on a host through the snapshot directory.
+
+    A drop-in for EmployeeStore: the embedding matrix (in the configured
+    precision) and the employee columns are opened read-only from the current
+    snapshot generation, so N workers map the same pages instead of holding N
+    copies. Only the derived filter columns and the vector index are built per
+    worker.
+
+    Upserts and deletes take the directory's publish lock, write a complete new
+    generation and atomically replace the manifest. Every worker checks the
+    manifest when it reads `view` and switches to a new generation once it sees
+    one; requests that already hold the previous view finish on it.
+    """
+
+    def __init__(self, directory: str, model_id: str, precision: str, keep_full: bool,
+                 index_factory: Callable[[], VectorIndex],
+                 on_publish: Optional[Callable[[List[dict]], None]] = None):
+        self.directory = directory
+        self.model_id = model_id
+        self.precision = precision
+        self.keep_full = keep_full
+        self._index_factory = index_factory
+        self._on_publish = on_publish
+        self._lock = threading.Lock()
+        self._manifest_key: Optional[Tuple[int, int]] = None
+        self._snapshot: Optional[EmbeddingSnapshot] = None
+        self._view: Optional[StoreView] = None
+        self.switches = 0
+        if not self._refresh():
+            raise RuntimeError(f"No embedding snapshot to share in {directory}")
+
+    @property
+    def generation(self) -> str:
+        return self._snapshot.generation
+
+    @property
+    def view(self) -> StoreView:
+        self._refresh()
+        return self._view
+
+    def _manifest_stat(self) -> Optional[Tuple[int, int]]:
+        try:
+            stat = os.stat(os.path.join(self.directory, MANIFEST_FILE))
+        except OSError:
+            return None
+        # os.replace gives the manifest a new inode, so this changes with every generation
+        return stat.st_ino, stat.st_mtime_ns
+
+    def _refresh(self) -> bool:
+        """Attaches to the current generation if it changed. Returns False if there is none."""
+        key = self._manifest_stat()
+        if key is None or key == self._manifest_key:
+            return key is not None
+        with self._lock:
+            if key == self._manifest_key:
+                return True
+            snapshot = EmbeddingSnapshot.load(self.directory)
+            if snapshot is None:
+                # Superseded while we were opening it; the next read picks up the newer one
+                return self._view is not None
+            if self._snapshot is None or snapshot.generation != self._snapshot.generation:
+                self._attach(snapshot)
+            self._manifest_key = key
+            return True
+
+    def _attach(self, snapshot: EmbeddingSnapshot) -> None:
+        if snapshot.model_name != self.model_id or snapshot.precision != self.precision:
+            raise RuntimeError(
+                f"Snapshot generation {snapshot.generation} holds {snapshot.model_name} / {snapshot.precision}, "
+                f"expected {self.model_id} / {self.precision}"
+            )
+        employees = SnapshotEmployees(snapshot.columns)
+        embeddings = snapshot.matrix(self.keep_full)
+        index = self._index_factory()
+        index.build(embeddings)
+        alive = np.ones(len(employees), dtype=bool)
+        id_to_row = {}
+        for row, emp_id in enumerate(snapshot.columns["employee_id"].tolist()):
+            previous = id_to_row.get(emp_id)
+            if previous is not None:
+                alive[previous] = False
+            id_to_row[emp_id] = row
+        version = 0 if self._view is None else self._view.version + 1
+        self._view = StoreView(version, employees, embeddings, alive, id_to_row, index, ColumnStore.from_employees(employees))
+        if self._snapshot is not None:
+            self.switches += 1
+            logger.info(f"Switched to snapshot generation {snapshot.generation} ({len(employees)} employees)")
+        self._snapshot = snapshot
+
+    def _publish(self, employees: List[dict], embeddings: np.ndarray, hashes: np.ndarray) -> StoreView:
+        """Writes and publishes a new generation (caller holds the publish lock), then switches to it."""
+        EmbeddingSnapshot.write(self.directory, self.model_id, embeddings, hashes,
+                                employee_columns(employees), self.precision)
+        if self._on_publish is not None:
+            self._on_publish(employees)
+        self._refresh()
+        return self._view
+
+    def next_id(self) -> str:
+        """Smallest numeric ID larger than every numeric ID in the table."""
+        numeric = [int(emp_id) for emp_id in self._view.id_to_row if emp_id.isdigit()]
+        return str(max(numeric, default=0) + 1)
+
+    def upsert(self, records: List[dict], encode: Callable[[List[str]], np.ndarray]) -> Tuple[StoreView, List[str], int]:
+        """
+        Inserts or replaces employees by `Employee_ID` and publishes the result
+        as a new generation. Only new or changed profiles are passed to `encode`.
+        """
+        with publish_lock(self.directory):
+            self._refresh()  # another worker may have published since our last read
+            view, snapshot = self._view, self._snapshot
+            records = [dict(record) for record in records]
+            next_id = int(self.next_id())
+            for record in records:
+                if record.get("Employee_ID"):
+                    record["Employee_ID"] = str(record["Employee_ID"])
+                else:
+                    record["Employee_ID"] = str(next_id)
+                    next_id += 1
+
+            hashes = np.array([profile_hash(build_profile_text(record), self.model_id) for record in records], dtype="S32")
+            vectors = np.empty((len(records), snapshot.embeddings.shape[1]), dtype=np.float32)
+            to_encode = []
+            for i, record in enumerate(records):
+                old_row = view.id_to_row.get(record["Employee_ID"], -1)
+                if old_row >= 0 and snapshot.hashes[old_row] == hashes[i]:
+                    vectors[i] = snapshot.embeddings[old_row]
+                else:
+                    to_encode.append(i)
+            if to_encode:
+                vectors[to_encode] = normalize_rows(encode([build_profile_text(records[i]) for i in to_encode]))
+
+            # Later duplicates of an ID in the same batch win, as in EmployeeStore
+            latest = {record["Employee_ID"]: i for i, record in enumerate(records)}
+            added = sorted(latest.values())
+            keep = np.array([row for emp_id, row in view.id_to_row.items() if emp_id not in latest], dtype=np.int64)
+            keep.sort()
+            view = self._publish(
+                [view.employees[row] for row in keep] + [records[i] for i in added],
+                np.concatenate([snapshot.embeddings[keep], vectors[added]]),
+                np.concatenate([snapshot.hashes[keep], hashes[added]]),
+            )
+            return view, [record["Employee_ID"] for record in records], len(to_encode)
+
+    def delete(self, employee_ids: List[str]) -> Tuple[StoreView, List[str]]:
+        """Removes the given employees in a new generation. Returns the published view and the IDs that existed."""
+        with publish_lock(self.directory):
+            self._refresh()
+            view, snapshot = self._view, self._snapshot
+            deleted = [emp_id for emp_id in employee_ids if emp_id in view.id_to_row]
+            if not deleted:
+                return view, []
+            gone = set(deleted)
+            keep = np.array(sorted(row for emp_id, row in view.id_to_row.items() if emp_id not in gone), dtype=np.int64)
+            view = self._publish(
+                [view.employees[row] for row in keep], snapshot.embeddings[keep], snapshot.hashes[keep]
+            )
+            return view, deleted
+
+    def find(self, employee_id: str) -> Optional[dict]:
+        view = self.view
+        row = view.id_to_row.get(employee_id)
+        return None if row is None else view.employees[row]
@@ -0,0 +1,244 @@
+import logging
+import os
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from app.agents.talent_matcher.extractor import DEFAULT_MIN_DEGREE
+from app.agents.talent_matcher.index import normalize_rows, top_k
+from app.agents.talent_matcher.loader import keyword_tokens
+from app.agents.talent_matcher.schemas import CandidateFilters
+
+logger = logging.getLogger("talent_matcher")
+
+
+def catalogue_roles() -> Dict[str, str]:
+    """
+    The JD Agent's role catalogue (ROLE_FILE_MAP): role name -> the text its
+    shortlist is matched on, i.e. the role name and its JD template without
+    the {{ EXPERIENCE }} / {{ REQUIREMENTS }} placeholder lines.
+    """
+    from app.agents.jd_agent import schema as jd_schema
+
+    prompts_dir = os.path.join(os.path.dirname(jd_schema.__file__), "prompts")
+    roles = {}
+    for role, filename in jd_schema.ROLE_FILE_MAP.items():
+        path = os.path.join(prompts_dir, filename)
+        template = ""
+        if os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                template = f.read()
+        else:
+            logger.warning(f"No JD template for catalogue role '{role}'; its shortlist matches on the role name only")
+        lines = [line for line in template.splitlines() if "{{" not in line]
+        roles[role] = "\n".join([role, *lines]).strip()
+    return roles
+
+
+class Shortlist:
+    """
+    One role's materialized candidates: (score, employee_id, result) entries,
+    best first, for the store version they were computed on.
+
+    `floor` is the score of the best candidate left out when the list was cut
+    to its capacity (None when every passing candidate is in it). Entries
+    scoring above it are the true top of the directory; at or below it,
+    candidates that were never stored may rank higher (or tie).
+    """
+
+    __slots__ = ("role", "text", "embedding", "keywords", "filters", "entries", "floor", "version")
+
+    def __init__(self, role: str, text: str, embedding: np.ndarray, keywords: frozenset, filters: CandidateFilters,
+                 entries: List[Tuple[float, str, dict]], floor: Optional[float], version: int):
+        self.role = role
+        self.text = text
+        self.embedding = embedding
+        self.keywords = keywords
+        self.filters = filters
+        self.entries = entries
+        self.floor = floor
+        self.version = version
+
+    def replaced(self, entries: List[Tuple[float, str, dict]], floor: Optional[float], version: int) -> "Shortlist":
+        return Shortlist(self.role, self.text, self.embedding, self.keywords, self.filters, entries, floor, version)
+
+
+class RoleShortlists:
+    """
+    Materialized top-K candidates for every role in the JD Agent catalogue.
+
+    At startup each role's text is embedded once and its best `depth + buffer`
+    candidates under the role's default filters (the degree and experience
+    named in its template, otherwise a bachelor's and no minimum) are ranked
+    and turned into result dicts, so `get` is a list slice.
+
+    The service calls `notify` with each view it publishes and the employee
+    IDs that changed. A background thread then re-scores only those employees
+    against every role and merges them into the lists; the `buffer` extra
+    entries absorb deletions and demotions, and a role is ranked from scratch
+    only when fewer than `depth` trustworthy entries remain. A change the
+    shortlists were not told about (e.g. another worker publishing a shared
+    store generation) triggers a full rebuild.
+
+    Shortlists use dense scores only (no hybrid fusion or re-ranking).
+    """
+
+    def __init__(self, service, roles: Dict[str, str], depth: int, buffer: int):
+        self.service = service
+        self.depth = depth
+        self.capacity = depth + buffer
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._closed = False
+        self._pending: List[Tuple[Any, List[str], float]] = []
+        self.full_builds = 0
+        self.incremental_updates = 0
+        self.role_reranks = 0
+
+        view = service.store.view
+        texts = list(roles.values())
+        embeddings = normalize_rows(service.encoder.encode(texts)) if texts else []
+        self._lists: Dict[str, Shortlist] = {}
+        for (role, text), embedding in zip(roles.items(), embeddings):
+            requirements = service.extractor.extract(text)
+            filters = CandidateFilters(min_degree=requirements.degree or DEFAULT_MIN_DEGREE,
+                                       min_experience=requirements.min_experience or 0)
+            shortlist = Shortlist(role, text, embedding, keyword_tokens(text), filters, [], None, view.version)
+            self._lists[role] = self._rank(shortlist, view)
+        self.version = view.version
+        self.refreshed_at = time.time()
+
+        self._thread = threading.Thread(target=self._run, name="talent-matcher-shortlists", daemon=True)
+        self._thread.start()
+
+    @property
+    def roles(self) -> List[str]:
+        return list(self._lists)
+
+    def _result(self, shortlist: Shortlist, view, row: int, score: float) -> dict:
+        return self.service._build_result(
+            view.employees[row], score, self.service._extract_reasons(shortlist.keywords, view.columns.keywords[row])
+        )
+
+    def _rank(self, shortlist: Shortlist, view) -> Shortlist:
+        """Ranks one role against the whole view."""
+        passing = np.flatnonzero(view.columns.evaluate(shortlist.filters) & view.alive)
+        rows = passing[top_k(view.embeddings.dot(shortlist.embedding)[passing], self.capacity + 1)]
+        # Same scores as `_merge` uses (the float32 copy, when quantized embeddings keep one)
+        scores = view.embeddings.rescore(shortlist.embedding, rows)
+        entries = sorted(
+            ((float(score), view.employees[row]["Employee_ID"], row) for row, score in zip(rows.tolist(), scores)),
+            key=lambda entry: (-entry[0], entry[1]),
+        )
+        floor = entries[self.capacity][0] if len(entries) > self.capacity else None
+        entries = [(score, emp_id, self._result(shortlist, view, row, score)) for score, emp_id, row in entries[:self.capacity]]
+        return shortlist.replaced(entries, floor, view.version)
+
+    def _merge(self, shortlist: Shortlist, view, changed: set) -> Shortlist:
+        """Re-scores only the `changed` employees and merges them into the role's list."""
+        rows = np.array([view.id_to_row[emp_id] for emp_id in changed if emp_id in view.id_to_row], dtype=np.int64)
+        rows = rows[view.columns.evaluate_rows(shortlist.filters, rows)]
+        scores = view.embeddings.rescore(shortlist.embedding, rows) if len(rows) else np.empty(0, dtype=np.float32)
+
+        entries = [entry for entry in shortlist.entries if entry[1] not in changed]
+        entries += [
+            (float(score), view.employees[row]["Employee_ID"], self._result(shortlist, view, row, score))
+            for row, score in zip(rows.tolist(), scores)
+        ]
+        entries.sort(key=lambda entry: (-entry[0], entry[1]))
+        floor = shortlist.floor
+        if floor is not None:
+            entries = [entry for entry in entries if entry[0] > floor]
+            if len(entries) < self.depth:
+                self.role_reranks += 1
+                return self._rank(shortlist, view)
+        if len(entries) > self.capacity:
+            floor = entries[self.capacity][0]
+            entries = entries[:self.capacity]
+        return shortlist.replaced(entries, floor, view.version)
+
+    def notify(self, view, employee_ids: List[str]) -> None:
+        """Records that `view` was published with `employee_ids` inserted, updated or deleted."""
+        with self._lock:
+            self._pending.append((view, list(employee_ids), time.time()))
+        self._wake.set()
+
+    def _run(self) -> None:
+        while True:
+            self._wake.wait()
+            self._wake.clear()
+            if self._closed:
+                return
+            try:
+                self.refresh()
+            except Exception as e:
+                logger.error(f"Refreshing role shortlists failed: {e}", exc_info=True)
+
+    def refresh(self) -> None:
+        """Brings every role up to date with the newest view: incrementally if every change since is known."""
+        with self._lock:
+            pending, self._pending = self._pending, []
+        current = self.service.store.view
+        if not pending and current.version == self.version:
+            return
+
+        # Changes apply incrementally only as an unbroken chain of versions from the one the lists are at
+        versions = [self.version] + [view.version for view, _, _ in pending]
+        chained = all(b == a + 1 for a, b in zip(versions, versions[1:]))
+        if pending and chained:
+            view = pending[-1][0]
+            changed = {emp_id for _, ids, _ in pending for emp_id in ids}
+            self._lists = {role: self._merge(shortlist, view, changed) for role, shortlist in self._lists.items()}
+            self.incremental_updates += 1
+        else:
+            view = current
+            self._lists = {role: self._rank(shortlist, view) for role, shortlist in self._lists.items()}
+            self.full_builds += 1
+        self.version = view.version
+        self.refreshed_at = time.time()
+
+    def get(self, role: str, k: int) -> Tuple[List[dict], Dict[str, Any]]:
+        """
+        The role's top-k results and the shortlist's staleness. Raises KeyError
+        for a role outside the catalogue.
+        """
+        shortlist = self._lists[role]
+        results = [result for _, _, result in shortlist.entries[:k]]
+        return results, self.staleness(shortlist)
+
+    def staleness(self, shortlist: Optional[Shortlist] = None) -> Dict[str, Any]:
+        """How far the shortlists are behind the employee index; schedules a refresh if they are behind."""
+        index_version = self.service.store.view.version
+        version = shortlist.version if shortlist is not None else self.version
+        with self._lock:
+            pending = len(self._pending)
+            oldest_change = self._pending[0][2] if self._pending else None
+        if version != index_version and not pending:
+            # Changed without a notification (or one is being applied): make sure a refresh follows
+            self._wake.set()
+        now = time.time()
+        return {
+            "shortlist_version": version,
+            "index_version": index_version,
+            "stale": version != index_version,
+            "pending_updates": pending,
+            "age_seconds": round(now - self.refreshed_at, 3),
+            "lag_seconds": round(now - oldest_change, 3) if oldest_change is not None else 0.0,
+        }
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "roles": len(self._lists),
+            "depth": self.depth,
+            "capacity": self.capacity,
+            "full_builds": self.full_builds,
+            "incremental_updates": self.incremental_updates,
+            "role_reranks": self.role_reranks,
+            **self.staleness(),
+        }
+
+    def close(self) -> None:
+        self._closed = True
+        self._wake.set()
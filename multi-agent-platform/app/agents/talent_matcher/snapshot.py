@@ -0,0 +1,369 @@
+import hashlib
+import json
+import logging
+import os
+import uuid
+from collections.abc import Sequence
+from datetime import datetime, timezone
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+
+from app.agents.talent_matcher.index import normalize_rows
+from app.agents.talent_matcher.quantization import EmbeddingMatrix, quantize
+
+logger = logging.getLogger("talent_matcher")
+
+# Bump whenever the on-disk layout changes; older snapshots are then ignored and rebuilt.
+SNAPSHOT_FORMAT_VERSION = 1
+MANIFEST_FILE = "manifest.json"
+
+# Columnar metadata stored next to the embeddings, one .npy file per column
+STRING_COLUMNS = ("employee_id", "name", "title", "key_credentials", "skills")
+INT_COLUMNS = ("experience_years",)
+SKILL_SEPARATOR = "|"
+# Employee fields the columns hold; records with other fields are still read from the data file
+RECORD_FIELDS = frozenset(["Employee_ID", "name", "title", "skills", "Key_Credentials", "experience_years"])
+
+
+def profile_hash(profile_text: str, model_name: str) -> str:
+    """Content hash of a profile's embedding text, salted with the model that embeds it."""
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(model_name.encode("utf-8"))
+    digest.update(b"\0")
+    digest.update(profile_text.encode("utf-8"))
+    return digest.hexdigest()
+
+
+def employee_columns(employees: List[dict]) -> Dict[str, np.ndarray]:
+    """Converts employee dicts into the snapshot's columnar metadata arrays."""
+    return {
+        "employee_id": np.array([str(emp.get("Employee_ID", "")) for emp in employees], dtype=np.str_),
+        "name": np.array([emp.get("name", "N/A") for emp in employees], dtype=np.str_),
+        "title": np.array([emp.get("title", "N/A") for emp in employees], dtype=np.str_),
+        "key_credentials": np.array([emp.get("Key_Credentials", "") for emp in employees], dtype=np.str_),
+        "skills": np.array([SKILL_SEPARATOR.join(emp.get("skills", [])) for emp in employees], dtype=np.str_),
+        "experience_years": np.array([emp.get("experience_years", 0) for emp in employees], dtype=np.int32),
+    }
+
+
+def data_digest(*paths: str) -> str:
+    """Content hash of the employee data files (missing files count as empty)."""
+    digest = hashlib.blake2b(digest_size=16)
+    for path in paths:
+        if os.path.exists(path):
+            with open(path, "rb") as f:
+                for block in iter(lambda: f.read(1 << 20), b""):
+                    digest.update(block)
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+def columns_hold_records(employees: List[dict]) -> bool:
+    """Whether the snapshot columns can stand in for these records without losing anything."""
+    return all(
+        emp.keys() == RECORD_FIELDS
+        and all(isinstance(emp[name], str) for name in ("Employee_ID", "name", "title", "Key_Credentials"))
+        and type(emp["experience_years"]) is int
+        and all(isinstance(skill, str) and skill and SKILL_SEPARATOR not in skill for skill in emp["skills"])
+        for emp in employees
+    )
+
+
+class SnapshotEmployees(Sequence):
+    """
+    Read-only employee records backed by a snapshot's memory-mapped columns.
+    Each record is built on access, so workers share the column pages instead
+    of each holding a dict per employee.
+    """
+
+    def __init__(self, columns: Dict[str, np.ndarray]):
+        self.columns = columns
+
+    def __len__(self) -> int:
+        return len(self.columns["employee_id"])
+
+    def __getitem__(self, row):
+        if isinstance(row, slice):
+            return [self[i] for i in range(*row.indices(len(self)))]
+        skills = str(self.columns["skills"][row])
+        return {
+            "name": str(self.columns["name"][row]),
+            "title": str(self.columns["title"][row]),
+            "skills": skills.split(SKILL_SEPARATOR) if skills else [],
+            "Key_Credentials": str(self.columns["key_credentials"][row]),
+            "experience_years": int(self.columns["experience_years"][row]),
+            "Employee_ID": str(self.columns["employee_id"][row]),
+        }
+
+
+class EmbeddingSnapshot:
+    """
+    A versioned, memory-mapped snapshot of employee embeddings and metadata.
+
+    Layout of the snapshot directory:
+        manifest.json                  format version, model name, generation and file names
+        embeddings.<gen>.npy           float32 (count, dim) L2-normalised embeddings
+        hashes.<gen>.npy               per-row profile content hashes
+        <column>.<gen>.npy             columnar metadata (ids, titles, experience, ...)
+        codes.<gen>.npy / scales.<gen>.npy
+                                       optional float16 / int8 copy of the embeddings
+
+    Every write produces a new generation and then atomically replaces the
+    manifest, so readers never observe a half-written snapshot. A generation
+    whose embeddings did not change reuses the previous generation's
+    embedding files and only writes new columns.
+
+    The manifest also records the digest of the data file the snapshot was
+    built from; while it matches, startup takes the employee records from
+    the columns instead of parsing the data file.
+    """
+
+    def __init__(self, directory: str, manifest: dict, embeddings: np.ndarray,
+                 hashes: np.ndarray, columns: Dict[str, np.ndarray]):
+        self.directory = directory
+        self.manifest = manifest
+        self.embeddings = embeddings
+        self.hashes = hashes
+        self.columns = columns
+        self.codes: Optional[np.ndarray] = None
+        self.scales: Optional[np.ndarray] = None
+
+    @property
+    def model_name(self) -> str:
+        return self.manifest["model_name"]
+
+    @property
+    def generation(self) -> str:
+        return self.manifest["generation"]
+
+    @property
+    def precision(self) -> str:
+        return self.manifest.get("precision", "float32")
+
+    def employees(self, source_digest: str) -> Optional[List[dict]]:
+        """The employee records, if the snapshot was built from data with `source_digest` and the columns hold them whole."""
+        if not self.manifest.get("complete_records") or self.manifest.get("source_digest") != source_digest:
+            return None
+        return list(SnapshotEmployees(self.columns))
+
+    def matrix(self, keep_full: bool = False) -> EmbeddingMatrix:
+        """
+        The embeddings as an EmbeddingMatrix in the snapshot's precision, built
+        on the memory maps, so processes opening the same generation share its pages.
+        """
+        if self.precision == "float32":
+            return EmbeddingMatrix(self.embeddings)
+        return EmbeddingMatrix(self.codes, self.scales, self.embeddings if keep_full else None)
+
+    @classmethod
+    def load(cls, directory: str) -> Optional["EmbeddingSnapshot"]:
+        """Opens the current snapshot with zero-copy mmaps. Returns None if there is no usable snapshot."""
+        manifest_path = os.path.join(directory, MANIFEST_FILE)
+        if not os.path.exists(manifest_path):
+            return None
+        try:
+            with open(manifest_path, "r", encoding="utf-8") as f:
+                manifest = json.load(f)
+            if manifest.get("format_version") != SNAPSHOT_FORMAT_VERSION:
+                logger.info(f"Ignoring snapshot with format version {manifest.get('format_version')}")
+                return None
+            files = manifest["files"]
+            embeddings = np.load(os.path.join(directory, files["embeddings"]), mmap_mode="r")
+            hashes = np.load(os.path.join(directory, files["hashes"]), mmap_mode="r")
+            columns = {
+                name: np.load(os.path.join(directory, files["columns"][name]), mmap_mode="r")
+                for name in STRING_COLUMNS + INT_COLUMNS
+            }
+            codes = np.load(os.path.join(directory, files["codes"]), mmap_mode="r") if "codes" in files else None
+            scales = np.load(os.path.join(directory, files["scales"]), mmap_mode="r") if "scales" in files else None
+        except (OSError, KeyError, ValueError) as e:
+            logger.warning(f"Could not open embedding snapshot in {directory}: {e}")
+            return None
+        snapshot = cls(directory, manifest, embeddings, hashes, columns)
+        snapshot.codes, snapshot.scales = codes, scales
+        return snapshot
+
+    @classmethod
+    def write(cls, directory: str, model_name: str, embeddings: np.ndarray,
+              hashes: np.ndarray, columns: Dict[str, np.ndarray], precision: str = "float32",
+              source_digest: Optional[str] = None, complete_records: bool = False) -> "EmbeddingSnapshot":
+        """
+        Writes a new snapshot generation, publishes it and returns it re-opened as mmaps.
+        With a float16 / int8 `precision` the quantized embeddings are stored as well.
+        """
+        os.makedirs(directory, exist_ok=True)
+        generation = uuid.uuid4().hex[:12]
+        files = {
+            "embeddings": f"embeddings.{generation}.npy",
+            "hashes": f"hashes.{generation}.npy",
+        }
+        np.save(os.path.join(directory, files["embeddings"]), np.ascontiguousarray(embeddings, dtype=np.float32))
+        np.save(os.path.join(directory, files["hashes"]), np.asarray(hashes))
+        if precision != "float32":
+            codes, scales = quantize(embeddings, precision)
+            files["codes"] = f"codes.{generation}.npy"
+            np.save(os.path.join(directory, files["codes"]), codes)
+            if scales is not None:
+                files["scales"] = f"scales.{generation}.npy"
+                np.save(os.path.join(directory, files["scales"]), scales)
+        return cls._publish(directory, generation, model_name, precision, len(embeddings),
+                            int(embeddings.shape[1]) if embeddings.ndim == 2 else 0,
+                            files, columns, source_digest, complete_records)
+
+    def with_columns(self, columns: Dict[str, np.ndarray], source_digest: Optional[str] = None,
+                     complete_records: bool = False) -> "EmbeddingSnapshot":
+        """Publishes a generation with new columns that shares this one's embedding, hash and quantized files."""
+        generation = uuid.uuid4().hex[:12]
+        files = {name: value for name, value in self.manifest["files"].items() if name != "columns"}
+        return self._publish(self.directory, generation, self.model_name, self.precision, self.manifest["count"],
+                             self.manifest["dim"], files, columns, source_digest, complete_records)
+
+    @classmethod
+    def _publish(cls, directory: str, generation: str, model_name: str, precision: str, count: int, dim: int,
+                 files: dict, columns: Dict[str, np.ndarray], source_digest: Optional[str],
+                 complete_records: bool) -> "EmbeddingSnapshot":
+        """Writes the columns and the manifest of a generation whose other files are in place, then drops the previous one."""
+        files["columns"] = {name: f"{name}.{generation}.npy" for name in columns}
+        for name, values in columns.items():
+            np.save(os.path.join(directory, files["columns"][name]), values)
+
+        manifest = {
+            "format_version": SNAPSHOT_FORMAT_VERSION,
+            "generation": generation,
+            "model_name": model_name,
+            "precision": precision,
+            "count": int(count),
+            "dim": int(dim),
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "files": files,
+            "source_digest": source_digest,
+            "complete_records": complete_records,
+        }
+
+        manifest_path = os.path.join(directory, MANIFEST_FILE)
+        previous = cls._read_manifest(manifest_path)
+        tmp_path = f"{manifest_path}.{generation}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(manifest, f, indent=2)
+        os.replace(tmp_path, manifest_path)
+        if previous:
+            cls._remove_generation_files(directory, previous.get("files", {}), keep=cls._file_names(files))
+
+        logger.info(f"Embedding snapshot generation {generation} written ({count} rows)")
+        return cls.load(directory)
+
+    @staticmethod
+    def _read_manifest(path: str) -> Optional[dict]:
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    @staticmethod
+    def _file_names(files: dict) -> set:
+        names = [files.get("embeddings"), files.get("hashes"), files.get("codes"), files.get("scales"),
+                 *files.get("columns", {}).values()]
+        return set(filter(None, names))
+
+    @classmethod
+    def _remove_generation_files(cls, directory: str, files: dict, keep: frozenset = frozenset()) -> None:
+        """
+        Deletes a superseded generation, except the files in `keep` that the new one still uses.
+        Processes that still map it keep their view (POSIX).
+        """
+        for name in cls._file_names(files) - keep:
+            try:
+                os.remove(os.path.join(directory, name))
+            except OSError:
+                # Still mapped on platforms that lock open files, or already gone
+                pass
+
+
+def load_or_build_embeddings(
+    directory: Optional[str],
+    model_name: str,
+    employees: List[dict],
+    profile_texts: List[str],
+    encode: Callable[[List[str]], np.ndarray],
+    precision: str = "float32",
+    source_digest: Optional[str] = None,
+) -> np.ndarray:
+    """
+    Returns L2-normalised embeddings for `profile_texts`, reusing a snapshot where possible.
+
+    If the snapshot was built from the same data (`source_digest`) with the
+    same model, its memory map is returned directly (zero copy). Otherwise
+    profiles whose content hash is already in the snapshot are reused and
+    only new or changed profiles go through `encode`; when no profile text
+    changed, only the columns are rewritten and the embedding files are kept.
+    Without a directory every profile is encoded, as before. A `precision`
+    other than float32 also stores the quantized embeddings in the snapshot
+    (see EmbeddingSnapshot.matrix).
+    """
+    if not directory or not profile_texts:
+        return normalize_rows(encode(profile_texts))
+
+    snapshot = EmbeddingSnapshot.load(directory)
+    same_model = snapshot is not None and snapshot.model_name == model_name
+    if (
+        same_model
+        and snapshot.precision == precision
+        and source_digest is not None
+        and snapshot.manifest.get("source_digest") == source_digest
+        and len(snapshot.embeddings) == len(profile_texts)
+    ):
+        print(f"✅ Loaded {len(profile_texts)} employee embeddings from snapshot {snapshot.generation}.")
+        return snapshot.embeddings
+
+    hashes = np.array([profile_hash(text, model_name) for text in profile_texts], dtype="S32")
+    columns = employee_columns(employees)
+    complete = columns_hold_records(employees)
+    if same_model and snapshot.precision == precision and np.array_equal(snapshot.hashes, hashes):
+        # Only fields outside the embedded text changed (names, experience, IDs): keep the embedding files
+        try:
+            snapshot = snapshot.with_columns(columns, source_digest, complete)
+        except OSError as e:
+            logger.warning(f"Could not update the embedding snapshot in {directory}: {e}")
+        print(f"✅ Loaded {len(hashes)} employee embeddings from snapshot {snapshot.generation}.")
+        return snapshot.embeddings
+
+    # Reuse every row the snapshot already has and encode only the rest
+    known: Dict[bytes, int] = {}
+    if same_model:
+        known = {h: row for row, h in enumerate(snapshot.hashes.tolist())}
+    reuse = [(i, known[h]) for i, h in enumerate(hashes.tolist()) if h in known]
+    missing = [i for i, h in enumerate(hashes.tolist()) if h not in known]
+
+    dim = snapshot.embeddings.shape[1] if reuse else None
+    fresh = normalize_rows(encode([profile_texts[i] for i in missing])) if missing else None
+    if dim is None:
+        dim = fresh.shape[1]
+
+    embeddings = np.empty((len(profile_texts), dim), dtype=np.float32)
+    if reuse:
+        dst, src = map(list, zip(*reuse))
+        embeddings[dst] = snapshot.embeddings[src]
+    if missing:
+        embeddings[missing] = fresh
+    print(f"🔄 Snapshot refresh: reused {len(reuse)} embeddings, encoded {len(missing)} new or changed profiles.")
+
+    try:
+        snapshot = EmbeddingSnapshot.write(directory, model_name, embeddings, hashes, columns, precision,
+                                           source_digest, complete)
+    except OSError as e:
+        logger.warning(f"Could not write embedding snapshot to {directory}: {e}")
+        return embeddings
+    return snapshot.embeddings if snapshot is not None else embeddings
+
+
+def load_snapshot_employees(directory: Optional[str], source_digest: str) -> Optional[List[dict]]:
+    """
+    The employee records from the snapshot in `directory`, if it was built from
+    data with `source_digest`; None when the data file has to be read instead.
+    """
+    if not directory:
+        return None
+    snapshot = EmbeddingSnapshot.load(directory)
+    return None if snapshot is None else snapshot.employees(source_digest)
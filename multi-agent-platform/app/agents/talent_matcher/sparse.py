@@ -0,0 +1,187 @@
+import math
+import re
+from typing import Dict, Iterable, List, Tuple
+
+import numpy as np
+
+from app.agents.talent_matcher.index import top_k
+
+FUSION_METHODS = ("weighted", "rrf")
+
+# Standard BM25 parameters: term-frequency saturation and length normalisation
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+# Longest skill phrase (in words) looked up as a single term, e.g. "sap fica" or "power bi"
+MAX_PHRASE_WORDS = 3
+
+_TOKEN = re.compile(r"[a-z0-9][a-z0-9+#]*(?:[.\-][a-z0-9+#]+)*")
+
+
+def sparse_tokens(text: str) -> List[str]:
+    """Lower-cased word tokens that keep names like "c++", "c#", "node.js" and "ci-cd" intact."""
+    return _TOKEN.findall((text or "").lower())
+
+
+def document_terms(emp: dict) -> List[str]:
+    """
+    Terms indexed for an employee: the words of the title, skills and
+    credentials, plus each multi-word skill as one phrase term, so that
+    "SAP FICA" only matches profiles that list that skill.
+    """
+    terms = sparse_tokens(f"{emp.get('title', '')} {' '.join(emp.get('skills', []))} {emp.get('Key_Credentials', '')}")
+    for skill in emp.get("skills", []):
+        words = sparse_tokens(skill)
+        if 1 < len(words) <= MAX_PHRASE_WORDS:
+            terms.append(" ".join(words))
+    return terms
+
+
+def query_terms(text: str) -> List[str]:
+    """Distinct words and word n-grams (up to MAX_PHRASE_WORDS) of a job description."""
+    words = sparse_tokens(text)
+    terms = set(words)
+    for n in range(2, MAX_PHRASE_WORDS + 1):
+        terms.update(" ".join(words[i:i + n]) for i in range(len(words) - n + 1))
+    return sorted(terms)
+
+
+class BM25Index:
+    """
+    Inverted index over employee titles, skills and credentials, scored with BM25.
+
+    postings maps each term to (rows, term frequencies), with rows in
+    ascending order. Like ColumnStore it is never modified once published:
+    `extended` returns a new index sharing the untouched postings, and `take`
+    returns a compacted copy. Tombstoned rows stay in the statistics until
+    the table is compacted, which only nudges the IDF weights.
+    """
+
+    def __init__(self, postings: Dict[str, Tuple[np.ndarray, np.ndarray]], doc_len: np.ndarray):
+        self.postings = postings
+        self.doc_len = doc_len
+
+    def __len__(self) -> int:
+        return len(self.doc_len)
+
+    def extended(self, employees: List[dict]) -> "BM25Index":
+        """Returns a new index with `employees` appended as new rows."""
+        start = len(self)
+        new_postings: Dict[str, Tuple[List[int], List[int]]] = {}
+        lengths = []
+        for row, emp in enumerate(employees, start=start):
+            terms = document_terms(emp)
+            lengths.append(len(terms))
+            counts: Dict[str, int] = {}
+            for term in terms:
+                counts[term] = counts.get(term, 0) + 1
+            for term, count in counts.items():
+                rows, tfs = new_postings.setdefault(term, ([], []))
+                rows.append(row)
+                tfs.append(count)
+
+        postings = dict(self.postings)
+        for term, (rows, tfs) in new_postings.items():
+            rows, tfs = np.array(rows, dtype=np.int64), np.array(tfs, dtype=np.float32)
+            existing = postings.get(term)
+            if existing is not None:
+                rows, tfs = np.concatenate([existing[0], rows]), np.concatenate([existing[1], tfs])
+            postings[term] = (rows, tfs)
+        return BM25Index(postings, np.concatenate([self.doc_len, np.array(lengths, dtype=np.float32)]))
+
+    def take(self, rows: np.ndarray) -> "BM25Index":
+        """Returns a compacted index holding only `rows`, renumbered from 0."""
+        remap = np.full(len(self), -1, dtype=np.int64)
+        remap[rows] = np.arange(len(rows))
+        postings = {}
+        for term, (term_rows, tfs) in self.postings.items():
+            kept = remap[term_rows]
+            keep = kept >= 0
+            if keep.any():
+                postings[term] = (kept[keep], tfs[keep])
+        return BM25Index(postings, self.doc_len[rows])
+
+    def idf(self, term: str) -> float:
+        posting = self.postings.get(term)
+        df = 0 if posting is None else len(posting[0])
+        return math.log(1 + (len(self) - df + 0.5) / (df + 0.5))
+
+    def scores(self, terms: Iterable[str]) -> np.ndarray:
+        """BM25 score of every row for the query `terms` (0 for rows matching none of them)."""
+        n = len(self)
+        if n == 0:
+            return np.zeros(0, dtype=np.float32)
+        avg_len = max(float(self.doc_len.mean()), 1.0)
+        all_rows, all_weights = [], []
+        for term in set(terms):
+            posting = self.postings.get(term)
+            if posting is None:
+                continue
+            rows, tfs = posting
+            norm = BM25_K1 * (1 - BM25_B + BM25_B * self.doc_len[rows] / avg_len)
+            all_rows.append(rows)
+            all_weights.append(self.idf(term) * tfs * (BM25_K1 + 1) / (tfs + norm))
+        if not all_rows:
+            return np.zeros(n, dtype=np.float32)
+        return np.bincount(np.concatenate(all_rows), weights=np.concatenate(all_weights), minlength=n).astype(np.float32)
+
+    def matching_terms(self, terms: Iterable[str], row: int) -> List[str]:
+        """The query terms that occur in `row`, rarest (most informative) first."""
+        found = []
+        for term in set(terms):
+            posting = self.postings.get(term)
+            if posting is None:
+                continue
+            rows = posting[0]
+            i = np.searchsorted(rows, row)
+            if i < len(rows) and rows[i] == row:
+                found.append(term)
+        return sorted(found, key=lambda term: (-self.idf(term), term))
+
+
+def prune_mask(sparse_scores: np.ndarray, mask: np.ndarray, keep: int) -> np.ndarray:
+    """
+    Narrows `mask` to the `keep` rows with the best BM25 score, so dense scoring
+    only sees keyword-relevant candidates. If no allowed row matches any query
+    term the mask is returned unchanged (dense-only fallback).
+    """
+    candidates = np.flatnonzero(mask & (sparse_scores > 0))
+    if not len(candidates):
+        return mask
+    if len(candidates) > keep:
+        candidates = candidates[top_k(sparse_scores[candidates], keep)]
+    pruned = np.zeros_like(mask)
+    pruned[candidates] = True
+    return pruned
+
+
+def fuse(dense: np.ndarray, sparse: np.ndarray, method: str = "weighted",
+         sparse_weight: float = 0.3, rrf_k: int = 60) -> np.ndarray:
+    """
+    Combines dense (cosine) and sparse (BM25) scores of the same candidates.
+
+    - "weighted": (1 - w) * cosine + w * BM25 / max BM25 over the candidates.
+    - "rrf": reciprocal rank fusion, sum of 1 / (rrf_k + rank) over both
+      rankings; candidates without any keyword match get no sparse term.
+    """
+    if method == "weighted":
+        best = float(sparse.max()) if len(sparse) else 0.0
+        normalised = sparse / best if best > 0 else np.zeros_like(sparse)
+        return ((1 - sparse_weight) * dense + sparse_weight * normalised).astype(np.float32)
+    if method == "rrf":
+        dense_rank = np.empty(len(dense), dtype=np.float32)
+        dense_rank[np.argsort(-dense, kind="stable")] = np.arange(1, len(dense) + 1)
+        sparse_rank = np.empty(len(sparse), dtype=np.float32)
+        sparse_rank[np.argsort(-sparse, kind="stable")] = np.arange(1, len(sparse) + 1)
+        fused = 1.0 / (rrf_k + dense_rank) + np.where(sparse > 0, 1.0 / (rrf_k + sparse_rank), 0.0)
+        return fused.astype(np.float32)
+    raise ValueError(f"Unknown fusion method: {method}. Choose from: {', '.join(FUSION_METHODS)}")
+
+
+def hybrid_candidates(dense_rows: np.ndarray, sparse_scores: np.ndarray, mask: np.ndarray,
+                      depth: int) -> np.ndarray:
+    """Union of the dense top rows and the `depth` best keyword-matching rows allowed by `mask`."""
+    sparse_rows = np.flatnonzero(mask & (sparse_scores > 0))
+    if len(sparse_rows) > depth:
+        sparse_rows = sparse_rows[top_k(sparse_scores[sparse_rows], depth)]
+    return np.union1d(dense_rows, sparse_rows)
@@ -0,0 +1,186 @@
+import logging
+import threading
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from app.agents.talent_matcher.columns import ColumnStore
+from app.agents.talent_matcher.index import VectorIndex, normalize_rows
+from app.agents.talent_matcher.quantization import EmbeddingMatrix, as_matrix
+from app.agents.talent_matcher.loader import build_profile_text
+
+logger = logging.getLogger("talent_matcher")
+
+# Rebuild the table once this fraction of its rows are tombstones
+COMPACTION_RATIO = 0.25
+MIN_COMPACTION_ROWS = 1024
+
+
+class StoreView:
+    """
+    An immutable, self-consistent view of the employee table.
+
+    Match requests grab the current view once and use it for the whole request.
+    Writers never modify a published view; they publish a new one instead
+    (read-copy-update), so readers never wait on writers.
+    """
+
+    __slots__ = ("version", "employees", "embeddings", "alive", "id_to_row", "index", "columns")
+
+    def __init__(self, version: int, employees: List[dict], embeddings: EmbeddingMatrix,
+                 alive: np.ndarray, id_to_row: Dict[str, int], index: VectorIndex,
+                 columns: ColumnStore):
+        self.version = version
+        self.employees = employees
+        self.embeddings = embeddings
+        self.alive = alive
+        self.id_to_row = id_to_row
+        self.index = index
+        self.columns = columns
+
+    @property
+    def size(self) -> int:
+        """Number of live (non-deleted) employees."""
+        return len(self.id_to_row)
+
+    def live_employees(self) -> List[dict]:
+        return [self.employees[row] for row in self.id_to_row.values()]
+
+
+class EmployeeStore:
+    """
+    Append-only employee table with copy-on-write publication.
+
+    Rows are only ever appended into spare capacity of the embedding buffer
+    that published views cannot see; updates append a new row and tombstone
+    the old one, deletes only tombstone. Each mutation copies the small
+    per-row structures (alive mask, id map, employee list), extends the vector
+    index and the filter columns, and publishes a new view with a higher version. The table is
+    compacted once tombstones pile up.
+    """
+
+    def __init__(self, employees: List[dict], embeddings,
+                 index_factory: Callable[[], VectorIndex]):
+        self._index_factory = index_factory
+        self._lock = threading.Lock()
+        self._buffer = as_matrix(embeddings)
+        self._view = self._build_view(0, employees, self._buffer)
+
+    @property
+    def view(self) -> StoreView:
+        return self._view
+
+    def _build_view(self, version: int, employees: List[dict], embeddings: EmbeddingMatrix,
+                    columns: Optional[ColumnStore] = None) -> StoreView:
+        index = self._index_factory()
+        index.build(embeddings)
+        alive = np.ones(len(employees), dtype=bool)
+        id_to_row = {}
+        for row, emp in enumerate(employees):
+            previous = id_to_row.get(emp["Employee_ID"])
+            if previous is not None:
+                alive[previous] = False
+            id_to_row[emp["Employee_ID"]] = row
+        columns = columns if columns is not None else ColumnStore.from_employees(employees)
+        return StoreView(version, employees, embeddings, alive, id_to_row, index, columns)
+
+    def next_id(self) -> str:
+        """Smallest numeric ID larger than every numeric ID in the table."""
+        numeric = [int(emp_id) for emp_id in self._view.id_to_row if emp_id.isdigit()]
+        return str(max(numeric, default=0) + 1)
+
+    def upsert(self, records: List[dict], encode: Callable[[List[str]], np.ndarray]) -> Tuple[StoreView, List[str], int]:
+        """
+        Inserts or replaces employees by `Employee_ID`.
+
+        Only records whose profile text changed (or that are new) are passed to
+        `encode`; the others reuse their existing embedding row.
+        Returns the published view, the employee IDs and the number of encoded profiles.
+        """
+        with self._lock:
+            view = self._view
+            records = [dict(record) for record in records]
+            next_id = int(self.next_id())
+            for record in records:
+                if record.get("Employee_ID"):
+                    record["Employee_ID"] = str(record["Employee_ID"])
+                else:
+                    record["Employee_ID"] = str(next_id)
+                    next_id += 1
+
+            # Work out which rows need a new embedding
+            new_vectors = np.empty((len(records), view.embeddings.dim), dtype=np.float32)
+            to_encode = []
+            for i, record in enumerate(records):
+                old_row = view.id_to_row.get(record["Employee_ID"], -1)
+                if old_row >= 0 and build_profile_text(view.employees[old_row]) == build_profile_text(record):
+                    new_vectors[i] = view.embeddings.vectors([old_row])[0]
+                else:
+                    to_encode.append(i)
+            if to_encode:
+                new_vectors[to_encode] = normalize_rows(encode([build_profile_text(records[i]) for i in to_encode]))
+
+            start = len(view.employees)
+            embeddings = self._append(start, new_vectors)
+            rows = np.arange(start, start + len(records))
+
+            alive = np.concatenate([view.alive, np.ones(len(records), dtype=bool)])
+            id_to_row = dict(view.id_to_row)
+            for row, record in zip(rows.tolist(), records):
+                previous = id_to_row.get(record["Employee_ID"])
+                if previous is not None:
+                    alive[previous] = False
+                id_to_row[record["Employee_ID"]] = row
+
+            self._publish(StoreView(
+                view.version + 1,
+                view.employees + records,
+                embeddings,
+                alive,
+                id_to_row,
+                view.index.with_rows(embeddings, rows),
+                view.columns.extended(records),
+            ))
+            return self._view, [record["Employee_ID"] for record in records], len(to_encode)
+
+    def delete(self, employee_ids: List[str]) -> Tuple[StoreView, List[str]]:
+        """Tombstones the given employees. Returns the published view and the IDs that existed."""
+        with self._lock:
+            view = self._view
+            deleted = [emp_id for emp_id in employee_ids if emp_id in view.id_to_row]
+            if not deleted:
+                return view, []
+            alive = view.alive.copy()
+            id_to_row = dict(view.id_to_row)
+            for emp_id in deleted:
+                alive[id_to_row.pop(emp_id)] = False
+            self._publish(StoreView(
+                view.version + 1, view.employees, view.embeddings, alive, id_to_row, view.index, view.columns
+            ))
+            return self._view, deleted
+
+    def _append(self, start: int, vectors: np.ndarray) -> EmbeddingMatrix:
+        """
+        Writes `vectors` after row `start` and returns the visible embeddings for the new view.
+        Grows the buffer geometrically; the old buffer stays alive for readers still using it.
+        """
+        self._buffer = self._buffer.appended(start, vectors)
+        return self._buffer.head(start + len(vectors))
+
+    def _publish(self, view: StoreView) -> None:
+        dead = len(view.employees) - view.size
+        if dead >= MIN_COMPACTION_ROWS and dead > COMPACTION_RATIO * len(view.employees):
+            view = self._compact(view)
+        self._view = view
+
+    def _compact(self, view: StoreView) -> StoreView:
+        """Drops tombstoned rows and rebuilds the index from scratch."""
+        rows = np.flatnonzero(view.alive)
+        logger.info(f"Compacting employee table: {len(view.employees)} -> {len(rows)} rows")
+        employees = [view.employees[row] for row in rows]
+        self._buffer = view.embeddings.take(rows)
+        return self._build_view(view.version, employees, self._buffer, view.columns.take(rows))
+
+    def find(self, employee_id: str) -> Optional[dict]:
+        row = self._view.id_to_row.get(employee_id)
+        return None if row is None else self._view.employees[row]
@@ -0,0 +1,138 @@
+import logging
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Optional
+
+logger = logging.getLogger("talent_matcher")
+
+DEFAULT_TENANT = "default"
+
+_TENANT_ID = re.compile(r"^[A-Za-z0-9_-]{1,64}$")
+
+
+class UnknownTenantError(Exception):
+    """Raised for a tenant ID that is malformed or has no employee data."""
+
+
+class TenantRegistry:
+    """
+    Per-tenant TalentMatcherServices, loaded on first use and evicted LRU.
+
+    The default tenant is the service built at startup; it is always
+    available and never evicted. Every other tenant has its own data file
+    (`<tenants_dir>/<tenant>/employees.jsonl`) and snapshot directory and is
+    built the first time it is requested, sharing the default service's
+    models and caches.
+
+    Loading is single-flight: concurrent first requests for a tenant wait on
+    the same build instead of starting their own. After each build, the least
+    recently used tenants are evicted until the loaded tenants fit in
+    `memory_budget` bytes (the tenant just loaded is always kept). Requests
+    already holding an evicted service finish normally.
+    """
+
+    def __init__(self, default_service: Callable[[], Any], build: Callable[[str, str, Any], Any],
+                 tenants_dir: str, snapshot_dir: str, memory_budget: int):
+        self._default_service = default_service
+        self._build = build
+        self.tenants_dir = tenants_dir
+        self.snapshot_dir = snapshot_dir
+        self.memory_budget = memory_budget
+        self._lock = threading.Lock()
+        self._tenants: "OrderedDict[str, Future]" = OrderedDict()
+        self.loads = 0
+        self.evictions = 0
+        self.hits = 0
+
+    def data_path(self, tenant_id: str) -> str:
+        return os.path.join(self.tenants_dir, tenant_id, "employees.jsonl")
+
+    def get(self, tenant_id: Optional[str] = None):
+        """The service for `tenant_id` (the default service for None / "default"), loading it if needed."""
+        if not tenant_id or tenant_id == DEFAULT_TENANT:
+            return self._default_service()
+        if not _TENANT_ID.match(tenant_id):
+            raise UnknownTenantError(f"Invalid tenant ID '{tenant_id}'")
+
+        with self._lock:
+            future = self._tenants.get(tenant_id)
+            owner = future is None
+            if owner:
+                future = Future()
+                self._tenants[tenant_id] = future
+            else:
+                self._tenants.move_to_end(tenant_id)
+                self.hits += 1
+        if not owner:
+            return future.result()
+
+        try:
+            service = self._load(tenant_id)
+        except BaseException as e:
+            with self._lock:
+                self._tenants.pop(tenant_id, None)
+            future.set_exception(e)
+            raise
+        future.set_result(service)
+        self._enforce_budget(keep=tenant_id)
+        return service
+
+    def is_loaded(self, tenant_id: Optional[str] = None) -> bool:
+        """Whether the tenant's service is built or being built; the default tenant always is."""
+        if not tenant_id or tenant_id == DEFAULT_TENANT:
+            return True
+        with self._lock:
+            return tenant_id in self._tenants
+
+    def _load(self, tenant_id: str):
+        data_path = self.data_path(tenant_id)
+        if not os.path.exists(data_path):
+            raise UnknownTenantError(f"Unknown tenant '{tenant_id}'")
+        snapshot_dir = os.path.join(self.snapshot_dir, "tenants", tenant_id) if self.snapshot_dir else ""
+        start = time.perf_counter()
+        service = self._build(data_path, snapshot_dir, self._default_service())
+        self.loads += 1
+        logger.info(f"Tenant '{tenant_id}' loaded in {time.perf_counter() - start:.2f}s "
+                    f"({service.memory_bytes() / 2**20:.1f} MiB)")
+        return service
+
+    def _loaded(self) -> Dict[str, Any]:
+        """Tenants whose build has finished successfully, least recently used first."""
+        return {
+            tenant_id: future.result()
+            for tenant_id, future in self._tenants.items()
+            if future.done() and future.exception() is None
+        }
+
+    def _enforce_budget(self, keep: str) -> None:
+        with self._lock:
+            loaded = self._loaded()
+            used = sum(service.memory_bytes() for service in loaded.values())
+            for tenant_id, service in loaded.items():
+                if used <= self.memory_budget:
+                    break
+                if tenant_id == keep:
+                    continue
+                del self._tenants[tenant_id]
+                used -= service.memory_bytes()
+                self.evictions += 1
+                logger.info(f"Evicted tenant '{tenant_id}' to stay within the memory budget")
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            loaded = self._loaded()
+            loading = [tenant_id for tenant_id, future in self._tenants.items() if not future.done()]
+        return {
+            "loaded": {tenant_id: {"employees": service.store.view.size, "memory_mb": service.memory_bytes() / 2**20}
+                       for tenant_id, service in loaded.items()},
+            "loading": loading,
+            "memory_mb": sum(service.memory_bytes() for service in loaded.values()) / 2**20,
+            "memory_budget_mb": self.memory_budget / 2**20,
+            "loads": self.loads,
+            "hits": self.hits,
+            "evictions": self.evictions,
+        }
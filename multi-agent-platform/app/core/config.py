@@ -16,6 +16,33 @@ class Settings(BaseSettings):
     GEMINI_API_KEY: Optional[str] = None
     OPENAI_API_KEY: Optional[str] = None
     
+    # LLM response cache
+    LLM_CACHE_SIZE: int = 1024  # responses kept in memory; 0 = off
+    LLM_CACHE_TTL: int = 86400  # seconds; 0 = no expiry
+    LLM_CACHE_MONGO: bool = False  # also share responses across workers and restarts in MongoDB
+    LLM_CACHE_COLLECTION: str = "llm_cache"
+    # Agents whose calls are cached; the JD and job post writers are left out so regenerating gives a new draft
+    LLM_CACHE_AGENTS: list = ["criteria_agent", "question_generator"]
+    
+    # LLM call scheduling (set the limits to your Gemini quota tier)
+    LLM_RPM_LIMIT: int = 0  # requests per minute; 0 = unlimited
+    LLM_TPM_LIMIT: int = 0  # tokens per minute; 0 = unlimited
+    LLM_MAX_CONCURRENCY: int = 8  # calls in flight; halved on 429/503 and grown back as calls succeed
+    LLM_MIN_CONCURRENCY: int = 1
+    LLM_OUTPUT_TOKEN_ESTIMATE: int = 1024  # tokens reserved for a response until its real usage is known
+    
+    # LLM call resilience
+    LLM_TIMEOUT: float = 60.0  # seconds per generate_text call from admission, retries included; 0 = none
+    LLM_MAX_RETRIES: int = 2  # retries of timeouts, 429s and 5xx errors
+    LLM_RETRY_BASE_DELAY: float = 0.5  # backoff before retry n is random in [0, base * 2^n]
+    LLM_RETRY_MAX_DELAY: float = 8.0
+    # Per agent overrides of LLM_TIMEOUT / LLM_MAX_RETRIES; setting it replaces this whole default.
+    # The question generator uploads the resume with every call, so it gets longer than other agents.
+    LLM_AGENT_POLICIES: dict = {"question_generator": {"timeout": 120}}
+    LLM_HEDGE: bool = False  # duplicate a call still unanswered after the recent p95 latency; first answer wins
+    LLM_BREAKER_THRESHOLD: int = 5  # consecutive failures that stop calls to the model; 0 = off
+    LLM_BREAKER_RESET: float = 30.0  # seconds before a probe call is let through
+    
     # File Upload
     UPLOAD_DIR: str = "./uploads"
     MAX_UPLOAD_SIZE: int = 10 * 1024 * 1024  # 10MB
@@ -23,6 +50,51 @@ class Settings(BaseSettings):
     # CORS
     ALLOWED_ORIGINS: list = ["*"]
     
+    # Talent Matcher
+    TALENT_MATCHER_MODEL: str = "all-MiniLM-L6-v2"
+    TALENT_MATCHER_BACKEND: str = "torch"  # "torch" or "onnx" (needs: pip install "sentence-transformers[onnx]")
+    TALENT_MATCHER_ONNX_DIR: str = "data/models/talent_matcher"  # where the ONNX export is cached
+    TALENT_MATCHER_ONNX_QUANTIZATION: str = ""  # "" = fp32 ONNX; "avx2", "avx512", "avx512_vnni" or "arm64" = int8
+    TALENT_MATCHER_INTRA_OP_THREADS: int = 0  # threads per encode call; 0 = library default
+    TALENT_MATCHER_INTER_OP_THREADS: int = 0  # 0 = library default
+    TALENT_MATCHER_BACKEND_TOLERANCE: float = 0.02  # max cosine score drift allowed vs PyTorch
+    TALENT_MATCHER_DATA_PATH: str = "data/employees.jsonl"
+    TALENT_MATCHER_SKILL_TAXONOMY: str = "data/skill_taxonomy.json"  # canonical skills / degrees and their synonyms
+    TALENT_MATCHER_SNAPSHOT_DIR: str = "data/snapshots/talent_matcher"  # empty = always re-encode
+    TALENT_MATCHER_PERSIST_UPDATES: bool = True  # log upserts/deletes to <data file>.changes.jsonl, folded into <data file>.live.jsonl
+    TALENT_MATCHER_TENANTS_DIR: str = "data/tenants"  # <dir>/<tenant_id>/employees.jsonl
+    TALENT_MATCHER_TENANT_MEMORY_MB: int = 2048  # loaded tenants beyond this are evicted, least recently used first
+    TALENT_MATCHER_INDEX: str = "exact"  # "exact" or "ivf"
+    TALENT_MATCHER_IVF_NLIST: int = 0  # 0 = sqrt(number of employees)
+    TALENT_MATCHER_IVF_NPROBE: int = 8
+    TALENT_MATCHER_PRECISION: str = "float32"  # "float32", "float16" or "int8"
+    TALENT_MATCHER_RESCORE_FACTOR: int = 0  # re-score top_k * factor candidates in float32; 0 = off
+    TALENT_MATCHER_SHARDS: int = 0  # split the employees over N worker processes searched in parallel; 0 = off
+    TALENT_MATCHER_SHARED_STORE: bool = False  # app workers map one snapshot generation instead of each holding a copy
+    TALENT_MATCHER_RETRIEVAL: str = "dense"  # "dense" or "hybrid" (BM25 + dense)
+    TALENT_MATCHER_FUSION: str = "weighted"  # "weighted" or "rrf"
+    TALENT_MATCHER_SPARSE_WEIGHT: float = 0.3  # weight of the normalised BM25 score in "weighted" fusion
+    TALENT_MATCHER_RRF_K: int = 60
+    TALENT_MATCHER_FUSION_DEPTH: int = 100  # candidates taken from each stage before fusing
+    TALENT_MATCHER_SPARSE_PRUNE: int = 0  # dense-score only the N best BM25 matches; 0 = off
+    TALENT_MATCHER_RERANK_MODEL: str = "cross-encoder/ms-marco-MiniLM-L-6-v2"  # loaded on the first re-rank request
+    TALENT_MATCHER_RERANK_CACHE_SIZE: int = 100000  # cached (JD, profile) pair scores; 0 = off
+    TALENT_MATCHER_READY_TIMEOUT: float = 0  # seconds a request waits for startup before 503; 0 = fail fast
+    TALENT_MATCHER_EXECUTOR: str = "thread"  # "thread" or "process"
+    TALENT_MATCHER_WORKERS: int = 4
+    TALENT_MATCHER_MAX_QUEUE: int = 64  # match tasks allowed to wait for a worker before returning 503
+    TALENT_MATCHER_CHANGE_FEED_SIZE: int = 1000  # employee changes kept for process workers; 0 = no limit
+    TALENT_MATCHER_ENCODE_BATCH_SIZE: int = 32  # JDs encoded per batched model call; 1 = no batching
+    TALENT_MATCHER_ENCODE_MAX_WAIT_MS: float = 5.0  # how long a batch waits for more JDs
+    TALENT_MATCHER_JD_CACHE_SIZE: int = 1024  # cached JD embeddings; 0 = off
+    TALENT_MATCHER_JD_CACHE_TTL: int = 3600  # seconds; 0 = no expiry
+    TALENT_MATCHER_RESULT_CACHE_SIZE: int = 1024  # cached match results; 0 = off
+    TALENT_MATCHER_RESULT_CACHE_TTL: int = 300  # seconds; 0 = no expiry
+    TALENT_MATCHER_RANKING_CACHE_SIZE: int = 32  # full candidate rankings kept for paging / export; 0 = off
+    TALENT_MATCHER_RANKING_CACHE_TTL: int = 120  # seconds; 0 = no expiry
+    TALENT_MATCHER_SHORTLIST_DEPTH: int = 100  # candidates materialized per JD Agent catalogue role; 0 = off
+    TALENT_MATCHER_SHORTLIST_BUFFER: int = 50  # extra candidates kept so updates rarely force a full role re-rank
+    
     class Config:
         env_file = ".env"
         case_sensitive = True
@@ -15,14 +15,15 @@ from fastapi.middleware.cors import CORSMiddleware
 # --- Application-Specific Imports ---
 from app.core.config import settings
 from app.services.database import DatabaseService
-from app.core.dependencies import get_websocket_manager
+from app.core.dependencies import get_websocket_manager, llm_service
+from app.services.llm_cache import llm_cache_middleware
 
 # Import agent routers
 from app.agents.jd_agent.router import router as jd_router
 from app.agents.example_agent.router import router as example_agent_router
 from app.agents.criteria_agent.router import router as criteria_router
 from app.agents.job_post_agent.router import router as job_post_agent_router
-from app.agents.talent_matcher.router import router as talent_matcher_router
+from app.agents.talent_matcher.router import router as talent_matcher_router, executor as talent_matcher_executor, matcher as talent_matcher
 from app.agents.question_generator.router import router as question_generator_router
 
 # Setup logging
@@ -39,12 +40,17 @@ async def lifespan(app: FastAPI):
     # Startup
     logger.info("🚀 Starting Multi-Agent Platform...")
     await DatabaseService.connect_db(settings.MONGODB_URL)
+    # Load the talent matcher's model and index in the background; see /api/v1/talent_matcher/ready
+    talent_matcher.start()
     logger.info("✅ Application started successfully")
     
     yield
     
     # Shutdown
     logger.info("🛑 Shutting down...")
+    talent_matcher_executor.shutdown()
+    if talent_matcher.ready:
+        talent_matcher.get().close()
     await DatabaseService.close_db()
     logger.info("✅ Application shut down successfully")
 
@@ -65,6 +71,9 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Reports the LLM response cache status in X-LLM-Cache; `Cache-Control: no-cache` skips the cache
+app.middleware("http")(llm_cache_middleware)
+
 
 app.include_router(example_agent_router, prefix="/api/v1/example", tags=["Example Agent"])
 app.include_router(jd_router, prefix="/api/v1/jd", tags=["Job Description Agent"])
@@ -82,6 +91,12 @@ async def root():
     }
 
 
+@app.get("/api/v1/llm/stats")
+async def llm_stats():
+    """LLM response cache hit rate and counters."""
+    return llm_service.stats()
+
+
 # WebSocket example endpoint
 @app.websocket("/ws/{client_id}")
 async def websocket_endpoint(websocket: WebSocket, client_id: str):
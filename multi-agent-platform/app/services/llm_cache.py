@@ -0,0 +1,160 @@
+# File: app/services/llm_cache.py
+
+import hashlib
+import logging
+from contextvars import ContextVar
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from app.services.database import DatabaseService
+from app.utils.cache import LRUCache
+
+logger = logging.getLogger("llm_service")
+
+# Response header listing what the cache did for each LLM call a request made
+CACHE_HEADER = "X-LLM-Cache"
+
+# Cache statuses; "coalesced" = shared the result of an identical call already in flight
+MEMORY_HIT, MONGO_HIT, MISS, BYPASS, COALESCED = "memory-hit", "mongo-hit", "miss", "bypass", "coalesced"
+
+# Set per request by `llm_cache_middleware`
+_statuses: ContextVar[Optional[List[str]]] = ContextVar("llm_cache_statuses", default=None)
+_bypass: ContextVar[bool] = ContextVar("llm_cache_bypass", default=False)
+
+
+def cache_key(model_name: str, prompt: str, file_hashes: Sequence[str] = ()) -> str:
+    """Content address of an LLM call: the model, the prompt and the content hashes of any attached files."""
+    digest = hashlib.sha256()
+    for part in (model_name, prompt, *file_hashes):
+        digest.update(part.encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+def record_status(status: str) -> None:
+    """Notes the cache status of one LLM call for the current request's response header."""
+    statuses = _statuses.get()
+    if statuses is not None:
+        statuses.append(status)
+
+
+def bypass_requested() -> bool:
+    """Whether the current request asked not to be served from the cache (Cache-Control: no-cache)."""
+    return _bypass.get()
+
+
+async def llm_cache_middleware(request, call_next):
+    """
+    HTTP middleware: honours `Cache-Control: no-cache` / `no-store` on the
+    request by skipping the LLM response cache, and reports the cache status
+    of every LLM call the request made in the X-LLM-Cache response header
+    (e.g. "memory-hit, miss").
+    """
+    statuses: List[str] = []
+    _statuses.set(statuses)
+    cache_control = request.headers.get("cache-control", "").lower()
+    _bypass.set("no-cache" in cache_control or "no-store" in cache_control)
+    response = await call_next(request)
+    if statuses:
+        response.headers[CACHE_HEADER] = ", ".join(statuses)
+    return response
+
+
+class LLMResponseCache:
+    """
+    Two-tier cache of LLM responses keyed by `cache_key`.
+
+    The first tier is an in-process LRU with a TTL. The optional second tier
+    is a MongoDB collection (through DatabaseService) with a TTL index on
+    `created_at`, shared by every worker and kept across restarts; a hit there
+    is copied into the first tier. Failed MongoDB calls are logged and
+    treated as misses, so the cache never fails an LLM call.
+    """
+
+    def __init__(self, max_entries: int, ttl_seconds: int, mongo: bool = False,
+                 db_name: str = "", collection_name: str = "llm_cache"):
+        self.memory = LRUCache(max_entries, ttl_seconds)
+        self.ttl = ttl_seconds
+        self.mongo = mongo
+        self.db_name = db_name
+        self.collection_name = collection_name
+        self._index_ready = False
+        self.mongo_hits = 0
+        self.mongo_misses = 0
+        self.mongo_errors = 0
+        self.bypassed = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.memory.enabled or self.mongo
+
+    async def _collection(self):
+        """The MongoDB collection, with its TTL index ensured; None when the tier is off or unavailable."""
+        if not self.mongo or DatabaseService.client is None:
+            return None
+        collection = DatabaseService.get_collection(self.db_name, self.collection_name)
+        if not self._index_ready:
+            self._index_ready = True
+            if self.ttl:
+                try:
+                    await collection.create_index("created_at", expireAfterSeconds=int(self.ttl))
+                except Exception as e:
+                    # e.g. an existing index with a different TTL; expired entries are still skipped on read
+                    logger.warning(f"Could not create the TTL index on {self.collection_name}: {e}")
+        return collection
+
+    async def get(self, key: str) -> Tuple[Optional[str], str]:
+        """The cached response for `key` (or None) and where it came from: memory-hit, mongo-hit or miss."""
+        response = self.memory.get(key)
+        if response is not None:
+            return response, MEMORY_HIT
+        collection = await self._collection()
+        if collection is None:
+            return None, MISS
+        try:
+            document = await collection.find_one({"_id": key})
+        except Exception as e:
+            logger.warning(f"LLM cache lookup in MongoDB failed: {e}")
+            self.mongo_errors += 1
+            return None, MISS
+        # MongoDB's TTL monitor runs about once a minute, so entries can outlive their TTL a little
+        if document is None or (self.ttl and datetime.utcnow() - document["created_at"] > timedelta(seconds=self.ttl)):
+            self.mongo_misses += 1
+            return None, MISS
+        self.mongo_hits += 1
+        self.memory.put(key, document["response"])
+        return document["response"], MONGO_HIT
+
+    async def put(self, key: str, model_name: str, response: str) -> None:
+        self.memory.put(key, response)
+        collection = await self._collection()
+        if collection is None:
+            return
+        try:
+            await collection.replace_one(
+                {"_id": key},
+                {"_id": key, "model": model_name, "response": response, "created_at": datetime.utcnow()},
+                upsert=True,
+            )
+        except Exception as e:
+            logger.warning(f"Storing an LLM response in MongoDB failed: {e}")
+            self.mongo_errors += 1
+
+    def stats(self) -> Dict[str, Any]:
+        memory = self.memory.stats()
+        hits = memory["hits"] + self.mongo_hits
+        lookups = memory["hits"] + memory["misses"]
+        return {
+            "hits": hits,
+            "misses": lookups - hits,
+            "hit_rate": hits / lookups if lookups else 0.0,
+            "bypassed": self.bypassed,
+            "memory": memory,
+            "mongo": {
+                "enabled": self.mongo,
+                "collection": self.collection_name,
+                "hits": self.mongo_hits,
+                "misses": self.mongo_misses,
+                "errors": self.mongo_errors,
+            },
+        }
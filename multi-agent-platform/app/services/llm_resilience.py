@@ -0,0 +1,163 @@
+# File: app/services/llm_resilience.py
+
+import asyncio
+import random
+import time
+from collections import deque
+from typing import Any, Dict, Optional
+
+# HTTP statuses worth retrying: timeouts, rate limiting and server-side failures
+_RETRYABLE_CODES = (408, 429, 500, 502, 503, 504)
+_RETRYABLE_ERRORS = ("ResourceExhausted", "TooManyRequests", "ServiceUnavailable", "InternalServerError",
+                     "DeadlineExceeded", "GatewayTimeout", "BadGateway", "RetryError")
+
+# Successful calls needed before the p95 is trusted for hedging, and how many recent ones it is taken over
+_HEDGE_MIN_SAMPLES = 20
+_LATENCY_SAMPLES = 200
+
+
+def is_retryable(error: BaseException) -> bool:
+    """Whether an API error is transient (timeout, rate limit, server error) rather than a bad request."""
+    return (isinstance(error, (asyncio.TimeoutError, ConnectionError))
+            or getattr(error, "code", None) in _RETRYABLE_CODES
+            or type(error).__name__ in _RETRYABLE_ERRORS)
+
+
+def is_rate_limited(error: BaseException) -> bool:
+    """Whether an API error is a 429: the quota is used up, which says nothing about the provider's health."""
+    return getattr(error, "code", None) == 429 or type(error).__name__ in ("ResourceExhausted", "TooManyRequests")
+
+
+def backoff_delay(attempt: int, base: float, maximum: float) -> float:
+    """Exponential backoff with full jitter: uniform in [0, min(maximum, base * 2^attempt)]."""
+    return random.uniform(0, min(maximum, base * 2 ** attempt))
+
+
+class CallPolicy:
+    """
+    An agent's budget for one generate_text call: overall timeout (seconds,
+    retries included, counted from when the scheduler first admits the call) and retries.
+    """
+
+    __slots__ = ("timeout", "retries")
+
+    def __init__(self, timeout: float, retries: int):
+        self.timeout = timeout
+        self.retries = retries
+
+    def overridden(self, overrides: Dict[str, Any]) -> "CallPolicy":
+        unknown = set(overrides) - set(self.__slots__)
+        if unknown:
+            raise ValueError(f"Unknown LLM call policy settings: {', '.join(sorted(unknown))}")
+        return CallPolicy(float(overrides.get("timeout", self.timeout)), int(overrides.get("retries", self.retries)))
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"timeout": self.timeout, "retries": self.retries}
+
+
+class CallDeadline:
+    """
+    The clock of one call's timeout. It starts when the scheduler first admits
+    the call, so time spent queued behind rate limits is not a provider timeout.
+    """
+
+    __slots__ = ("timeout", "expires_at")
+
+    def __init__(self, timeout: float):
+        self.timeout = timeout
+        self.expires_at: Optional[float] = None
+
+    def start(self) -> None:
+        """Starts the clock; later calls (retries, hedges) share the running budget."""
+        if self.expires_at is None and self.timeout > 0:
+            self.expires_at = time.monotonic() + self.timeout
+
+    def remaining(self) -> Optional[float]:
+        """Seconds left, or None before the clock starts (or without a timeout)."""
+        return self.expires_at - time.monotonic() if self.expires_at is not None else None
+
+    @property
+    def expired(self) -> bool:
+        return self.expires_at is not None and time.monotonic() >= self.expires_at
+
+
+class CircuitBreaker:
+    """
+    Fails calls to a model fast while its provider is degraded.
+
+    After `threshold` consecutive transient failures (timeouts and server
+    errors; 429s are left to the scheduler) the circuit opens and
+    calls are refused for `reset_timeout` seconds. Then a single probe call is
+    let through (half-open): its success closes the circuit, its failure
+    opens it again. `threshold <= 0` disables the breaker.
+    """
+
+    def __init__(self, model_name: str, threshold: int, reset_timeout: float):
+        self.model_name = model_name
+        self.threshold = threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self.opens = 0
+        self.rejected = 0
+        self._probing = False
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if self._probing or time.monotonic() - self.opened_at >= self.reset_timeout:
+            return "half_open"
+        return "open"
+
+    def allow(self) -> bool:
+        """Whether a call may go ahead now; when half-open, only the first caller becomes the probe."""
+        if self.threshold <= 0 or self.opened_at is None:
+            return True
+        if self._probing or time.monotonic() - self.opened_at < self.reset_timeout:
+            self.rejected += 1
+            return False
+        self._probing = True
+        return True
+
+    def record_success(self) -> None:
+        self.failures = 0
+        self.opened_at = None
+        self._probing = False
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        if self.threshold > 0 and (self._probing or (self.opened_at is None and self.failures >= self.threshold)):
+            self.opened_at = time.monotonic()
+            self.opens += 1
+        self._probing = False
+
+    def record_abandoned(self) -> None:
+        """The call ended without an outcome (e.g. a cancelled hedge); a probe slot is freed for the next call."""
+        self._probing = False
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "model": self.model_name,
+            "state": self.state,
+            "consecutive_failures": self.failures,
+            "opens": self.opens,
+            "rejected": self.rejected,
+        }
+
+
+class LatencyTracker:
+    """Recent successful call latencies, for the hedging delay."""
+
+    def __init__(self, samples: int = _LATENCY_SAMPLES):
+        self._latencies = deque(maxlen=samples)
+
+    def record(self, seconds: float) -> None:
+        self._latencies.append(seconds)
+
+    def percentile(self, fraction: float) -> Optional[float]:
+        """The latency `fraction` of recent calls finished within; None until there are enough samples."""
+        if len(self._latencies) < _HEDGE_MIN_SAMPLES:
+            return None
+        latencies = sorted(self._latencies)
+        return latencies[int(fraction * (len(latencies) - 1))]
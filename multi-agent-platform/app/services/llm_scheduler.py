@@ -0,0 +1,224 @@
+# File: app/services/llm_scheduler.py
+
+import asyncio
+import heapq
+import itertools
+import logging
+import time
+from collections import deque
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger("llm_service")
+
+# Priority classes, served in this order
+INTERACTIVE, BULK, BACKGROUND = "interactive", "bulk", "background"
+PRIORITIES = (INTERACTIVE, BULK, BACKGROUND)
+
+# Token estimate for an attached file until the real usage is known (a few PDF pages)
+FILE_TOKEN_ESTIMATE = 1500
+# Waits kept per class for the p95
+_WAIT_SAMPLES = 1000
+
+
+def estimate_tokens(prompt: str, files: Optional[List[Any]], output_tokens: int) -> int:
+    """Rough token count of a call before it is made: ~4 characters per token, plus the expected output."""
+    return len(prompt) // 4 + FILE_TOKEN_ESTIMATE * len(files or []) + output_tokens
+
+
+def usage_tokens(response: Any) -> Optional[int]:
+    """Tokens a Gemini response actually used, if it reports them."""
+    usage = getattr(response, "usage_metadata", None)
+    total = getattr(usage, "total_token_count", None)
+    return int(total) if total else None
+
+
+def is_overload(error: Exception) -> bool:
+    """Whether an API error means the provider is rate limiting or overloaded (HTTP 429 / 503)."""
+    return (getattr(error, "code", None) in (429, 503)
+            or type(error).__name__ in ("ResourceExhausted", "TooManyRequests", "ServiceUnavailable"))
+
+
+class TokenBucket:
+    """Per-minute rate limit: holds up to a minute's allowance and refills continuously. 0 = unlimited."""
+
+    def __init__(self, per_minute: int):
+        self.capacity = float(per_minute)
+        self.rate = per_minute / 60.0
+        self.level = self.capacity
+        self.updated = time.monotonic()
+
+    @property
+    def enabled(self) -> bool:
+        return self.capacity > 0
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def delay(self, amount: float) -> float:
+        """Seconds until `amount` can be taken (0 = now)."""
+        if not self.enabled:
+            return 0.0
+        self._refill()
+        # A call larger than the whole allowance waits for a full bucket rather than forever
+        amount = min(amount, self.capacity)
+        return 0.0 if self.level >= amount else (amount - self.level) / self.rate
+
+    def take(self, amount: float) -> None:
+        """Takes `amount` (negative returns it); the level may go below zero when actual usage exceeds the estimate."""
+        if self.enabled:
+            self._refill()
+            self.level = min(self.capacity, self.level - amount)
+
+    def available(self) -> Optional[float]:
+        if not self.enabled:
+            return None
+        self._refill()
+        return round(self.level, 1)
+
+
+class Ticket:
+    """A granted call slot; the caller fills in the outcome before releasing it."""
+
+    __slots__ = ("priority", "tokens", "used_tokens", "overloaded")
+
+    def __init__(self, priority: str, tokens: int):
+        self.priority = priority
+        self.tokens = tokens
+        self.used_tokens: Optional[int] = None
+        self.overloaded = False
+
+
+class LLMScheduler:
+    """
+    Admission control for outbound LLM calls.
+
+    A call waits in a priority queue until three conditions hold: the
+    requests-per-minute and tokens-per-minute buckets have room for it, and
+    fewer calls are in flight than the adaptive cap. Interactive calls are
+    always dispatched before bulk ones, and bulk before background; within a
+    class calls go first come, first served. A call that must wait for the
+    rate limit holds up the calls behind it, so lower classes never take the
+    budget an interactive call is waiting for.
+
+    The in-flight cap adapts AIMD-style: it grows by about one per cap's worth of
+    successful calls, and halves (at most once per `backoff_interval`) when
+    the provider answers 429 or 503, down to `min_concurrency`.
+
+    Token use is reserved from an estimate when a call is dispatched and
+    corrected with the usage the response reports.
+    """
+
+    def __init__(self, rpm: int = 0, tpm: int = 0, max_concurrency: int = 8, min_concurrency: int = 1,
+                 backoff_interval: float = 1.0):
+        self.rpm = TokenBucket(rpm)
+        self.tpm = TokenBucket(tpm)
+        self.max_concurrency = max(1, max_concurrency)
+        self.min_concurrency = max(1, min(min_concurrency, self.max_concurrency))
+        self.backoff_interval = backoff_interval
+        self.limit = float(self.max_concurrency)
+        self.in_flight = 0
+        self._queue: List[tuple] = []
+        self._seq = itertools.count()
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._last_backoff = 0.0
+        self.overloads = 0
+        self.queued = {priority: 0 for priority in PRIORITIES}
+        self.dispatched = {priority: 0 for priority in PRIORITIES}
+        self._wait_total = {priority: 0.0 for priority in PRIORITIES}
+        self._wait_max = {priority: 0.0 for priority in PRIORITIES}
+        self._waits = {priority: deque(maxlen=_WAIT_SAMPLES) for priority in PRIORITIES}
+
+    @property
+    def cap(self) -> int:
+        return max(self.min_concurrency, int(self.limit))
+
+    async def acquire(self, priority: str, tokens: int) -> Ticket:
+        """Waits for a slot; the returned ticket must be passed to `release` when the call ends."""
+        if priority not in self.queued:
+            raise ValueError(f"Unknown priority '{priority}'; expected one of {', '.join(PRIORITIES)}")
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._queue, (PRIORITIES.index(priority), next(self._seq), time.monotonic(), priority, tokens, future))
+        self.queued[priority] += 1
+        self._dispatch()
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                # Granted just as the waiter was cancelled: give the slot back
+                self.release(future.result())
+            else:
+                self.queued[priority] -= 1
+                self._dispatch()
+            raise
+        return future.result()
+
+    def release(self, ticket: Ticket) -> None:
+        """Ends a call: frees its slot, corrects its token reservation and adapts the cap."""
+        self.in_flight -= 1
+        if ticket.used_tokens is not None:
+            self.tpm.take(ticket.used_tokens - ticket.tokens)
+        if ticket.overloaded:
+            self.overloads += 1
+            now = time.monotonic()
+            # Calls already in flight when the cap was cut report the same overload; count it once
+            if now - self._last_backoff >= self.backoff_interval:
+                self._last_backoff = now
+                self.limit = max(float(self.min_concurrency), self.limit / 2)
+                logger.warning(f"LLM provider overloaded; concurrency cap lowered to {self.cap}")
+        elif self.limit < self.max_concurrency:
+            self.limit = min(float(self.max_concurrency), self.limit + 1 / self.limit)
+        self._dispatch()
+
+    def _dispatch(self) -> None:
+        """Grants slots to waiting calls, best priority first, while the cap and the rate limits allow."""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        while self._queue and self.in_flight < self.cap:
+            _, _, enqueued_at, priority, tokens, future = self._queue[0]
+            if future.done():
+                # Cancelled while waiting
+                heapq.heappop(self._queue)
+                continue
+            delay = max(self.rpm.delay(1), self.tpm.delay(tokens))
+            if delay > 0:
+                self._timer = asyncio.get_running_loop().call_later(delay, self._dispatch)
+                return
+            heapq.heappop(self._queue)
+            self.rpm.take(1)
+            self.tpm.take(tokens)
+            self.in_flight += 1
+            self.queued[priority] -= 1
+            self.dispatched[priority] += 1
+            waited = time.monotonic() - enqueued_at
+            self._wait_total[priority] += waited
+            self._wait_max[priority] = max(self._wait_max[priority], waited)
+            self._waits[priority].append(waited)
+            future.set_result(Ticket(priority, tokens))
+
+    def stats(self) -> Dict[str, Any]:
+        classes = {}
+        for priority in PRIORITIES:
+            waits = sorted(self._waits[priority])
+            dispatched = self.dispatched[priority]
+            classes[priority] = {
+                "queued": self.queued[priority],
+                "dispatched": dispatched,
+                "avg_wait_ms": round(1000 * self._wait_total[priority] / dispatched, 2) if dispatched else 0.0,
+                "p95_wait_ms": round(1000 * waits[int(0.95 * (len(waits) - 1))], 2) if waits else 0.0,
+                "max_wait_ms": round(1000 * self._wait_max[priority], 2),
+            }
+        return {
+            "in_flight": self.in_flight,
+            "concurrency_limit": self.cap,
+            "max_concurrency": self.max_concurrency,
+            "queue_depth": sum(self.queued.values()),
+            "overloads": self.overloads,
+            "rpm_limit": int(self.rpm.capacity),
+            "rpm_available": self.rpm.available(),
+            "tpm_limit": int(self.tpm.capacity),
+            "tpm_available": self.tpm.available(),
+            "classes": classes,
+        }
@@ -1,27 +1,92 @@
 # File: app/services/llm_service.py
 
+import functools
+import hashlib
 import logging
 import google.generativeai as genai
 from fastapi import HTTPException
-from typing import List, Any
+from typing import List, Any, AsyncIterator, Dict, Optional
 import asyncio
 import tempfile
+import time
 import os
 
+from app.services.llm_scheduler import (
+    INTERACTIVE, PRIORITIES, LLMScheduler, estimate_tokens, is_overload, usage_tokens,
+)
+from app.services.llm_resilience import (
+    CallDeadline, CallPolicy, CircuitBreaker, LatencyTracker, backoff_delay, is_rate_limited, is_retryable,
+)
+from app.services.llm_cache import BYPASS, COALESCED, LLMResponseCache, bypass_requested, cache_key, record_status
+from app.utils.cache import LRUCache
+
 logger = logging.getLogger("llm_service")
 
+def chunk_text(chunk: Any) -> str:
+    """Text of one streamed response chunk ("" for chunks without text, e.g. the final one)."""
+    try:
+        return chunk.text
+    except ValueError:
+        return ""
+
+
+async def _single_chunk(text: str) -> AsyncIterator[str]:
+    yield text
+
+
+# The File API deletes uploads after 48 hours, so their content hashes are not needed for longer
+FILE_HASH_TTL = 48 * 3600
+FILE_HASH_ENTRIES = 4096
+
 class LLMService:
     def __init__(self, settings):
         self.model = None
+        self.model_name = settings.GENAI_MODEL or "gemini-2.5-flash"
         self.file_api_supported = True
+        # Responses keyed by (model, prompt, attached file contents); see app/services/llm_cache.py
+        self.cache = LLMResponseCache(
+            settings.LLM_CACHE_SIZE,
+            settings.LLM_CACHE_TTL,
+            mongo=settings.LLM_CACHE_MONGO,
+            db_name=settings.DATABASE_NAME,
+            collection_name=settings.LLM_CACHE_COLLECTION,
+        )
+        self.cache_agents = frozenset(settings.LLM_CACHE_AGENTS)
+        # Uploaded file name -> sha256 of its bytes, so calls attaching a file can be cached by content
+        self._file_hashes = LRUCache(FILE_HASH_ENTRIES, FILE_HASH_TTL)
+        # Cache key -> the task making that call, shared by identical calls made while it runs
+        self._in_flight: Dict[str, asyncio.Future] = {}
+        self.coalesced = 0
+        # Rate limits, adaptive concurrency cap and priority classes for calls that reach the model
+        self.output_token_estimate = settings.LLM_OUTPUT_TOKEN_ESTIMATE
+        self.scheduler = LLMScheduler(
+            rpm=settings.LLM_RPM_LIMIT,
+            tpm=settings.LLM_TPM_LIMIT,
+            max_concurrency=settings.LLM_MAX_CONCURRENCY,
+            min_concurrency=settings.LLM_MIN_CONCURRENCY,
+        )
+        # Retries, hedging and the circuit breaker; agents pick their timeout / retry budget by name
+        self.default_policy = CallPolicy(settings.LLM_TIMEOUT, settings.LLM_MAX_RETRIES)
+        self.policies = {
+            agent: self.default_policy.overridden(overrides) for agent, overrides in settings.LLM_AGENT_POLICIES.items()
+        }
+        self.retry_base_delay = settings.LLM_RETRY_BASE_DELAY
+        self.retry_max_delay = settings.LLM_RETRY_MAX_DELAY
+        self.hedge = settings.LLM_HEDGE
+        self.latency = LatencyTracker()
+        self.breaker = CircuitBreaker(self.model_name, settings.LLM_BREAKER_THRESHOLD, settings.LLM_BREAKER_RESET)
+        self.retries = 0
+        self.timeouts = 0
+        self.hedges = 0
+        self.hedge_wins = 0
         try:
             api_key = settings.GEMINI_API_KEY
             if not api_key:
                 raise ValueError("GEMINI_API_KEY not found in settings.")
             genai.configure(api_key=api_key)
-            model_name = settings.GENAI_MODEL or "gemini-2.5-flash" # Models like 1.5 support the File API
-            self.model = genai.GenerativeModel(model_name)
-            logger.info(f"LLMService initialized with model: {model_name}")
+            # Models like 1.5 support the File API
+            self.model = genai.GenerativeModel(self.model_name)
+            logger.info(f"LLMService initialized with model: {self.model_name}")
         except Exception as e:
             logger.critical(f"Fatal error during LLMService initialization: {e}")
 
@@ -47,6 +112,7 @@ class LLMService:
             )
             
             logger.info(f"Successfully uploaded file: {uploaded_file.name}")
+            self._file_hashes.put(uploaded_file.name, hashlib.sha256(file_bytes).hexdigest())
             return uploaded_file
         except Exception as e:
             logger.error(f"File API upload failed for '{display_name}': {e}")
@@ -56,18 +122,354 @@ class LLMService:
             if temp_file_path and os.path.exists(temp_file_path):
                 os.remove(temp_file_path)
 
+    def _caches(self, agent: Optional[str]) -> bool:
+        """Whether `agent`'s calls use the response cache; calls made without an agent name always do."""
+        return agent is None or agent in self.cache_agents
+
+    def _cache_key(self, prompt: str, files: List[Any] = None):
+        """The response cache key for a call, or None if an attached file's content is unknown."""
+        file_hashes = []
+        for file in files or []:
+            file_hash = self._file_hashes.get(getattr(file, "name", None))
+            if file_hash is None:
+                return None
+            file_hashes.append(file_hash)
+        return cache_key(self.model_name, prompt, file_hashes)
+
+    async def _attempt(self, contents: List[Any], priority: str, tokens: int, deadline: CallDeadline) -> str:
+        """
+        One request to the model, once the scheduler admits it; its outcome is
+        reported to the breaker. A request that is never sent (cancelled or out
+        of time while queued) is reported as abandoned, not as a failure.
+        """
+        try:
+            # Wait for the scheduler: rate limits, concurrency cap, then priority order.
+            # Only retries and hedges, admitted after the clock started, are bounded here.
+            ticket = await asyncio.wait_for(self.scheduler.acquire(priority, tokens), deadline.remaining())
+        except (asyncio.CancelledError, asyncio.TimeoutError):
+            self.breaker.record_abandoned()
+            raise
+        deadline.start()
+        started = time.monotonic()
+        try:
+            response = await asyncio.wait_for(self.model.generate_content_async(contents), deadline.remaining())
+            ticket.used_tokens = usage_tokens(response)
+            text = response.text.strip()
+        except asyncio.CancelledError:
+            self.breaker.record_abandoned()
+            raise
+        except Exception as e:
+            self._record_error(ticket, e)
+            raise
+        finally:
+            self.scheduler.release(ticket)
+        self.latency.record(time.monotonic() - started)
+        self.breaker.record_success()
+        return text
+
+    def _record_error(self, ticket, error: Exception) -> None:
+        """Reports a failed request to the scheduler (via its ticket) and the circuit breaker."""
+        ticket.overloaded = is_overload(error)
+        if is_rate_limited(error):
+            # Our quota, not the provider's health: the scheduler backs off instead
+            self.breaker.record_abandoned()
+        elif is_retryable(error):
+            self.breaker.record_failure()
+        else:
+            # The provider answered (e.g. rejected the prompt): it is up
+            self.breaker.record_success()
+
+    def _check_breaker(self) -> None:
+        if not self.breaker.allow():
+            raise HTTPException(status_code=503, detail=f"The AI service is temporarily unavailable ({self.model_name} is failing).")
+
+    def _timed_out(self, policy: CallPolicy) -> HTTPException:
+        self.timeouts += 1
+        logger.error(f"LLM API call timed out after {policy.timeout}s")
+        return HTTPException(status_code=504, detail="The AI service did not respond in time.")
+
+    def _retry_delay(self, error: Exception, attempt: int, policy: CallPolicy, deadline: CallDeadline) -> float:
+        """The backoff before retrying after `error`; raises the 502 instead if the error or budget rules a retry out."""
+        delay = backoff_delay(attempt, self.retry_base_delay, self.retry_max_delay)
+        remaining = deadline.remaining()
+        out_of_time = remaining is not None and delay >= remaining
+        if not is_retryable(error) or attempt >= policy.retries or out_of_time:
+            logger.error(f"LLM API call failed: {error}")
+            raise HTTPException(status_code=502, detail=f"An unexpected error occurred with the AI service: {error}")
+        self.retries += 1
+        logger.warning(f"LLM API call failed ({error}); retry {attempt + 1}/{policy.retries} in {delay:.2f}s")
+        return delay
+
+    async def _hedged(self, contents: List[Any], priority: str, tokens: int, deadline: CallDeadline) -> str:
+        """
+        An attempt that, with hedging on, is duplicated if it has not answered
+        within the recent p95 latency; the first successful answer wins and
+        the other request is cancelled.
+        """
+        primary = asyncio.ensure_future(self._attempt(contents, priority, tokens, deadline))
+        delay = self.latency.percentile(0.95) if self.hedge else None
+        if delay is None:
+            return await primary
+
+        hedge = None
+        pending = {primary}
+        try:
+            done, _ = await asyncio.wait(pending, timeout=delay)
+            if not done and self.breaker.allow():
+                self.hedges += 1
+                hedge = asyncio.ensure_future(self._attempt(contents, priority, tokens, deadline))
+                pending.add(hedge)
+            error = None
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if task is hedge:
+                            self.hedge_wins += 1
+                        return task.result()
+                    error = error or task.exception()
+                if deadline.expired:
+                    # The other request is out of time too (or still queued, and never sent)
+                    break
+            raise error
+        finally:
+            for task in pending:
+                task.cancel()
+
+    async def _call_model(self, prompt: str, files: List[Any] = None, priority: str = INTERACTIVE,
+                          policy: CallPolicy = None) -> str:
+        """Calls the model within the policy's timeout, retrying transient errors with jittered exponential backoff."""
+        policy = policy or self.default_policy
+        contents = [prompt]
+        if files:
+            contents.extend(files) # Add file objects to the prompt contents
+        tokens = estimate_tokens(prompt, files, self.output_token_estimate)
+        deadline = CallDeadline(policy.timeout)
+
+        attempt = 0
+        while True:
+            self._check_breaker()
+            try:
+                return await self._hedged(contents, priority, tokens, deadline)
+            except Exception as e:
+                error = e
+            if isinstance(error, asyncio.TimeoutError) and deadline.expired:
+                # The attempt has reported it: a failure if it was sent, abandoned if not
+                raise self._timed_out(policy)
+            await asyncio.sleep(self._retry_delay(error, attempt, policy, deadline))
+            attempt += 1
+
+    async def _stream_model(self, prompt: str, priority: str, policy: CallPolicy) -> AsyncIterator[str]:
+        """
+        Streams the model's answer chunk by chunk, within the policy's timeout.
+        Transient errors are retried until the first chunk has been yielded;
+        after that they end the stream with a 502. Streams are not hedged.
+        """
+        tokens = estimate_tokens(prompt, None, self.output_token_estimate)
+        deadline = CallDeadline(policy.timeout)
+
+        attempt = 0
+        while True:
+            self._check_breaker()
+            ticket = None
+            yielded = False
+            try:
+                ticket = await asyncio.wait_for(self.scheduler.acquire(priority, tokens), deadline.remaining())
+                deadline.start()
+                started = time.monotonic()
+                response = await asyncio.wait_for(
+                    self.model.generate_content_async([prompt], stream=True), deadline.remaining()
+                )
+                chunks = response.__aiter__()
+                while True:
+                    try:
+                        chunk = await asyncio.wait_for(chunks.__anext__(), deadline.remaining())
+                    except StopAsyncIteration:
+                        break
+                    text = chunk_text(chunk)
+                    if text:
+                        yielded = True
+                        yield text
+                ticket.used_tokens = usage_tokens(response)
+            except (asyncio.CancelledError, GeneratorExit):
+                # The client went away
+                self.breaker.record_abandoned()
+                raise
+            except Exception as e:
+                error = e
+                if ticket is not None:
+                    self._record_error(ticket, e)
+                else:
+                    # Out of time before the scheduler admitted the retry: nothing was sent
+                    self.breaker.record_abandoned()
+            else:
+                self.latency.record(time.monotonic() - started)
+                self.breaker.record_success()
+                return
+            finally:
+                if ticket is not None:
+                    self.scheduler.release(ticket)
+
+            if isinstance(error, asyncio.TimeoutError) and deadline.expired:
+                raise self._timed_out(policy)
+            if yielded:
+                # Part of the answer has been sent; a retry could not continue it
+                logger.error(f"LLM stream failed midway: {error}")
+                raise HTTPException(status_code=502, detail=f"An unexpected error occurred with the AI service: {error}")
+            await asyncio.sleep(self._retry_delay(error, attempt, policy, deadline))
+            attempt += 1
+
+    async def _lookup_or_generate(self, key: str, prompt: str, files: List[Any] = None, priority: str = INTERACTIVE,
+                                  policy: CallPolicy = None, use_cache: bool = True):
+        """The shared body of a coalesced call: (response, cache status)."""
+        status = None
+        if use_cache and self.cache.enabled:
+            cached, status = await self.cache.get(key)
+            if cached is not None:
+                return cached, status
+        text = await self._call_model(prompt, files, priority, policy)
+        # Only successful responses are cached
+        if use_cache:
+            await self.cache.put(key, self.model_name, text)
+        return text, status
+
+    def _finish_in_flight(self, key: str, task: asyncio.Future) -> None:
+        if self._in_flight.get(key) is task:
+            del self._in_flight[key]
+        # Mark the error as retrieved, in case every waiter was cancelled
+        if not task.cancelled():
+            task.exception()
+
     # <-- MODIFIED to accept an optional file list
-    async def generate_text(self, prompt: str, files: List[Any] = None) -> str:
-        """Asynchronously generates text, optionally including file references."""
+    async def generate_text(self, prompt: str, files: List[Any] = None, use_cache: bool = True,
+                            priority: str = INTERACTIVE, agent: str = None) -> str:
+        """
+        Asynchronously generates text, optionally including file references.
+
+        Identical calls (same model, prompt and file contents) are answered from
+        the response cache, and while one is in flight, later identical calls
+        wait for its result instead of calling the model again (its errors are
+        raised to all of them; a waiter being cancelled does not cancel the
+        call). Pass use_cache=False, or send the HTTP request with
+        `Cache-Control: no-cache`, to always make a call of your own; the
+        fresh response still replaces the cached one. Agents not listed in
+        LLM_CACHE_AGENTS (the JD and job post writers by default) skip the
+        cache entirely, so asking again gives a new draft; identical calls
+        they make while one is in flight are still coalesced.
+
+        Calls that reach the model are admitted by the scheduler under the
+        RPM/TPM limits and the adaptive concurrency cap, `priority` first:
+        "interactive" (user-facing requests), then "bulk", then "background".
+
+        Transient errors are retried and calls are bounded by the timeout and
+        retry budget configured for `agent` (LLM_AGENT_POLICIES), falling back
+        to LLM_TIMEOUT / LLM_MAX_RETRIES. Identical calls coalesced into one
+        share the first caller's budget.
+        """
+        if not self.model:
+            raise HTTPException(status_code=503, detail="LLM service is not available.")
+        if priority not in PRIORITIES:
+            raise ValueError(f"Unknown priority '{priority}'; expected one of {', '.join(PRIORITIES)}")
+        policy = self.policies.get(agent, self.default_policy)
+        caches = self._caches(agent)
+
+        key = self._cache_key(prompt, files)
+        if key is None or not use_cache or bypass_requested():
+            if caches and self.cache.enabled:
+                self.cache.bypassed += 1
+                record_status(BYPASS)
+            text = await self._call_model(prompt, files, priority, policy)
+            if caches and key is not None:
+                await self.cache.put(key, self.model_name, text)
+            return text
+
+        # Calls that skip the cache do not join cached ones, which may be answered from it
+        flight_key = key if caches else f"{key}:uncached"
+        task = self._in_flight.get(flight_key)
+        leader = task is None
+        if leader:
+            task = asyncio.ensure_future(self._lookup_or_generate(key, prompt, files, priority, policy, caches))
+            self._in_flight[flight_key] = task
+            task.add_done_callback(functools.partial(self._finish_in_flight, flight_key))
+        else:
+            self.coalesced += 1
+        # shield: a cancelled waiter must not cancel the call the others are waiting for
+        text, status = await asyncio.shield(task)
+        if not leader:
+            record_status(COALESCED)
+        elif status is not None:
+            record_status(status)
+        return text
+
+    async def stream_text(self, prompt: str, priority: str = INTERACTIVE, agent: str = None) -> AsyncIterator[str]:
+        """
+        Streaming counterpart of `generate_text`: waits for the first chunk of
+        the answer (so errors before it raise here, as HTTPExceptions) and
+        returns an async iterator over that chunk and the rest as they arrive.
+
+        A cached answer comes back as a single chunk, and a completed stream is
+        cached under the same key as `generate_text` uses (for agents in
+        LLM_CACHE_AGENTS only). Streams are not
+        coalesced or hedged. Errors after the first chunk are raised by the
+        iterator.
+        """
         if not self.model:
             raise HTTPException(status_code=503, detail="LLM service is not available.")
+        if priority not in PRIORITIES:
+            raise ValueError(f"Unknown priority '{priority}'; expected one of {', '.join(PRIORITIES)}")
+        policy = self.policies.get(agent, self.default_policy)
+
+        key = None
+        if self._caches(agent):
+            key = cache_key(self.model_name, prompt)
+            if self.cache.enabled and not bypass_requested():
+                cached, status = await self.cache.get(key)
+                record_status(status)
+                if cached is not None:
+                    return _single_chunk(cached)
+            elif self.cache.enabled:
+                self.cache.bypassed += 1
+                record_status(BYPASS)
+
+        chunks = self._stream_model(prompt, priority, policy)
         try:
-            contents = [prompt]
-            if files:
-                contents.extend(files) # Add file objects to the prompt contents
-            
-            response = await self.model.generate_content_async(contents)
-            return response.text.strip()
-        except Exception as e:
-            logger.error(f"LLM API call failed: {e}")
-            raise HTTPException(status_code=502, detail=f"An unexpected error occurred with the AI service: {e}")
\ No newline at end of file
+            first = await chunks.__anext__()
+        except StopAsyncIteration:
+            first = ""
+        return self._relay(first, chunks, key)
+
+    async def _relay(self, first: str, chunks: AsyncIterator[str], key: Optional[str]) -> AsyncIterator[str]:
+        """Yields `first` and the rest of `chunks`, caching the whole answer (under `key`, if any) once the stream completes."""
+        parts = [first]
+        try:
+            if first:
+                yield first
+            async for text in chunks:
+                parts.append(text)
+                yield text
+        finally:
+            await chunks.aclose()
+        # Only completed streams get here; the answer is cached like generate_text's
+        if key is not None:
+            await self.cache.put(key, self.model_name, "".join(parts).strip())
+
+    def stats(self) -> Dict[str, Any]:
+        p95 = self.latency.percentile(0.95)
+        return {
+            "model": self.model_name,
+            "in_flight": len(self._in_flight),
+            "coalesced": self.coalesced,
+            "cache": dict(self.cache.stats(), agents=sorted(self.cache_agents)),
+            "scheduler": self.scheduler.stats(),
+            "resilience": {
+                "retries": self.retries,
+                "timeouts": self.timeouts,
+                "hedging": self.hedge,
+                "hedge_delay_ms": round(1000 * p95, 1) if p95 is not None else None,
+                "hedges": self.hedges,
+                "hedge_wins": self.hedge_wins,
+                "circuit_breaker": self.breaker.stats(),
+                "default_policy": self.default_policy.to_dict(),
+                "agent_policies": {agent: policy.to_dict() for agent, policy in self.policies.items()},
+            },
+        }
@@ -0,0 +1,67 @@
+import json
+from typing import Any, Dict, List, Tuple
+
+
+class JSONFieldStream:
+    """
+    Incremental parser for a JSON object arriving in chunks: emits each
+    top-level member as soon as its value is complete.
+
+    Text before the opening brace (e.g. a ```json fence) and after the
+    closing one is ignored. Every character is looked at once, and each member
+    is decoded with `json.loads` when the comma or closing brace after it
+    arrives, so the cost over a whole response is linear in its length.
+    Malformed JSON raises ValueError (json.JSONDecodeError).
+    """
+
+    def __init__(self):
+        self._member: List[str] = []
+        self._depth = 0
+        self._in_string = False
+        self._escaped = False
+        self.fields: Dict[str, Any] = {}
+        self.done = False
+
+    def feed(self, text: str) -> List[Tuple[str, Any]]:
+        """Adds a chunk; returns the (name, value) members it completed, in order."""
+        completed = []
+        if self.done:
+            return completed
+        # Start, within `text`, of the current member's part not yet in self._member
+        segment = 0
+        for offset, ch in enumerate(text):
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif ch == "\\":
+                    self._escaped = True
+                elif ch == '"':
+                    self._in_string = False
+                continue
+            if self._depth == 0:
+                # Outside the object: wait for its opening brace
+                if ch == "{":
+                    self._depth = 1
+                    segment = offset + 1
+                continue
+            if ch == '"':
+                self._in_string = True
+            elif ch in "{[":
+                self._depth += 1
+            elif ch in "}]":
+                self._depth -= 1
+            if self._depth == 1 and ch == "," or self._depth == 0:
+                member = ("".join(self._member) + text[segment:offset]).strip()
+                self._member = []
+                segment = offset + 1
+                if member:
+                    # One "name": value pair, decoded on its own
+                    for name, value in json.loads("{" + member + "}").items():
+                        self.fields[name] = value
+                        completed.append((name, value))
+                if self._depth == 0:
+                    self.done = True
+                    return completed
+        if self._depth > 0:
+            self._member.append(text[segment:])
+        return completed
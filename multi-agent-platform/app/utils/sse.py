@@ -0,0 +1,10 @@
+import json
+from typing import Any
+
+# Headers for text/event-stream responses: no caching, and no proxy buffering that would hold events back
+SSE_HEADERS = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+
+
+def sse_event(event: str, data: Any) -> str:
+    """One Server-Sent Event with a JSON payload."""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
@@ -0,0 +1,47 @@
+import asyncio
+import json
+
+import pytest
+from fastapi import HTTPException
+
+pytest.importorskip("google.generativeai")
+
+from app.agents.jd_agent.service import _jd_events  # noqa: E402
+
+JD = {"title": "Data Engineer", "skills": ["Python", "SQL"], "remote": True}
+
+
+async def stream(*chunks):
+    for chunk in chunks:
+        yield chunk
+
+
+def collect(chunks):
+    async def run():
+        events = []
+        try:
+            async for event in _jd_events(stream(*chunks)):
+                events.append(event)
+        except HTTPException as e:
+            events.append(("error", e.status_code))
+        return events
+    return asyncio.run(run())
+
+
+def test_fields_are_sent_as_they_complete_then_the_whole_jd():
+    text = "```json\n" + json.dumps(JD) + "\n```"
+    events = collect([text[i:i + 5] for i in range(0, len(text), 5)])
+    assert events == [("field", {"name": name, "value": value}) for name, value in JD.items()] + [
+        ("done", {"job_description": JD})
+    ]
+
+
+def test_a_stream_that_breaks_mid_object_is_an_error_not_a_partial_jd():
+    events = collect(['{"title": "Data Engineer", ', '"skills": ["Pyth'])
+    assert events == [("field", {"name": "title", "value": "Data Engineer"}), ("error", 500)]
+
+
+def test_malformed_output_is_an_error_after_the_fields_before_it():
+    events = collect(['{"title": "Data Engineer", ', '"remote": nope, "skills": []}'])
+    assert events == [("field", {"name": "title", "value": "Data Engineer"}), ("error", 500)]
+
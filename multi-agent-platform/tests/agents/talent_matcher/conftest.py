@@ -0,0 +1,163 @@
+import hashlib
+import os
+
+import numpy as np
+import pytest
+
+from app.agents.talent_matcher.extractor import SkillExtractor
+from app.agents.talent_matcher.index import create_index, normalize_rows
+from app.agents.talent_matcher.loader import build_profile_text, save_employees
+from app.agents.talent_matcher.store import EmployeeStore
+
+DIM = 16
+MB = 2 ** 20
+TAXONOMY_PATH = os.path.join(os.path.dirname(__file__), "..", "..", "..", "data", "skill_taxonomy.json")
+
+# What a TalentMatcherService built by make_service runs with, unless a test overrides it
+SERVICE_SETTINGS = {
+    "TALENT_MATCHER_SNAPSHOT_DIR": "", "TALENT_MATCHER_PERSIST_UPDATES": False,
+    "TALENT_MATCHER_SKILL_TAXONOMY": TAXONOMY_PATH, "TALENT_MATCHER_SHORTLIST_DEPTH": 0,
+    "TALENT_MATCHER_ENCODE_BATCH_SIZE": 1, "TALENT_MATCHER_INDEX": "exact", "TALENT_MATCHER_PRECISION": "float32",
+    "TALENT_MATCHER_RESCORE_FACTOR": 0, "TALENT_MATCHER_SHARDS": 0, "TALENT_MATCHER_SHARED_STORE": False,
+    "TALENT_MATCHER_RETRIEVAL": "dense",
+}
+
+
+def profile_vector(text: str, dim: int = DIM) -> np.ndarray:
+    """Deterministic unit vector for a text (seeded from its sha256, so stable across runs)."""
+    rng = np.random.default_rng(int.from_bytes(hashlib.sha256(text.encode()).digest()[:4], "little"))
+    return normalize_rows(rng.standard_normal((1, dim)).astype(np.float32))[0]
+
+
+class FakeEncoder:
+    """Stand-in for the embedding model: deterministic vectors, and a record of every batch encoded."""
+
+    def __init__(self, dim: int = DIM):
+        self.dim = dim
+        self.calls = []
+
+    def __call__(self, texts):
+        self.calls.append(list(texts))
+        return np.stack([self.vector(text) for text in texts]).reshape(len(texts), self.dim)
+
+    def vector(self, text: str) -> np.ndarray:
+        """The vector `text` encodes to, without counting as a call."""
+        return profile_vector(text, self.dim)
+
+    def encode(self, texts, **kwargs):
+        return self(texts)
+
+    @property
+    def encoded(self) -> int:
+        return sum(len(batch) for batch in self.calls)
+
+
+def employee_record(emp_id, title="Data Analyst", skills=("SQL",), years=3, credentials="Bachelor of Science"):
+    """An employee record as stored in employees.jsonl (without an Employee_ID when `emp_id` is None)."""
+    record = {"name": f"Employee {emp_id}", "title": title, "skills": list(skills),
+              "Key_Credentials": credentials, "experience_years": years}
+    if emp_id is not None:
+        record["Employee_ID"] = str(emp_id)
+    return record
+
+
+class FakeMatcher:
+    """
+    What the tenant registry, role shortlists and pool workers use of a
+    TalentMatcherService, over a real EmployeeStore with an exact index.
+    """
+
+    def __init__(self, employees, encoder: FakeEncoder, data_path: str = "", size: int = MB):
+        self.data_path = data_path
+        self.size = size
+        self.encoder = encoder
+        self.extractor = SkillExtractor({})
+        employees = list(employees)
+        # The startup embeddings are not counted as encoder calls
+        embeddings = np.array([encoder.vector(build_profile_text(emp)) for emp in employees], dtype=np.float32)
+        self.store = EmployeeStore(employees, embeddings.reshape(len(employees), encoder.dim),
+                                   lambda: create_index("exact"))
+
+    def memory_bytes(self) -> int:
+        return self.size
+
+    def upsert_employees(self, records) -> dict:
+        view, ids, encoded = self.store.upsert(records, self.encoder)
+        return {"employee_ids": ids, "encoded": encoded, "index_version": view.version}
+
+    def delete_employees(self, employee_ids) -> dict:
+        view, deleted = self.store.delete(list(employee_ids))
+        return {"employee_ids": deleted, "index_version": view.version}
+
+    def _build_result(self, employee, score, reasons):
+        return {"employee_id": employee["Employee_ID"], "score": score}
+
+    def _extract_reasons(self, jd_keywords, keywords):
+        return sorted(jd_keywords & keywords)
+
+
+@pytest.fixture
+def encoder():
+    return FakeEncoder()
+
+
+@pytest.fixture
+def make_employee():
+    return employee_record
+
+
+@pytest.fixture
+def make_matcher(encoder):
+    """Builds FakeMatchers sharing the test's encoder: make_matcher(employees=(), data_path="", size=MB)."""
+    def make(employees=(), data_path="", size=MB):
+        return FakeMatcher(employees, encoder, data_path, size)
+    return make
+
+
+def job_request(role="Data Analyst", skills="SQL, Python", top_k=5, **fields):
+    """A JobRequest with explicit degree and experience requirements, so nothing is extracted from the JD."""
+    from app.agents.talent_matcher.schemas import JobRequest
+
+    detail = {name: "" for name in (
+        "preferred_skills", "minimum_qualification", "languages", "key_responsibilities",
+        "key_skills_and_qualifications", "desired_attributes", "benefits",
+    )}
+    detail.update(required_skills=skills, overview=f"We are hiring a {role}.")
+    fields.setdefault("required_degree", "Bachelor")
+    fields.setdefault("min_years_experience", 0)
+    return JobRequest(job_role=role, job_description=detail, top_k=top_k, **fields)
+
+
+@pytest.fixture
+def make_job():
+    return job_request
+
+
+@pytest.fixture
+def make_service(tmp_path, monkeypatch, encoder):
+    """
+    Builds TalentMatcherServices over a temporary employees.jsonl, with the
+    test's FakeEncoder as the embedding model: make_service(employees, **settings).
+    Skipped where the service's model dependencies are not installed.
+    """
+    pytest.importorskip("sentence_transformers")
+    for name in ("MONGODB_URL", "DATABASE_NAME"):
+        if name not in os.environ:
+            monkeypatch.setenv(name, "test")
+    from app.agents.talent_matcher import service as service_module
+    from app.core.config import settings
+
+    monkeypatch.setattr(service_module, "load_embedding_model", lambda model_name, **options: (encoder, "fake-model"))
+    services = []
+
+    def make(employees, **overrides):
+        for name, value in {**SERVICE_SETTINGS, **overrides}.items():
+            monkeypatch.setattr(settings, name, value)
+        data_path = tmp_path / f"employees-{len(services)}.jsonl"
+        save_employees(str(data_path), list(employees))
+        services.append(service_module.TalentMatcherService(data_path=str(data_path)))
+        return services[-1]
+
+    yield make
+    for service in services:
+        service.close()
@@ -0,0 +1,50 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pytest
+
+from app.agents.talent_matcher.batcher import EncodeBatcher
+
+
+def test_concurrent_calls_share_one_model_call(encoder):
+    # The batch fills up long before the wait is over, so it is sent as soon as the fourth call arrives
+    batcher = EncodeBatcher(encoder, max_batch_size=4, max_wait_ms=10_000)
+    texts = [["data engineer"], ["nurse"], ["python developer"], ["accountant"]]
+    with ThreadPoolExecutor(4) as pool:
+        results = list(pool.map(batcher.encode, texts))
+
+    assert len(encoder.calls) == 1 and sorted(encoder.calls[0]) == sorted(t[0] for t in texts)
+    for call, vectors in zip(texts, results):
+        np.testing.assert_array_equal(vectors, [encoder.vector(call[0])])
+    assert batcher.stats()["batches"] == 1 and batcher.stats()["largest_batch"] == 4
+
+
+def test_a_lone_call_is_sent_once_the_wait_is_over(encoder):
+    batcher = EncodeBatcher(encoder, max_batch_size=32, max_wait_ms=1)
+    vectors = batcher.encode(["nurse", "surgeon"])
+    np.testing.assert_array_equal(vectors, [encoder.vector("nurse"), encoder.vector("surgeon")])
+    assert encoder.calls == [["nurse", "surgeon"]]
+
+
+def test_large_calls_and_disabled_batching_bypass_the_queue(encoder):
+    full = EncodeBatcher(encoder, max_batch_size=2)
+    full.encode(["a", "b", "c"])
+    disabled = EncodeBatcher(encoder, max_batch_size=1)
+    disabled.encode(["d"])
+
+    assert encoder.calls == [["a", "b", "c"], ["d"]]
+    assert full._worker is None and disabled._worker is None
+    assert not disabled.stats()["enabled"] and full.stats()["batches"] == 0
+
+
+def test_a_failed_batch_fails_every_caller_in_it():
+    def broken(texts):
+        raise RuntimeError("model crashed")
+
+    batcher = EncodeBatcher(broken, max_batch_size=2, max_wait_ms=10_000)
+    with ThreadPoolExecutor(2) as pool:
+        futures = [pool.submit(batcher.encode, [text]) for text in ("a", "b")]
+        for future in futures:
+            with pytest.raises(RuntimeError, match="model crashed"):
+                future.result()
+    assert batcher.batches == 0
@@ -0,0 +1,10 @@
+from app.agents.talent_matcher.cache import jd_hash
+
+
+def test_jds_differing_only_in_case_and_whitespace_share_a_hash():
+    assert jd_hash("Senior  Data Engineer\n\nPython, SQL ") == jd_hash("senior data engineer python, sql")
+
+
+def test_different_jds_hash_differently():
+    assert jd_hash("Data Engineer: Python") != jd_hash("Data Engineer: Java")
+    assert len(jd_hash("")) == 32
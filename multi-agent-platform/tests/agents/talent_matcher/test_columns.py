@@ -0,0 +1,90 @@
+import numpy as np
+import pytest
+
+from app.agents.talent_matcher.columns import ColumnStore, DegreeLevel, parse_degree_level
+from app.agents.talent_matcher.schemas import CandidateFilters
+
+EMPLOYEES = [
+    {"title": "Data Analyst", "skills": ["SQL", "Tableau"], "Key_Credentials": "Bachelor of Arts", "experience_years": 2},
+    {"title": "Senior Data Scientist", "skills": ["Python", "SQL"], "Key_Credentials": "Master of Science", "experience_years": 6},
+    {"title": "Research Scientist", "skills": ["Python", "PyTorch"], "Key_Credentials": "PhD in Physics", "experience_years": 9},
+    {"title": "IT Support", "skills": ["Windows"], "Key_Credentials": "Diploma in IT", "experience_years": 4},
+    {"title": "Accountant", "skills": ["Excel"], "Key_Credentials": "CPA", "experience_years": 12},
+]
+
+
+@pytest.fixture
+def columns():
+    return ColumnStore.from_employees(EMPLOYEES)
+
+
+def rows(mask):
+    return np.flatnonzero(mask).tolist()
+
+
+@pytest.mark.parametrize("text, level", [
+    ("Master of Science", DegreeLevel.MASTER),
+    ("MBA", DegreeLevel.MASTER),
+    ("Ph.D. in Physics", DegreeLevel.DOCTORATE),
+    ("B.Tech in Computer Science", DegreeLevel.BACHELOR),
+    ("Diploma in IT", DegreeLevel.ASSOCIATE),
+    ("MS Office certified", DegreeLevel.NONE),
+    ("CPA", DegreeLevel.NONE),
+    (None, DegreeLevel.NONE),
+])
+def test_parse_degree_level(text, level):
+    assert parse_degree_level(text) == level
+
+
+def test_degree_filter_accepts_the_level_and_above(columns):
+    assert rows(columns.evaluate(CandidateFilters(min_degree="Bachelor"))) == [0, 1, 2]
+    assert rows(columns.evaluate(CandidateFilters(min_degree="Master"))) == [1, 2]
+    assert rows(columns.evaluate(CandidateFilters(min_degree="PhD"))) == [2]
+
+
+def test_unknown_degree_wording_matches_the_credential_text(columns):
+    assert rows(columns.evaluate(CandidateFilters(min_degree="cpa"))) == [4]
+
+
+def test_experience_range_is_inclusive(columns):
+    assert rows(columns.evaluate(CandidateFilters(min_experience=4))) == [1, 2, 3, 4]
+    assert rows(columns.evaluate(CandidateFilters(min_experience=4, max_experience=9))) == [1, 2, 3]
+    assert rows(columns.evaluate(CandidateFilters(max_experience=2))) == [0]
+
+
+def test_predicates_are_combined_with_and(columns):
+    filters = CandidateFilters(min_degree="Master", min_experience=5, must_have_skills=["sql"],
+                               any_of_skills=["Tableau", "Python"], title_contains="data")
+    assert rows(columns.evaluate(filters)) == [1]
+
+
+def test_evaluate_rows_agrees_with_evaluate(columns):
+    subset = np.array([4, 2, 1, 0])
+    for filters in (
+        CandidateFilters(min_degree="Master", min_experience=5),
+        CandidateFilters(min_degree="cpa"),
+        CandidateFilters(any_of_skills=["Excel", "PyTorch"], max_experience=10),
+        CandidateFilters(must_have_skills=["Python", "SQL"]),
+    ):
+        assert columns.evaluate_rows(filters, subset).tolist() == columns.evaluate(filters)[subset].tolist()
+
+
+def test_extended_and_take_keep_the_columns_aligned(columns):
+    extended = columns.extended([{"title": "Data Engineer", "skills": ["SQL"], "Key_Credentials": "M.Tech",
+                                  "experience_years": 7}])
+    assert len(columns) == 5 and len(extended) == 6
+    assert rows(extended.evaluate(CandidateFilters(min_degree="Master", must_have_skills=["SQL"]))) == [1, 5]
+
+    compacted = extended.take(np.array([1, 5]))
+    assert rows(compacted.evaluate(CandidateFilters(min_experience=7))) == [1]
+    assert rows(compacted.has_skill("sql")) == [0, 1]
+
+
+def test_profile_keywords_are_precomputed_and_follow_their_rows(columns):
+    assert {"tableau", "analyst"} <= columns.keywords[0]
+    assert "python" not in columns.keywords[0]
+
+    extended = columns.extended([{"title": "Platform Engineer", "skills": ["Kubernetes"],
+                                  "Key_Credentials": "BSc", "experience_years": 3}])
+    assert len(extended.keywords) == 6 and "kubernetes" in extended.keywords[5]
+    assert extended.take(np.array([5, 2])).keywords == [extended.keywords[5], columns.keywords[2]]
@@ -0,0 +1,91 @@
+import json
+import os
+
+import numpy as np
+import pytest
+
+pytest.importorskip("sentence_transformers")
+
+from app.agents.talent_matcher import embedding  # noqa: E402
+from app.agents.talent_matcher.embedding import (  # noqa: E402
+    embedding_model_id, load_embedding_model, max_score_drift, onnx_file_name,
+)
+
+MODEL = "sentence-transformers/all-MiniLM-L6-v2"
+
+
+class FakeModel:
+    """Encodes each text to a fixed vector, plus optional noise standing in for backend error."""
+
+    def __init__(self, encoder, noise=0.0):
+        self.encoder = encoder
+        self.noise = noise
+
+    def encode(self, texts, show_progress_bar=False):
+        vectors = self.encoder(texts)
+        return vectors + self.noise * np.random.default_rng(0).standard_normal(vectors.shape)
+
+
+class Loads:
+    """What load_embedding_model did with model loading and ONNX export patched out."""
+
+    def __init__(self, onnx_dir):
+        self.onnx_dir = onnx_dir
+        self.drift = 0.01  # the score drift a new export is verified with
+        self.models = []  # (path, backend) of every model loaded
+        self.exports = []  # export directories
+
+    def sentence_transformer(self, path, backend="torch", **options):
+        self.models.append((path, backend))
+        return path, backend
+
+    def export(self, model_name, export_dir, quantization, sample_texts, tolerance):
+        self.exports.append(export_dir)
+        os.makedirs(export_dir, exist_ok=True)
+        with open(embedding._verification_path(export_dir, quantization), "w", encoding="utf-8") as f:
+            json.dump({"max_score_drift": self.drift}, f)
+
+
+@pytest.fixture
+def loads(monkeypatch, tmp_path):
+    loads = Loads(str(tmp_path))
+    monkeypatch.setattr(embedding, "SentenceTransformer", loads.sentence_transformer)
+    monkeypatch.setattr(embedding, "_export_onnx", loads.export)
+    monkeypatch.setattr(embedding, "_session_options", lambda intra, inter: None)
+    return loads
+
+
+def test_model_ids_tell_backends_apart():
+    assert embedding_model_id(MODEL, "torch") == MODEL
+    assert embedding_model_id(MODEL, "onnx") == f"{MODEL}+onnx"
+    assert embedding_model_id(MODEL, "onnx", "avx2") == f"{MODEL}+onnx-qint8-avx2"
+    assert onnx_file_name() == "onnx/model.onnx" and onnx_file_name("arm64") == "onnx/model_qint8_arm64.onnx"
+
+
+def test_score_drift_between_models(encoder):
+    texts = ["data engineer", "nurse", "accountant"]
+    assert max_score_drift(FakeModel(encoder), FakeModel(encoder), texts) == pytest.approx(0.0, abs=1e-6)
+    assert max_score_drift(FakeModel(encoder, noise=0.5), FakeModel(encoder), texts) > 0.02
+
+
+@pytest.mark.parametrize("options", [{"backend": "tensorrt"}, {"backend": "onnx", "quantization": "avx3"}])
+def test_unknown_backend_options(options):
+    with pytest.raises(ValueError):
+        load_embedding_model(MODEL, **options)
+
+
+def test_a_verified_onnx_export_is_used_and_reused(loads):
+    for _ in range(2):
+        model, model_id = load_embedding_model(MODEL, backend="onnx", onnx_dir=loads.onnx_dir, quantization="avx2")
+        assert model[1] == "onnx" and model_id == f"{MODEL}+onnx-qint8-avx2"
+    # Exported and verified once; the second start finds the stored verification
+    assert loads.exports == [os.path.join(loads.onnx_dir, MODEL.replace("/", "__"))]
+
+
+def test_an_onnx_export_outside_the_tolerance_falls_back_to_pytorch(loads):
+    loads.drift = 0.05
+    for _ in range(2):
+        model, model_id = load_embedding_model(MODEL, backend="onnx", onnx_dir=loads.onnx_dir, tolerance=0.02)
+        assert model == (MODEL, "torch") and model_id == MODEL
+    # The failed verification is remembered too, so the export is not retried on every start
+    assert len(loads.exports) == 1 and all(backend == "torch" for _, backend in loads.models)
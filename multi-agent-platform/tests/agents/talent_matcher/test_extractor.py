@@ -0,0 +1,80 @@
+import pytest
+
+from app.agents.talent_matcher.extractor import SkillExtractor
+from app.agents.talent_matcher.schemas import JobDescriptionDetail
+
+SKILLS = {
+    "Kubernetes": ["k8s"],
+    "Machine Learning": ["ml"],
+    "Python": [],
+    "Learning": [],
+}
+
+
+@pytest.fixture(scope="module")
+def extractor():
+    return SkillExtractor(SKILLS)
+
+
+def test_skills_are_canonical_and_leftmost_longest(extractor):
+    found = extractor.extract("Python, K8s and machine learning; python again")
+    assert found.skills == ["Python", "Kubernetes", "Machine Learning"]
+
+
+def test_skills_need_word_boundaries(extractor):
+    assert extractor.extract("pythonic mlops").skills == []
+
+
+def test_canonical_skill_synonyms(extractor):
+    assert extractor.canonical_skill("K8S") == "Kubernetes"
+    assert extractor.canonical_skill("Rust") == "Rust"
+    assert extractor.canonical_skills(["k8s", "Kubernetes", "ml"]) == ["Kubernetes", "Machine Learning"]
+
+
+@pytest.mark.parametrize("text, degree", [
+    ("Proficient in MS Office", None),
+    ("BS degree in computer science", "Bachelor"),
+    ("MS in statistics", "Master"),
+    ("B.Tech or M.Tech", "Bachelor"),
+    ("Master's or PhD preferred", "Master"),
+])
+def test_degree(extractor, text, degree):
+    assert extractor.extract(text).degree == degree
+
+
+@pytest.mark.parametrize("text, experience", [
+    ("5+ years of experience", (5, None)),
+    ("3-5 years in backend roles", (3, 5)),
+    ("3 to 5 yrs", (3, 5)),
+    ("5years of Python", (5, None)),
+    ("Five+ years of experience", (5, None)),
+    ("up to four years", (0, 4)),
+    ("We run k8s clusters", (None, None)),
+    ("A company founded 150 years ago", (None, None)),
+])
+def test_experience(extractor, text, experience):
+    found = extractor.extract(text)
+    assert (found.min_experience, found.max_experience) == experience
+
+
+def test_extract_jd_reads_each_requirement_from_its_field(extractor):
+    jd = JobDescriptionDetail(
+        required_skills="Python, k8s",
+        preferred_skills="Machine learning",
+        minimum_qualification="Bachelor's degree",
+        languages="English",
+        overview="Master's holders welcome",
+        key_responsibilities="Mentor 10 years of graduates",
+        key_skills_and_qualifications="4+ years building ML systems",
+        desired_attributes="PhD a plus",
+        benefits="Learning budget",
+    )
+    found = extractor.extract_jd(jd)
+    # Skills and degrees mentioned outside their fields do not count
+    assert found.to_dict() == {"skills": ["Python", "Kubernetes"], "degree": "Bachelor",
+                               "min_experience": 4, "max_experience": None}
+
+
+def test_unknown_degree_name_is_rejected():
+    with pytest.raises(ValueError):
+        SkillExtractor({}, {"Wizard": ["wizardry"]})
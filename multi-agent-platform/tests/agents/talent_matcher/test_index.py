@@ -0,0 +1,154 @@
+import numpy as np
+import pytest
+
+from app.agents.talent_matcher import index as index_module
+from app.agents.talent_matcher.index import ExactIndex, IVFIndex, VectorIndex, create_index, normalize_rows, top_k
+from app.agents.talent_matcher.quantization import EmbeddingMatrix, as_matrix
+
+
+def clustered_embeddings(n=2000, dim=32, clusters=40, seed=0):
+    """Unit vectors scattered around `clusters` centres, like profiles of a few dozen job families."""
+    rng = np.random.default_rng(seed)
+    centres = normalize_rows(rng.standard_normal((clusters, dim)).astype(np.float32))
+    points = centres[rng.integers(clusters, size=n)] + 0.1 * rng.standard_normal((n, dim)).astype(np.float32)
+    return normalize_rows(points.astype(np.float32))
+
+
+def build(index, embeddings):
+    index.build(embeddings)
+    return index
+
+
+def test_top_k_returns_the_best_positions_best_first():
+    scores = np.random.default_rng(5).standard_normal(1000).astype(np.float32)
+    assert top_k(scores, 10).tolist() == np.argsort(-scores)[:10].tolist()
+    assert top_k(scores, 5000).tolist() == np.argsort(-scores).tolist()
+    assert len(top_k(scores, 0)) == 0
+    assert len(top_k(np.empty(0, dtype=np.float32), 3)) == 0
+
+
+def test_top_k_keeps_row_order_among_tied_scores():
+    assert top_k(np.array([0.5, 0.9, 0.5, 0.9, 0.1], dtype=np.float32), 3).tolist() == [1, 3, 0]
+
+
+def test_exact_index_returns_true_top_k_in_score_order():
+    embeddings = clustered_embeddings(n=300)
+    query = embeddings[7]
+    rows, scores = build(ExactIndex(), embeddings).search(query, 5)
+
+    expected = np.argsort(-(embeddings @ query))[:5]
+    assert rows.tolist() == expected.tolist()
+    assert rows[0] == 7
+    assert np.all(np.diff(scores) <= 0)
+
+
+def test_ivf_recall_against_exact():
+    # Queries come from the same job families as the profiles
+    points = clustered_embeddings(n=2050)
+    embeddings, queries = points[:2000], points[2000:]
+    exact = build(ExactIndex(), embeddings)
+    ivf = build(IVFIndex(nlist=40, nprobe=8), embeddings)
+
+    k = 10
+    found = 0
+    for query in queries:
+        expected = set(exact.search(query, k)[0].tolist())
+        found += len(expected & set(ivf.search(query, k)[0].tolist()))
+    assert found / (k * len(queries)) >= 0.9
+
+
+def test_ivf_probing_every_cell_is_exact():
+    embeddings = clustered_embeddings(n=500)
+    exact = build(ExactIndex(), embeddings)
+    ivf = build(IVFIndex(nlist=16, nprobe=16), embeddings)
+    for query in clustered_embeddings(n=10, seed=2):
+        assert ivf.search(query, 5)[0].tolist() == exact.search(query, 5)[0].tolist()
+
+
+def test_masked_search_only_returns_allowed_rows():
+    embeddings = clustered_embeddings(n=500)
+    mask = np.zeros(len(embeddings), dtype=bool)
+    mask[::7] = True
+    for index in (build(ExactIndex(), embeddings), build(IVFIndex(nlist=16, nprobe=2), embeddings)):
+        rows, _ = index.search(embeddings[3], 10, mask=mask)
+        assert len(rows) == 10
+        assert mask[rows].all()
+
+
+def test_ivf_probes_more_cells_until_the_filter_leaves_k_rows():
+    embeddings = clustered_embeddings(n=500)
+    mask = np.zeros(len(embeddings), dtype=bool)
+    mask[[11, 222, 444]] = True
+    rows, _ = build(IVFIndex(nlist=16, nprobe=1), embeddings).search(embeddings[0], 3, mask=mask)
+    assert sorted(rows.tolist()) == [11, 222, 444]
+
+
+def test_with_rows_leaves_the_original_index_untouched():
+    embeddings = as_matrix(clustered_embeddings(n=400))
+    ivf = build(IVFIndex(nlist=8, nprobe=8), embeddings.head(300))
+    extended = ivf.with_rows(embeddings, np.arange(300, 400))
+
+    assert len(ivf) == 300
+    assert len(extended) == 400
+    query = embeddings.vectors([350])[0]
+    assert extended.search(query, 1)[0].tolist() == [350]
+    assert ivf.search(query, 5)[0].max() < 300
+
+
+@pytest.mark.parametrize("index_type", ["exact", "ivf"])
+def test_empty_index_finds_nothing_until_rows_are_added(index_type):
+    index = build(create_index(index_type), np.empty((0, 16), dtype=np.float32))
+    query = normalize_rows(np.ones((1, 16), dtype=np.float32))[0]
+
+    rows, scores = index.search(query, 5)
+    assert len(rows) == 0 and len(scores) == 0
+
+    embeddings = clustered_embeddings(n=20, dim=16)
+    rows, _ = index.with_rows(as_matrix(embeddings), np.arange(20)).search(embeddings[4], 1)
+    assert rows.tolist() == [4]
+
+
+def test_unknown_index_type():
+    with pytest.raises(ValueError):
+        create_index("hnsw")
+
+
+def test_incomplete_index_fails_at_construction():
+    class SearchOnly(VectorIndex):
+        def search(self, query, k, mask=None):
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+
+    with pytest.raises(TypeError):
+        SearchOnly()
+
+
+@pytest.mark.parametrize("precision", ["float32", "int8"])
+def test_batched_search_agrees_with_one_query_at_a_time(monkeypatch, precision):
+    # A tiny block size makes the queries span several matrix products
+    monkeypatch.setattr(index_module, "BATCH_SCORE_ELEMENTS", 3 * 400)
+    embeddings = EmbeddingMatrix.from_float32(clustered_embeddings(n=400), precision)
+    index = build(ExactIndex(), embeddings)
+    queries = clustered_embeddings(n=8, seed=3)
+    masks = np.random.default_rng(4).uniform(size=(8, 400)) < 0.3
+    masks[5] = False
+    masks[6, :] = False
+    masks[6, [10, 20]] = True
+
+    for mask_set in (None, masks):
+        batched = list(index.search_batch(queries, 10, masks=mask_set))
+        assert len(batched) == len(queries)
+        for i, (rows, scores) in enumerate(batched):
+            expected_rows, expected_scores = index.search(queries[i], 10, mask=None if mask_set is None else mask_set[i])
+            assert rows.tolist() == expected_rows.tolist()
+            np.testing.assert_allclose(scores, expected_scores, rtol=1e-5)
+    assert [len(rows) for rows, _ in index.search_batch(queries, 10, masks=masks)][5:7] == [0, 2]
+
+
+def test_default_batched_search_runs_each_query_with_its_own_mask():
+    embeddings = clustered_embeddings(n=500)
+    ivf = build(IVFIndex(nlist=16, nprobe=16), embeddings)
+    queries = embeddings[[1, 2, 3]]
+    masks = np.zeros((3, 500), dtype=bool)
+    masks[0, ::2] = masks[1, 1::2] = masks[2, :50] = True
+    for mask, (rows, _) in zip(masks, ivf.search_batch(queries, 5, masks=masks)):
+        assert len(rows) == 5 and mask[rows].all()
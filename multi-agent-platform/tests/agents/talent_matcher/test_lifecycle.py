@@ -0,0 +1,201 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from app.agents.talent_matcher import lifecycle
+from app.agents.talent_matcher.lifecycle import ChangeFeed, NotReadyError, ServiceLoader
+
+
+@pytest.fixture
+def loader():
+    """A ServiceLoader whose build the test finishes itself, through its future."""
+    loader = ServiceLoader()
+    loader._thread = threading.current_thread()
+    return loader
+
+
+def finish_later(loader, result=None, error=None):
+    def finish():
+        time.sleep(0.02)
+        if error is not None:
+            loader._future.set_exception(error)
+        else:
+            loader._future.set_result(result)
+    threading.Thread(target=finish).start()
+
+
+def test_wait_ready_gives_up_at_its_timeout(loader):
+    with pytest.raises(NotReadyError, match="starting up"):
+        asyncio.run(loader.wait_ready(0.05))
+    # The build carries on for later requests
+    assert not loader._future.cancelled()
+    loader._future.set_result("service")
+    assert asyncio.run(loader.wait_ready(0.05)) == "service"
+
+
+def test_wait_ready_returns_the_service_once_built(loader):
+    finish_later(loader, result="service")
+    assert asyncio.run(loader.wait_ready(5)) == "service"
+
+
+def test_wait_ready_reports_a_failed_build_straight_away(loader):
+    finish_later(loader, error=RuntimeError("model download failed"))
+    started = time.monotonic()
+    with pytest.raises(NotReadyError, match="failed to start: model download failed"):
+        asyncio.run(loader.wait_ready(5))
+    assert time.monotonic() - started < 1
+
+
+def test_status_reports_each_phase_and_the_progress_within_it(loader, monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(lifecycle.time, "monotonic", lambda: now[0])
+    loader._started_at = now[0]
+    assert loader.status()["phase"] == "pending"
+
+    loader.progress("data load")
+    now[0] += 2
+    loader.progress("encode", 0, 5000)
+    now[0] += 30
+    loader.progress("encode", 4096, 5000)
+    status = loader.status()
+    assert (status["ready"], status["phase"], status["elapsed_seconds"]) == (False, "encode", 32.0)
+    assert status["phases"] == [{"phase": "data load", "seconds": 2.0}]
+    assert status["progress"] == {"done": 4096, "total": 5000}
+
+    now[0] += 1
+    loader.progress("ready")
+    loader._future.set_result("service")
+    status = loader.status()
+    assert status["ready"] and "progress" not in status
+    assert [phase["phase"] for phase in status["phases"]] == ["data load", "encode"]
+
+
+def test_status_reports_a_failed_build(loader):
+    loader.progress("failed")
+    loader._future.set_exception(RuntimeError("model download failed"))
+    status = loader.status()
+    assert not status["ready"] and status["phase"] == "failed" and status["error"] == "model download failed"
+
+
+def test_changes_are_kept_until_every_worker_applied_them():
+    feed = ChangeFeed(workers=2)
+    feed.record(None, "upsert", [{"Employee_ID": "1"}])
+    feed.record("acme", "delete", ["2"])
+    dropped, changes = feed.pending()
+    assert dropped == (0, 0.0)
+    assert [(entry[0],) + entry[2:4] for entry in changes] == [(1, None, "upsert"), (2, "acme", "delete")]
+
+    feed.acknowledge(101, 2)
+    # The other worker has not reported yet
+    assert len(feed.pending()[1]) == 2
+    feed.acknowledge(102, 1)
+    assert [entry[0] for entry in feed.pending()[1]] == [2]
+    # Positions only move forward (a stale reply cannot resurrect dropped changes)
+    feed.acknowledge(101, 0)
+    feed.acknowledge(102, 2)
+    assert feed.pending()[1] == []
+    assert feed.stats() == {"position": 2, "pending": 0, "dropped_through": 2, "workers": {101: 2, 102: 2}}
+
+
+def test_saved_changes_wait_only_for_workers_that_still_report(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(lifecycle.time, "time", lambda: now[0])
+    feed = ChangeFeed(workers=4, changes_saved=True, worker_timeout=60)
+    feed.record(None, "delete", ["1"])
+    feed.record(None, "delete", ["2"])
+
+    # Only one of the four workers ever got work: its position is enough
+    feed.acknowledge(101, 1)
+    assert [entry[0] for entry in feed.pending()[1]] == [2]
+    feed.acknowledge(102, 1)
+    now[0] += 61
+    feed.acknowledge(101, 2)
+    # 102 went quiet, so it no longer holds change 2 back
+    assert feed.pending() == ((2, 1000.0), [])
+    assert feed.stats()["workers"] == {101: 2}
+
+
+def test_saved_changes_are_capped():
+    feed = ChangeFeed(workers=2, changes_saved=True, max_changes=2)
+    for emp_id in "123":
+        feed.record(None, "delete", [emp_id])
+    dropped, changes = feed.pending()
+    assert dropped[0] == 1 and [entry[0] for entry in changes] == [2, 3]
+    # Unsaved changes cannot be reloaded, so they are never capped
+    feed = ChangeFeed(workers=2, max_changes=2)
+    for emp_id in "123":
+        feed.record(None, "delete", [emp_id])
+    assert len(feed.pending()[1]) == 3
+
+
+def test_disabled_feed_records_nothing():
+    feed = ChangeFeed(workers=2, enabled=False)
+    feed.record(None, "delete", ["1"])
+    assert feed.pending()[1] == []
+
+
+class FakeTenants:
+    """A worker's tenant registry: one FakeMatcher per tenant, built on first use."""
+
+    def __init__(self, make_matcher, employees, loaded):
+        self.make_matcher = make_matcher
+        self.employees = employees
+        self.loaded = loaded
+        self.services = {}
+
+    def is_loaded(self, tenant_id):
+        return tenant_id is None or tenant_id in self.loaded
+
+    def get(self, tenant_id):
+        if tenant_id not in self.services:
+            self.services[tenant_id] = self.make_matcher(self.employees)
+        return self.services[tenant_id]
+
+    def ids(self, tenant_id):
+        return sorted(self.get(tenant_id).store.view.id_to_row)
+
+
+@pytest.fixture
+def worker(monkeypatch, make_matcher, make_employee):
+    tenants = FakeTenants(make_matcher, [make_employee(i) for i in range(1, 4)], loaded={"acme"})
+    monkeypatch.setattr(lifecycle, "_worker_tenants", tenants)
+    monkeypatch.setattr(lifecycle, "_worker_position", 0)
+    monkeypatch.setattr(lifecycle, "_changes_saved", True)
+    return tenants
+
+
+def test_worker_applies_each_change_once(worker, make_employee, encoder):
+    changes = [(1, 0.0, None, "upsert", [make_employee(7, title="Rust Engineer")]), (2, 0.0, "acme", "delete", ["3"])]
+    lifecycle._apply_changes(changes[:1])
+    lifecycle._apply_changes(changes)
+    assert worker.ids(None) == ["1", "2", "3", "7"]
+    assert worker.ids("acme") == ["1", "2"]
+    # The upsert was replayed once: one profile encoded, one new index version
+    assert encoder.encoded == 1 and worker.get(None).store.view.version == 1
+    assert lifecycle._worker_position == 2
+
+
+def test_worker_skips_unloaded_tenants_only_when_changes_are_saved(worker, monkeypatch):
+    lifecycle._apply_changes([(1, 0.0, "other", "delete", ["3"])])
+    assert "other" not in worker.services and lifecycle._worker_position == 1
+
+    monkeypatch.setattr(lifecycle, "_changes_saved", False)
+    lifecycle._apply_changes([(2, 0.0, "other", "delete", ["2"])])
+    assert worker.ids("other") == ["1", "3"]
+
+
+def test_worker_behind_the_dropped_changes_reloads_the_saved_data(worker, monkeypatch):
+    reloads = []
+    monkeypatch.setattr(lifecycle, "_load_worker", lambda: reloads.append(lifecycle._worker_position))
+    monkeypatch.setattr(lifecycle, "_loaded_at", 100.0)
+
+    # Changes dropped before this worker loaded its data are already in it
+    lifecycle._catch_up((3, 50.0))
+    assert reloads == [] and lifecycle._worker_position == 3
+    lifecycle._catch_up((3, 150.0))
+    assert reloads == []
+    # Changes it missed, saved after it loaded
+    lifecycle._catch_up((5, 150.0))
+    assert reloads == [3] and lifecycle._worker_position == 5
@@ -0,0 +1,46 @@
+from app.agents.talent_matcher.loader import (
+    append_changes, change_log_path, count_changes, live_data_path, load_employees, replay_changes, save_employees,
+)
+
+
+def test_changes_are_saved_next_to_the_seed_file(tmp_path):
+    seed = tmp_path / "employees.jsonl"
+    seed.write_text('{"name": "Alice"}\n', encoding="utf-8")
+
+    live = live_data_path(str(seed))
+    assert live == str(tmp_path / "employees.live.jsonl")
+
+    save_employees(live, [{"name": "Alice", "Employee_ID": "1"}, {"name": "Bob", "Employee_ID": "2"}])
+    assert [emp["name"] for emp in load_employees(live)] == ["Alice", "Bob"]
+    assert seed.read_text(encoding="utf-8") == '{"name": "Alice"}\n'
+
+
+def test_changes_are_replayed_in_order_on_top_of_the_live_file(tmp_path):
+    log = change_log_path(str(tmp_path / "employees.jsonl"))
+    assert log == str(tmp_path / "employees.changes.jsonl")
+    base = [{"name": "Alice", "Employee_ID": "1"}, {"name": "Bob", "Employee_ID": "2"}]
+
+    append_changes(log, upserts=[{"name": "Alicia", "Employee_ID": "1"}, {"name": "Cara", "Employee_ID": "3"}])
+    append_changes(log, deletes=["2"])
+    append_changes(log, upserts=[{"name": "Bobby", "Employee_ID": "2"}])
+
+    employees, changes = replay_changes(list(base), log)
+    # Updated in place, deleted then re-added at the end
+    assert [emp["name"] for emp in employees] == ["Alicia", "Cara", "Bobby"]
+    assert changes == count_changes(log) == 4
+
+
+def test_a_change_cut_short_by_a_crash_is_ignored(tmp_path):
+    log = str(tmp_path / "employees.changes.jsonl")
+    append_changes(log, deletes=["1"])
+    with open(log, "a", encoding="utf-8") as f:
+        f.write('{"upsert": {"name": "Al')
+
+    employees, changes = replay_changes([{"name": "Alice", "Employee_ID": "1"}], log)
+    assert employees == [] and changes == 1
+
+
+def test_no_change_log_leaves_the_records_alone(tmp_path):
+    base = [{"name": "Alice", "Employee_ID": "1"}]
+    assert replay_changes(base, str(tmp_path / "missing.jsonl")) == (base, 0)
+    assert count_changes(str(tmp_path / "missing.jsonl")) == 0
@@ -0,0 +1,73 @@
+import numpy as np
+import pytest
+
+from app.agents.talent_matcher.pagination import InvalidCursorError, Ranking, decode_cursor, encode_cursor
+
+
+def ranking(scores, ids, query_key="q1"):
+    return Ranking(query_key, None, np.arange(len(scores)), np.array(scores, dtype=np.float32),
+                   np.array(ids), frozenset())
+
+
+def pages(rank, page_size):
+    """Walks a ranking page by page through its cursors, like a client would."""
+    cursor, seen = None, []
+    while True:
+        start = rank.start_of(cursor)
+        end = min(start + page_size, len(rank))
+        seen.append(rank.employee_ids[start:end].tolist())
+        if end >= len(rank):
+            return seen
+        cursor = rank.cursor_after(end - 1)
+
+
+def test_order_is_descending_score_then_employee_id():
+    rank = ranking([0.5, 0.9, 0.5, 0.7], ["E3", "E1", "E2", "E4"])
+    assert rank.employee_ids.tolist() == ["E1", "E4", "E2", "E3"]
+    assert rank.rows.tolist() == [1, 3, 2, 0]
+
+
+def test_cursor_round_trips_the_exact_score():
+    score = float(np.float32(0.123456789))
+    cursor = encode_cursor("q1", score, "E7")
+    assert decode_cursor(cursor, "q1") == (score, "E7")
+    assert "=" not in cursor
+
+
+def test_pages_cover_every_candidate_once_across_score_ties():
+    rank = ranking([0.8] * 5 + [0.6] * 4, [f"E{i}" for i in range(9)])
+    walked = pages(rank, 2)
+    assert [len(page) for page in walked] == [2, 2, 2, 2, 1]
+    assert sum(walked, []) == rank.employee_ids.tolist()
+
+
+def test_cursor_survives_changes_to_the_directory():
+    before = ranking([0.9, 0.8, 0.7, 0.6], ["E1", "E2", "E3", "E4"])
+    cursor = before.cursor_after(1)
+
+    # E1 was deleted and E5 inserted ahead of the cursor after the first page was served
+    after = ranking([0.85, 0.8, 0.7, 0.6], ["E5", "E2", "E3", "E4"])
+    start = after.start_of(cursor)
+    assert after.employee_ids[start:].tolist() == ["E3", "E4"]
+
+
+def test_position_after_a_missing_candidate():
+    rank = ranking([0.9, 0.8, 0.8, 0.7], ["E1", "E2", "E4", "E5"])
+    assert rank.position_after(float(rank.scores[1]), "E3") == 2
+    assert rank.position_after(1.0, "E0") == 0
+    assert rank.position_after(0.1, "E9") == 4
+
+
+def test_start_without_cursor():
+    assert ranking([0.5], ["E1"]).start_of(None) == 0
+
+
+@pytest.mark.parametrize("cursor", ["not-base64!", "bm90IGpzb24", encode_cursor("q1", 0.5, "E1")[:-4]])
+def test_malformed_cursor_is_rejected(cursor):
+    with pytest.raises(InvalidCursorError):
+        decode_cursor(cursor, "q1")
+
+
+def test_cursor_from_another_query_is_rejected():
+    with pytest.raises(InvalidCursorError, match="different"):
+        ranking([0.5], ["E1"], query_key="q2").start_of(encode_cursor("q1", 0.5, "E1"))
@@ -0,0 +1,81 @@
+import numpy as np
+import pytest
+
+from app.agents.talent_matcher import quantization
+from app.agents.talent_matcher.index import normalize_rows
+from app.agents.talent_matcher.quantization import EmbeddingMatrix, quantize
+
+
+@pytest.fixture
+def vectors():
+    return normalize_rows(np.random.default_rng(0).standard_normal((500, 64)).astype(np.float32))
+
+
+@pytest.mark.parametrize("precision, tolerance, ratio", [("float16", 1e-3, 2), ("int8", 2e-2, 3.5)])
+def test_compact_scores_stay_close_to_float32(monkeypatch, vectors, precision, tolerance, ratio):
+    # Score in several chunks, as a large directory would
+    monkeypatch.setattr(quantization, "SCORE_CHUNK_ROWS", 128)
+    matrix = EmbeddingMatrix.from_float32(vectors, precision)
+    queries = vectors[:4]
+
+    assert matrix.precision == precision
+    assert matrix.nbytes * ratio <= vectors.nbytes
+    np.testing.assert_allclose(matrix.dot(queries[0]), vectors @ queries[0], atol=tolerance)
+    np.testing.assert_allclose(matrix.dot_batch(queries), queries @ vectors.T, atol=tolerance)
+    rows = np.array([3, 40, 499])
+    np.testing.assert_allclose(matrix.dot(queries[0], rows), matrix.dot(queries[0])[rows], rtol=1e-5)
+
+
+def test_rescore_is_exact_with_the_full_copy(vectors):
+    rows = np.array([9, 1, 250])
+    exact = vectors[rows] @ vectors[0]
+    kept = EmbeddingMatrix.from_float32(vectors, "int8", keep_full=True)
+    assert kept.nbytes < vectors.nbytes
+    np.testing.assert_array_equal(kept.rescore(vectors[0], rows), exact)
+
+    dropped = EmbeddingMatrix.from_float32(vectors, "int8")
+    assert not np.array_equal(dropped.rescore(vectors[0], rows), exact)
+    np.testing.assert_allclose(dropped.rescore(vectors[0], rows), exact, atol=2e-2)
+
+
+def test_int8_rows_have_their_own_scale():
+    codes, scales = quantize(np.array([[0.5, -0.25], [0.0, 0.0], [-2.0, 1.0]], dtype=np.float32), "int8")
+    assert codes.dtype == np.int8 and np.abs(codes).max() == 127
+    np.testing.assert_allclose(scales, [0.5 / 127, 1.0, 2.0 / 127])
+    assert codes[1].tolist() == [0, 0]
+
+
+def test_unknown_precision():
+    with pytest.raises(ValueError):
+        quantize(np.zeros((1, 4), dtype=np.float32), "bfloat16")
+
+
+def test_appended_rows_fill_spare_capacity_before_growing(vectors):
+    matrix = EmbeddingMatrix.from_float32(vectors[:100], "int8", keep_full=True)
+    grown = matrix.appended(100, vectors[100:110])
+    assert grown is not matrix and len(grown) == 1024
+    head = grown.head(110)
+    np.testing.assert_array_equal(head.vectors(np.arange(110)), vectors[:110])
+
+    again = grown.appended(110, vectors[110:120])
+    assert again is grown
+    # The published head over the same buffer is unaffected by rows written past it
+    assert len(head) == 110
+    np.testing.assert_array_equal(again.head(120).vectors([115]), vectors[[115]])
+
+
+def test_appending_to_a_read_only_matrix_copies_it(vectors):
+    codes = vectors[:50].copy()
+    codes.flags.writeable = False
+    matrix = EmbeddingMatrix(codes)
+    grown = matrix.appended(50, vectors[50:51])
+    assert grown.codes is not codes
+    np.testing.assert_array_equal(grown.head(51).vectors(np.arange(51)), vectors[:51])
+
+
+def test_take_keeps_only_the_given_rows(vectors):
+    matrix = EmbeddingMatrix.from_float32(vectors, "float16", keep_full=True)
+    taken = matrix.take(np.array([7, 3]))
+    assert len(taken) == 2 and taken.precision == "float16"
+    np.testing.assert_array_equal(taken.vectors([0, 1]), vectors[[7, 3]])
+    np.testing.assert_array_equal(taken.codes, matrix.codes[[7, 3]])
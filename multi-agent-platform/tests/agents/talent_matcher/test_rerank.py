@@ -0,0 +1,70 @@
+import numpy as np
+import pytest
+
+from app.agents.talent_matcher import rerank
+from app.agents.talent_matcher.rerank import CrossEncoderReranker
+
+PROFILES = [f"Data Engineer {i} Python, SQL BSc" for i in range(6)]
+
+
+class FakeCrossEncoder:
+    """Scores a pair by the profile's number; each pair takes `seconds_per_pair` on the test's clock."""
+
+    def __init__(self, clock, seconds_per_pair=0.01):
+        self.clock = clock
+        self.seconds_per_pair = seconds_per_pair
+        self.pairs = []
+
+    def predict(self, pairs, batch_size=32, show_progress_bar=False):
+        self.pairs.extend(profile for _, profile in pairs)
+        self.clock[0] += self.seconds_per_pair * len(pairs)
+        return [float(profile.split()[2]) for _, profile in pairs]
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [0.0]
+    monkeypatch.setattr(rerank.time, "perf_counter", lambda: now[0])
+    return now
+
+
+@pytest.fixture
+def reranker(clock):
+    reranker = CrossEncoderReranker("fake-cross-encoder", cache_size=100)
+    reranker._model = FakeCrossEncoder(clock)
+    return reranker
+
+
+def test_scores_every_profile_and_caches_the_pairs(reranker):
+    scores, scored = reranker.score("jd", "jd-key", PROFILES, batch_size=4)
+    assert scored == 6 and scores.tolist() == [0, 1, 2, 3, 4, 5]
+
+    scores, scored = reranker.score("jd", "jd-key", PROFILES[::-1] + ["Data Engineer 9 Rust"], batch_size=4)
+    assert scored == 7 and scores.tolist() == [5, 4, 3, 2, 1, 0, 9]
+    # Only the new profile was sent to the model the second time
+    assert reranker._model.pairs == PROFILES + ["Data Engineer 9 Rust"]
+    assert reranker.pairs_scored == 7 and reranker.stats()["pair_cache"]["hits"] == 6
+
+
+def test_pair_scores_are_per_jd(reranker):
+    reranker.score("jd", "jd-key", PROFILES[:2])
+    reranker.score("other jd", "other-key", PROFILES[:2])
+    assert len(reranker._model.pairs) == 4
+
+
+def test_scoring_stops_when_the_next_batch_would_overrun_the_budget(reranker):
+    # 10 ms per pair: two batches of one fit in 25 ms, a third would not
+    scores, scored = reranker.score("jd", "jd-key", PROFILES, batch_size=1, budget_ms=25)
+    assert scored == 2 and scores[:2].tolist() == [0, 1] and np.isnan(scores[2:]).all()
+    assert reranker.budget_exhausted == 1
+
+    # The pairs scored in time are cached, so the next request gets further
+    _, scored = reranker.score("jd", "jd-key", PROFILES, batch_size=1, budget_ms=25)
+    assert scored == 4
+
+
+def test_the_model_is_only_loaded_when_needed():
+    reranker = CrossEncoderReranker("fake-cross-encoder", cache_size=0)
+    assert not reranker.stats()["loaded"]
+    assert reranker.score("jd", "jd-key", [])[1] == 0
+    assert not reranker.stats()["loaded"]
@@ -0,0 +1,82 @@
+import pytest
+
+TITLES = ["Data Analyst", "Data Engineer", "Nurse", "Accountant", "Python Developer", "Research Scientist"]
+
+
+@pytest.fixture
+def employees(make_employee):
+    # Every profile text differs, so no two candidates tie on score
+    return [make_employee(i, f"{TITLES[i % len(TITLES)]} {i}", skills=("SQL", "Python")[: 1 + i % 2], years=i % 10)
+            for i in range(1, 61)]
+
+
+def ids(results):
+    return [result["employee_id"] for result in results]
+
+
+def test_a_repeated_jd_is_neither_re_encoded_nor_re_ranked(make_service, make_job, encoder, employees):
+    service = make_service(employees)
+    startup_calls = len(encoder.calls)
+
+    first = service.match(make_job("Data Analyst"))
+    # Only the formatting differs, so the JD hashes alike
+    again = service.match(make_job("data  analyst"))
+    assert ids(again) == ids(first)
+    assert len(encoder.calls) == startup_calls + 1
+    assert service.result_cache.stats()["hits"] == 1
+
+    service.match(make_job("Data Analyst", top_k=10))
+    assert len(encoder.calls) == startup_calls + 1
+    assert service.jd_cache.stats()["hits"] == 1
+
+
+def test_cached_results_are_dropped_when_the_directory_changes(make_service, make_job, employees):
+    service = make_service(employees)
+    best = ids(service.match(make_job("Nurse")))[0]
+
+    service.delete_employees([best])
+    assert best not in ids(service.match(make_job("Nurse")))
+    assert service.result_cache.stats()["invalidations"] >= 1
+
+
+class FakeCrossEncoder:
+    def predict(self, pairs, batch_size=32, show_progress_bar=False):
+        return [sum(map(ord, profile)) % 97 for _, profile in pairs]
+
+
+def test_rerank_reorders_the_first_stage_top_n(make_service, make_job, employees):
+    service = make_service(employees)
+    service.reranker._model = FakeCrossEncoder()
+    first_stage = ids(service.match(make_job("Data Engineer", top_k=10)))
+
+    results = service.match(make_job("Data Engineer", top_k=3, rerank={"top_n": 10}))
+    assert len(results) == 3 and set(ids(results)) <= set(first_stage)
+    rerank_scores = [result["rerank_score"] for result in results]
+    assert rerank_scores == sorted(rerank_scores, reverse=True)
+
+
+def test_results_cut_short_by_the_rerank_budget_are_not_cached(make_service, make_job, employees):
+    service = make_service(employees)
+    service.reranker._model = FakeCrossEncoder()
+    # A slow estimate leaves no room for even one batch
+    service.reranker._seconds_per_pair = 10.0
+    request = make_job("Data Engineer", top_k=3, rerank={"top_n": 10, "budget_ms": 1})
+
+    results = service.match(request)
+    assert all(result["rerank_score"] is None for result in results)
+    service.match(request)
+    assert service.result_cache.stats()["hits"] == 0 and service.reranker.budget_exhausted == 2
+
+
+def test_a_sharded_directory_matches_like_a_single_one(make_service, make_job, employees):
+    single = make_service(employees)
+    sharded = make_service(employees, TALENT_MATCHER_SHARDS=3)
+    assert sharded.shards is not None
+
+    requests = [make_job("Data Engineer", top_k=10), make_job("Nurse", min_years_experience=5)]
+    for expected, results in zip(single.match_many(requests), sharded.match_many(requests)):
+        assert ids(results) == ids(expected)
+        assert [r["reasons"] for r in results] == [r["reasons"] for r in expected]
+
+    new_ids = sharded.upsert_employees([employees[0] | {"Employee_ID": None, "name": "Copy"}])["employee_ids"]
+    assert new_ids[0] in ids(sharded.match(make_job("Data Engineer", top_k=60)))
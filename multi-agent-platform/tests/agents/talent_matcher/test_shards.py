@@ -0,0 +1,73 @@
+import numpy as np
+import pytest
+
+from app.agents.talent_matcher.loader import build_profile_text
+from app.agents.talent_matcher.schemas import CandidateFilters
+from app.agents.talent_matcher.shards import ShardPool, shard_of
+
+
+@pytest.fixture
+def employees(make_employee):
+    return [make_employee(i, title=f"Engineer {i}", years=i % 10) for i in range(1, 201)]
+
+
+@pytest.fixture
+def embed(encoder):
+    return lambda employees: np.stack([encoder.vector(build_profile_text(emp)) for emp in employees])
+
+
+@pytest.fixture
+def pool(employees, embed):
+    """Three shard worker processes over the employees."""
+    pool = ShardPool(employees, embed(employees), shards=3)
+    yield pool
+    pool.shutdown()
+
+
+def expected_top_k(employees, embeddings, query, filters, k):
+    """The top-k employee IDs of a brute-force search over the whole directory."""
+    allowed = [i for i, emp in enumerate(employees) if emp["experience_years"] >= filters.min_experience]
+    scores = embeddings[allowed] @ query
+    return [employees[allowed[i]]["Employee_ID"] for i in np.argsort(-scores)[:k]], len(allowed)
+
+
+def hit_ids(hits):
+    return [emp["Employee_ID"] for _, emp, _ in hits]
+
+
+def test_shard_of_is_stable_and_spreads_employees():
+    assert [shard_of(str(i), 4) for i in range(50)] == [shard_of(str(i), 4) for i in range(50)]
+    assert set(shard_of(str(i), 4) for i in range(200)) == {0, 1, 2, 3}
+
+
+def test_scatter_gather_finds_the_global_top_k(pool, employees, embed, encoder):
+    assert sum(pool.sizes) == 200 and all(size > 0 for size in pool.sizes)
+    embeddings = embed(employees)
+    queries = np.stack([encoder.vector("Data Engineer"), encoder.vector("Nurse")])
+    all_filters = [CandidateFilters(min_experience=0), CandidateFilters(min_experience=6)]
+
+    for (hits, matching), query, filters in zip(pool.search(queries, all_filters, 10), queries, all_filters):
+        expected, allowed = expected_top_k(employees, embeddings, query, filters, 10)
+        assert hit_ids(hits) == expected and matching == allowed
+        scores = [score for score, _, _ in hits]
+        assert scores == sorted(scores, reverse=True)
+
+
+def test_updates_reach_the_shard_holding_the_employee(pool, embed, make_employee):
+    filters = [CandidateFilters(min_experience=0)]
+    newcomer = make_employee(None, title="Rust Engineer", skills=["Rust"])
+    query = embed([newcomer])[0]
+
+    [new_id] = pool.upsert([newcomer], embed([newcomer]))
+    assert new_id == "201" and pool.version == 1 and sum(pool.sizes) == 201
+    # The profile encodes to exactly the query, so it must come first
+    assert hit_ids(pool.search(query[None], filters, 1)[0][0]) == ["201"]
+
+    moved = make_employee(7, title="Rust Engineer", skills=["Rust"], years=2)
+    pool.upsert([moved], embed([moved]))
+    assert set(hit_ids(pool.search(query[None], filters, 2)[0][0])) == {"201", "7"}
+    assert sum(pool.sizes) == 201
+
+    assert pool.delete(["201", "999"]) == ["201"]
+    assert hit_ids(pool.search(query[None], filters, 1)[0][0]) == ["7"]
+    assert pool.version == 3 and len(pool.live_employees()) == 200
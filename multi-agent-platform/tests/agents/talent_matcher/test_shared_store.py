@@ -0,0 +1,75 @@
+import numpy as np
+import pytest
+
+from app.agents.talent_matcher.index import create_index
+from app.agents.talent_matcher.loader import build_profile_text
+from app.agents.talent_matcher.shared_store import SharedSnapshotStore
+from app.agents.talent_matcher.snapshot import load_or_build_embeddings
+
+MODEL = "model-a"
+
+
+@pytest.fixture
+def directory(tmp_path, encoder, make_employee):
+    """A snapshot directory holding 20 employees in int8, as the first worker to start leaves it."""
+    directory = str(tmp_path / "snapshot")
+    employees = [make_employee(i, title=f"Engineer {i}", years=i % 8) for i in range(1, 21)]
+    load_or_build_embeddings(directory, MODEL, employees, [build_profile_text(emp) for emp in employees],
+                             encoder, precision="int8")
+    encoder.calls.clear()
+    return directory
+
+
+@pytest.fixture
+def open_store(directory):
+    """open_store(on_publish=None): one worker's store attached to the shared directory."""
+    def attach(on_publish=None, model_id=MODEL):
+        return SharedSnapshotStore(directory, model_id, "int8", False, lambda: create_index("exact"), on_publish)
+    return attach
+
+
+def test_workers_attach_to_the_same_generation(open_store):
+    first, second = open_store(), open_store()
+    assert first.generation == second.generation
+    assert first.view.size == second.view.size == 20
+    assert first.view.embeddings.precision == "int8"
+    assert first.find("3")["title"] == "Engineer 3" and first.find("99") is None
+
+
+def test_an_update_by_one_worker_is_seen_by_the_others(open_store, encoder, make_employee):
+    published = []
+    writer, reader = open_store(on_publish=published.append), open_store()
+    old_view = reader.view
+
+    view, ids, encoded = writer.upsert([make_employee(None, title="Rust Engineer", skills=["Rust"])], encoder)
+    assert ids == ["21"] and encoded == 1 and view.size == 21
+    assert reader.view.size == 21 and reader.find("21")["title"] == "Rust Engineer"
+    assert reader.switches == 1 and reader.generation == writer.generation
+    # A request still holding the previous view finishes on it
+    assert old_view.size == 20 and "21" not in old_view.id_to_row
+    assert [emp["Employee_ID"] for emp in published[0]][-1] == "21" and len(published[0]) == 21
+
+    _, deleted = reader.delete(["5", "77"])
+    assert deleted == ["5"]
+    assert writer.find("5") is None and writer.view.size == 20 and writer.switches == 2
+
+
+def test_unchanged_profiles_keep_their_embeddings(open_store, encoder, make_employee):
+    store = open_store()
+    before = store.view.embeddings.vectors([store.view.id_to_row["4"]])
+
+    # Experience is not part of the profile text, so nothing needs encoding
+    view, _, encoded = store.upsert([make_employee(4, title="Engineer 4", years=15)], encoder)
+    assert encoded == 0 and encoder.calls == []
+    assert store.find("4")["experience_years"] == 15
+    np.testing.assert_array_equal(view.embeddings.vectors([view.id_to_row["4"]]), before)
+
+    _, _, encoded = store.upsert([make_employee(4, title="Staff Engineer")], encoder)
+    assert encoded == 1
+
+
+def test_a_directory_without_a_matching_snapshot_is_refused(open_store, tmp_path):
+    with pytest.raises(RuntimeError, match="No embedding snapshot"):
+        SharedSnapshotStore(str(tmp_path / "empty"), MODEL, "int8", False, lambda: create_index("exact"))
+    with pytest.raises(RuntimeError, match="expected model-b"):
+        open_store(model_id="model-b")
@@ -0,0 +1,95 @@
+import pytest
+
+from app.agents.talent_matcher.shortlists import RoleShortlists
+
+ROLES = {"Data Engineer": "Data Engineer\nBuild pipelines", "ML Engineer": "ML Engineer\n3+ years of experience"}
+
+
+@pytest.fixture
+def employee(make_employee):
+    return lambda emp_id, years=5: make_employee(emp_id, title=f"Engineer {emp_id}", skills=["Python"], years=years)
+
+
+@pytest.fixture
+def shortlists(make_matcher, employee):
+    lists = RoleShortlists(make_matcher([employee(i) for i in range(1, 31)]), ROLES, depth=3, buffer=3)
+    # Refreshes are driven by the tests
+    lists.close()
+    lists._thread.join()
+    return lists
+
+
+def ranked_ids(shortlists, role):
+    """The role's list ranked from scratch against the current view."""
+    shortlist = shortlists._lists[role]
+    return [emp_id for _, emp_id, _ in shortlists._rank(shortlist, shortlists.service.store.view).entries]
+
+
+def listed_ids(shortlists, role):
+    return [emp_id for _, emp_id, _ in shortlists._lists[role].entries]
+
+
+def test_startup_lists_are_the_top_of_the_directory(shortlists):
+    assert shortlists.roles == list(ROLES)
+    # Role filters come from the template text
+    assert shortlists._lists["ML Engineer"].filters.min_experience == 3
+    for role in ROLES:
+        results, staleness = shortlists.get(role, 3)
+        assert [result["employee_id"] for result in results] == ranked_ids(shortlists, role)[:3]
+        assert not staleness["stale"]
+
+
+def test_notified_changes_are_merged_incrementally(shortlists, employee):
+    store = shortlists.service.store
+    top = listed_ids(shortlists, "Data Engineer")
+    view, _ = store.delete([top[0]])
+    shortlists.notify(view, [top[0]])
+    view, ids, _ = store.upsert([employee(i, years=8) for i in range(31, 41)], shortlists.service.encoder)
+    shortlists.notify(view, ids)
+    assert shortlists.get("Data Engineer", 3)[1]["pending_updates"] == 2
+
+    shortlists.refresh()
+    assert (shortlists.incremental_updates, shortlists.full_builds) == (1, 0)
+    for role in ROLES:
+        merged = listed_ids(shortlists, role)
+        assert top[0] not in merged
+        # Entries above the floor are the true top of the directory
+        assert merged[:shortlists.depth] == ranked_ids(shortlists, role)[:shortlists.depth]
+    assert not shortlists.get("Data Engineer", 3)[1]["stale"]
+
+
+def test_demoted_employees_leave_the_list(shortlists, employee):
+    store = shortlists.service.store
+    emp_id = listed_ids(shortlists, "ML Engineer")[0]
+    # Below the role's 3-year minimum
+    view, ids, _ = store.upsert([employee(emp_id, years=1)], shortlists.service.encoder)
+    shortlists.notify(view, ids)
+    shortlists.refresh()
+    assert emp_id not in listed_ids(shortlists, "ML Engineer")
+    assert listed_ids(shortlists, "ML Engineer")[:3] == ranked_ids(shortlists, "ML Engineer")[:3]
+
+
+def test_role_is_re_ranked_when_too_few_trusted_entries_remain(shortlists):
+    store = shortlists.service.store
+    deleted = listed_ids(shortlists, "Data Engineer")[:5]
+    view, _ = store.delete(deleted)
+    shortlists.notify(view, deleted)
+    shortlists.refresh()
+    assert shortlists.role_reranks >= 1
+    assert listed_ids(shortlists, "Data Engineer") == ranked_ids(shortlists, "Data Engineer")
+
+
+def test_unnotified_changes_trigger_a_full_rebuild(shortlists, employee):
+    store = shortlists.service.store
+    store.upsert([employee(i) for i in range(31, 36)], shortlists.service.encoder)
+    assert shortlists.get("Data Engineer", 3)[1]["stale"]
+
+    shortlists.refresh()
+    assert (shortlists.incremental_updates, shortlists.full_builds) == (0, 1)
+    for role in ROLES:
+        assert listed_ids(shortlists, role) == ranked_ids(shortlists, role)
+
+
+def test_unknown_role(shortlists):
+    with pytest.raises(KeyError):
+        shortlists.get("Astronaut", 3)
@@ -0,0 +1,97 @@
+import json
+import os
+
+import numpy as np
+import pytest
+
+from app.agents.talent_matcher.loader import build_profile_text
+from app.agents.talent_matcher.snapshot import (
+    EmbeddingSnapshot, data_digest, load_or_build_embeddings, load_snapshot_employees,
+)
+
+
+@pytest.fixture
+def build(tmp_path, encoder):
+    """build(employees, model="model-a", precision="float32"): one startup against the snapshot in tmp_path."""
+    directory = str(tmp_path / "snapshot")
+    data_path = tmp_path / "employees.jsonl"
+
+    def run(employees, model="model-a", precision="float32"):
+        data_path.write_text("".join(json.dumps(emp) + "\n" for emp in employees), encoding="utf-8")
+        digest = data_digest(str(data_path))
+        texts = [build_profile_text(emp) for emp in employees]
+        embeddings = load_or_build_embeddings(directory, model, employees, texts, encoder, precision, digest)
+        return embeddings, EmbeddingSnapshot.load(directory), digest
+
+    run.directory = directory
+    return run
+
+
+def test_unchanged_data_is_mapped_from_the_snapshot(build, encoder, make_employee):
+    employees = [make_employee(i) for i in range(1, 6)]
+    first, snapshot, digest = build(employees)
+    assert encoder.encoded == 5
+
+    again, reopened, _ = build(employees)
+    assert encoder.encoded == 5
+    assert isinstance(again, np.memmap)
+    assert reopened.generation == snapshot.generation
+    np.testing.assert_array_equal(again, first)
+    # The records come back from the columns, IDs included
+    assert load_snapshot_employees(build.directory, digest) == employees
+
+
+def test_metadata_changes_keep_the_embedding_files(build, encoder, make_employee):
+    employees = [make_employee(i) for i in range(1, 6)]
+    _, before, _ = build(employees)
+    employees[2]["experience_years"] = 12
+    employees[4]["name"] = "Renamed"
+
+    embeddings, after, digest = build(employees)
+    assert encoder.encoded == 5
+    assert after.generation != before.generation
+    assert after.manifest["files"]["embeddings"] == before.manifest["files"]["embeddings"]
+    assert isinstance(embeddings, np.memmap)
+    assert load_snapshot_employees(build.directory, digest)[2]["experience_years"] == 12
+    # The superseded generation's columns are gone, the shared embeddings file is not
+    files = set(os.listdir(build.directory))
+    assert before.manifest["files"]["columns"]["name"] not in files
+    assert after.manifest["files"]["embeddings"] in files
+
+
+def test_only_new_or_changed_profiles_are_encoded(build, encoder, make_employee):
+    employees = [make_employee(i) for i in range(1, 6)]
+    first, _, _ = build(employees)
+    employees[1] = make_employee(2, title="Rust Engineer", skills=["Rust"])
+    employees.append(make_employee(6, title="ML Engineer"))
+
+    embeddings, _, _ = build(employees)
+    assert encoder.calls[-1] == [build_profile_text(employees[1]), build_profile_text(employees[5])]
+    np.testing.assert_array_equal(embeddings[[0, 2, 3, 4]], first[[0, 2, 3, 4]])
+    np.testing.assert_allclose(embeddings[1], encoder.vector(build_profile_text(employees[1])), rtol=1e-6)
+
+
+def test_another_model_re_encodes_everything(build, encoder, make_employee):
+    employees = [make_employee(i) for i in range(1, 4)]
+    build(employees)
+    build(employees, model="model-b")
+    assert encoder.encoded == 6
+
+
+def test_quantized_snapshot_keeps_codes(build, make_employee):
+    _, snapshot, _ = build([make_employee(i) for i in range(1, 4)], precision="int8")
+    matrix = snapshot.matrix()
+    assert matrix.precision == "int8" and len(matrix) == 3
+
+
+def test_records_the_columns_cannot_hold_are_read_from_the_data_file(build, make_employee):
+    employees = [make_employee(i) for i in range(1, 4)]
+    employees[0]["email"] = "one@example.com"
+    _, _, digest = build(employees)
+    assert load_snapshot_employees(build.directory, digest) is None
+
+
+def test_snapshot_of_other_data_is_not_used(build, make_employee):
+    build([make_employee(i) for i in range(1, 4)])
+    assert load_snapshot_employees(build.directory, "another digest") is None
+    assert load_snapshot_employees("", "another digest") is None
@@ -0,0 +1,107 @@
+import numpy as np
+import pytest
+
+from app.agents.talent_matcher.index import top_k
+from app.agents.talent_matcher.sparse import (
+    BM25Index, document_terms, fuse, hybrid_candidates, prune_mask, query_terms, sparse_tokens,
+)
+
+DEPTH = 5
+
+EMPLOYEES = [
+    {"title": "Accountant", "skills": ["SAP FICA", "Excel"], "Key_Credentials": "CPA"},
+    {"title": "Data Analyst", "skills": ["SQL", "Excel"], "Key_Credentials": "BSc Statistics"},
+    {"title": "Data Engineer", "skills": ["SQL", "Python", "Spark"], "Key_Credentials": "BSc Computer Science"},
+    {"title": "Backend Developer", "skills": ["C++", "Node.js"], "Key_Credentials": "BSc Computer Science"},
+    {"title": "SAP Consultant", "skills": ["SAP"], "Key_Credentials": "MBA"},
+]
+
+
+@pytest.fixture
+def bm25():
+    return BM25Index({}, np.empty(0, dtype=np.float32)).extended(EMPLOYEES)
+
+
+@pytest.fixture
+def pool():
+    """Dense and BM25 scores for a filtered pool of 200 rows, a third of them without any keyword match."""
+    rng = np.random.default_rng(7)
+    dense = rng.uniform(-0.2, 0.9, 200).astype(np.float32)
+    sparse = np.where(rng.uniform(size=200) < 0.33, 0.0, rng.gamma(2.0, 3.0, 200)).astype(np.float32)
+    mask = np.ones(200, dtype=bool)
+    # What match_many fuses: the dense top rows from the index, plus the best keyword matches
+    candidates = hybrid_candidates(top_k(dense, DEPTH), sparse, mask, DEPTH)
+    return dense, sparse, candidates
+
+
+def test_tokens_keep_language_and_framework_names_intact():
+    assert sparse_tokens("C++, C# and Node.js; CI-CD!") == ["c++", "c#", "and", "node.js", "ci-cd"]
+
+
+def test_multi_word_skills_are_indexed_and_queried_as_phrases():
+    assert "sap fica" in document_terms(EMPLOYEES[0])
+    assert "sap" in document_terms(EMPLOYEES[0]) and "sql" not in document_terms(EMPLOYEES[0])
+    terms = query_terms("Experience with SAP FICA required")
+    assert {"sap", "sap fica", "sap fica required"} <= set(terms)
+    assert "experience required" not in terms
+
+
+def test_rare_terms_outweigh_common_ones(bm25):
+    scores = bm25.scores(query_terms("Spark and SQL"))
+    # Spark is on one profile, SQL on two; rows without either score nothing
+    assert np.argmax(scores) == 2
+    assert scores[1] > 0 and scores[[0, 3, 4]].tolist() == [0, 0, 0]
+    assert bm25.scores(["cobol"]).tolist() == [0] * 5
+
+
+def test_a_phrase_match_ranks_above_a_single_word_match(bm25):
+    scores = bm25.scores(query_terms("SAP FICA"))
+    assert scores[0] > scores[4] > 0
+    assert bm25.matching_terms(query_terms("SAP FICA"), 0) == ["fica", "sap fica", "sap"]
+
+
+def test_extended_and_taken_indexes_score_like_one_built_from_scratch(bm25):
+    start = BM25Index({}, np.empty(0, dtype=np.float32))
+    grown = start.extended(EMPLOYEES[:2]).extended(EMPLOYEES[2:])
+    terms = query_terms("SQL Excel Python")
+    np.testing.assert_allclose(grown.scores(terms), bm25.scores(terms))
+
+    kept = bm25.take(np.array([1, 2, 4]))
+    rebuilt = start.extended([EMPLOYEES[1], EMPLOYEES[2], EMPLOYEES[4]])
+    np.testing.assert_allclose(kept.scores(terms), rebuilt.scores(terms))
+    assert len(bm25) == 5
+
+
+def test_prune_mask_keeps_the_best_keyword_matches():
+    scores = np.array([0.0, 3.0, 1.0, 2.0, 5.0], dtype=np.float32)
+    mask = np.array([True, True, True, True, False])
+    assert np.flatnonzero(prune_mask(scores, mask, 2)).tolist() == [1, 3]
+    # Without any keyword match among the allowed rows, dense scoring sees all of them
+    assert prune_mask(np.zeros(5, dtype=np.float32), mask, 2) is mask
+
+
+def test_hybrid_candidates_add_the_best_allowed_keyword_matches():
+    sparse = np.array([0.0, 3.0, 1.0, 2.0, 5.0], dtype=np.float32)
+    mask = np.array([True, True, True, True, False])
+    assert hybrid_candidates(np.array([0, 2]), sparse, mask, 2).tolist() == [0, 1, 2, 3]
+
+
+def test_unknown_fusion_method():
+    with pytest.raises(ValueError):
+        fuse(np.ones(2), np.ones(2), "max")
+
+
+def test_weighted_fusion_scores_a_candidate_alike_in_the_union_and_the_whole_pool(pool):
+    dense, sparse, candidates = pool
+    in_union = fuse(dense[candidates], sparse[candidates], "weighted", 0.3)
+    in_pool = fuse(dense, sparse, "weighted", 0.3)[candidates]
+    np.testing.assert_allclose(in_union, in_pool, rtol=1e-6)
+
+
+def test_rrf_scores_depend_on_the_fused_set(pool):
+    dense, sparse, candidates = pool
+    assert len(candidates) < len(dense)
+    in_union = fuse(dense[candidates], sparse[candidates], "rrf", rrf_k=60)
+    in_pool = fuse(dense, sparse, "rrf", rrf_k=60)[candidates]
+    # Ranks within a smaller set are better, so match_many's RRF scores are higher than rank()'s
+    assert np.all(in_union >= in_pool) and not np.allclose(in_union, in_pool)
@@ -0,0 +1,75 @@
+import pytest
+
+from app.agents.talent_matcher import store as store_module
+from app.agents.talent_matcher.loader import build_profile_text
+
+
+@pytest.fixture
+def store(make_matcher, make_employee):
+    return make_matcher([make_employee(i) for i in range(1, 6)]).store
+
+
+def test_upsert_publishes_a_new_view_and_leaves_the_old_one_intact(store, encoder, make_employee):
+    before = store.view
+    view, ids, encoded = store.upsert([make_employee(None, title="Rust Engineer", skills=["Rust"])], encoder)
+
+    assert ids == ["6"] and encoded == 1
+    assert view is store.view and view.version == before.version + 1
+    assert view.size == 6 and "6" in view.id_to_row
+    # Readers holding the previous view keep a consistent table
+    assert before.size == 5 and "6" not in before.id_to_row
+    assert len(before.index) == len(before.employees) == 5
+
+
+def test_update_only_re_encodes_changed_profiles(store, encoder, make_employee):
+    _, ids, encoded = store.upsert([make_employee(2, years=9)], encoder)
+    assert ids == ["2"] and encoded == 0 and encoder.calls == []
+
+    view, _, encoded = store.upsert([make_employee(3, title="ML Engineer", skills=["Python"])], encoder)
+    assert encoded == 1
+    assert store.find("3")["title"] == "ML Engineer"
+    assert store.find("2")["experience_years"] == 9
+    # The replaced rows are tombstoned, not removed
+    assert view.size == 5 and len(view.employees) == 7
+    assert view.alive.sum() == 5
+
+
+def test_search_sees_updates(store, encoder, make_employee):
+    record = make_employee(None, title="Rust Engineer", skills=["Rust"])
+    view, _, _ = store.upsert([record], encoder)
+    rows, _ = view.index.search(encoder.vector(build_profile_text(record)), 1, mask=view.alive)
+    assert view.employees[rows[0]]["Employee_ID"] == "6"
+
+
+def test_delete_tombstones_rows(store, encoder, make_employee):
+    before = store.view
+    view, deleted = store.delete(["2", "404"])
+
+    assert deleted == ["2"]
+    assert view.version == before.version + 1
+    assert store.find("2") is None and view.size == 4
+    rows, _ = view.index.search(encoder.vector(build_profile_text(make_employee(2))), 5, mask=view.alive)
+    assert "2" not in {view.employees[row]["Employee_ID"] for row in rows}
+    # Nothing to delete: no new version
+    assert store.delete(["404"])[0].version == view.version
+
+
+def test_compaction_drops_tombstones_and_keeps_the_version(store, monkeypatch, encoder, make_employee):
+    monkeypatch.setattr(store_module, "MIN_COMPACTION_ROWS", 3)
+    store.upsert([make_employee(i, years=i + 10) for i in range(1, 3)], encoder)
+    assert len(store.view.employees) == 7
+    view, _ = store.delete(["3", "4"])
+
+    # 7 rows, 4 of them dead: more than COMPACTION_RATIO, so the table was rebuilt
+    assert len(view.employees) == view.size == 3
+    assert view.alive.all()
+    assert view.version == 2
+    assert sorted(view.id_to_row) == ["1", "2", "5"]
+    assert store.find("1")["experience_years"] == 11
+    assert len(view.index) == len(view.columns) == 3
+
+
+def test_new_ids_continue_after_the_largest_numeric_id(store, encoder, make_employee):
+    store.upsert([make_employee("abc")], encoder)
+    _, ids, _ = store.upsert([make_employee(None), make_employee(None)], encoder)
+    assert ids == ["6", "7"]
@@ -0,0 +1,97 @@
+import threading
+import time
+
+import pytest
+
+from app.agents.talent_matcher.tenants import TenantRegistry, UnknownTenantError
+
+MB = 2 ** 20
+
+
+@pytest.fixture
+def make_registry(tmp_path, make_matcher):
+    """make_registry(tenants, memory_budget, build): a registry over tenant data dirs in tmp_path, and its build log."""
+    def make(tenants, memory_budget=10 * MB, build=None):
+        for tenant_id in tenants:
+            (tmp_path / tenant_id).mkdir()
+            (tmp_path / tenant_id / "employees.jsonl").write_text("", encoding="utf-8")
+        default = make_matcher(data_path="default")
+        builds = []
+
+        def default_build(data_path, snapshot_dir, shared):
+            assert shared is default
+            builds.append(data_path)
+            return make_matcher(data_path=data_path)
+
+        registry = TenantRegistry(lambda: default, build or default_build, str(tmp_path), "", memory_budget)
+        return registry, default, builds
+    return make
+
+
+def test_default_tenant_is_the_startup_service(make_registry):
+    registry, default, builds = make_registry([])
+    assert registry.get() is default
+    assert registry.get("default") is default
+    assert registry.is_loaded(None)
+    assert builds == []
+
+
+def test_tenants_are_built_once_and_reused(make_registry, tmp_path):
+    registry, _, builds = make_registry(["acme"])
+    assert not registry.is_loaded("acme")
+    service = registry.get("acme")
+    assert service.data_path == str(tmp_path / "acme" / "employees.jsonl")
+    assert registry.get("acme") is service
+    assert registry.is_loaded("acme")
+    assert (registry.loads, registry.hits, len(builds)) == (1, 1, 1)
+
+
+@pytest.mark.parametrize("tenant_id", ["missing", "../acme", "a" * 65])
+def test_unknown_or_invalid_tenant(make_registry, tenant_id):
+    registry, _, _ = make_registry(["acme"])
+    with pytest.raises(UnknownTenantError):
+        registry.get(tenant_id)
+    # A failed load is not cached
+    assert not registry.is_loaded(tenant_id)
+
+
+def test_least_recently_used_tenants_are_evicted_over_budget(make_registry):
+    registry, _, _ = make_registry(["a", "b", "c"], memory_budget=2 * MB)
+    registry.get("a")
+    registry.get("b")
+    registry.get("a")
+    registry.get("c")
+    assert [registry.is_loaded(tenant_id) for tenant_id in "abc"] == [True, False, True]
+    assert registry.evictions == 1
+    assert registry.stats()["memory_mb"] == 2
+
+
+def test_tenant_just_loaded_is_kept_even_over_budget(make_registry, make_matcher):
+    registry, _, _ = make_registry(
+        ["a", "big"], memory_budget=2 * MB,
+        build=lambda path, snapshot_dir, shared: make_matcher(data_path=path, size=5 * MB if "big" in path else MB),
+    )
+    registry.get("a")
+    big = registry.get("big")
+    assert registry.is_loaded("big") and not registry.is_loaded("a")
+    assert registry.get("big") is big
+
+
+def test_concurrent_first_requests_share_one_build(make_registry, make_matcher):
+    calls = []
+
+    def slow_build(data_path, snapshot_dir, shared):
+        calls.append(data_path)
+        time.sleep(0.1)
+        return make_matcher(data_path=data_path)
+
+    registry, _, _ = make_registry(["acme"], build=slow_build)
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(registry.get("acme"))) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(calls) == 1
+    assert len(results) == 4 and all(service is results[0] for service in results)
+    assert registry.stats()["loads"] == 1
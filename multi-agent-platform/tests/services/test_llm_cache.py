@@ -0,0 +1,124 @@
+import asyncio
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+from app.services import llm_cache
+from app.services.llm_cache import (
+    BYPASS, CACHE_HEADER, MEMORY_HIT, MISS, MONGO_HIT, LLMResponseCache, bypass_requested, cache_key,
+    llm_cache_middleware, record_status,
+)
+
+
+def test_cache_key_covers_model_prompt_and_files():
+    key = cache_key("gemini", "Summarise", ["abc"])
+    assert key == cache_key("gemini", "Summarise", ["abc"])
+    assert len({key, cache_key("other", "Summarise", ["abc"]), cache_key("gemini", "Summarise", []),
+                cache_key("gemini", "Summarise", ["abd"])}) == 4
+    # Parts are delimited, so moving text between them changes the key
+    assert cache_key("ab", "c") != cache_key("a", "bc")
+
+
+def test_memory_tier():
+    cache = LLMResponseCache(max_entries=2, ttl_seconds=0)
+
+    async def run():
+        assert await cache.get("k") == (None, MISS)
+        await cache.put("k", "gemini", "response")
+        assert await cache.get("k") == ("response", MEMORY_HIT)
+
+    asyncio.run(run())
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["hit_rate"]) == (1, 1, 0.5)
+    assert not stats["mongo"]["enabled"]
+
+
+def test_disabled_cache_stores_nothing():
+    cache = LLMResponseCache(max_entries=0, ttl_seconds=0)
+    assert not cache.enabled
+    asyncio.run(cache.put("k", "gemini", "response"))
+    assert asyncio.run(cache.get("k")) == (None, MISS)
+
+
+class FakeCollection:
+    def __init__(self, fail=False):
+        self.documents = {}
+        self.fail = fail
+
+    async def create_index(self, field, expireAfterSeconds):
+        self.ttl_index = (field, expireAfterSeconds)
+
+    async def find_one(self, query):
+        if self.fail:
+            raise ConnectionError("MongoDB is down")
+        return self.documents.get(query["_id"])
+
+    async def replace_one(self, query, document, upsert):
+        if self.fail:
+            raise ConnectionError("MongoDB is down")
+        self.documents[query["_id"]] = document
+
+
+def mongo_cache(monkeypatch, collection, ttl=60):
+    monkeypatch.setattr(llm_cache.DatabaseService, "client", object())
+    monkeypatch.setattr(llm_cache.DatabaseService, "get_collection", lambda db_name, name: collection)
+    return LLMResponseCache(max_entries=10, ttl_seconds=ttl, mongo=True, db_name="d")
+
+
+def test_mongo_tier_is_shared_and_fills_memory(monkeypatch):
+    collection = FakeCollection()
+    writer, reader = mongo_cache(monkeypatch, collection), mongo_cache(monkeypatch, collection)
+
+    async def run():
+        await writer.put("k", "gemini", "response")
+        assert await reader.get("k") == ("response", MONGO_HIT)
+        assert await reader.get("k") == ("response", MEMORY_HIT)
+
+    asyncio.run(run())
+    assert collection.ttl_index == ("created_at", 60)
+    assert reader.stats()["mongo"]["hits"] == 1
+
+
+def test_expired_mongo_entries_are_misses(monkeypatch):
+    collection = FakeCollection()
+    collection.documents["k"] = {"_id": "k", "response": "old", "created_at": datetime.utcnow() - timedelta(minutes=5)}
+    cache = mongo_cache(monkeypatch, collection)
+    assert asyncio.run(cache.get("k")) == (None, MISS)
+    assert cache.stats()["mongo"]["misses"] == 1
+
+
+def test_mongo_failures_are_misses(monkeypatch):
+    cache = mongo_cache(monkeypatch, FakeCollection(fail=True))
+
+    async def run():
+        await cache.put("k", "gemini", "response")
+        cache.memory.clear()
+        return await cache.get("k")
+
+    assert asyncio.run(run()) == (None, MISS)
+    assert cache.stats()["mongo"]["errors"] == 2
+
+
+def test_middleware_honours_no_cache_and_reports_statuses():
+    seen = {}
+
+    async def call_next(request):
+        seen["bypass"] = bypass_requested()
+        record_status(BYPASS if seen["bypass"] else MISS)
+        record_status(MEMORY_HIT)
+        return SimpleNamespace(headers={})
+
+    def request(headers):
+        return SimpleNamespace(headers=headers)
+
+    response = asyncio.run(llm_cache_middleware(request({"cache-control": "No-Cache"}), call_next))
+    assert seen["bypass"]
+    assert response.headers[CACHE_HEADER] == "bypass, memory-hit"
+
+    response = asyncio.run(llm_cache_middleware(request({}), call_next))
+    assert not seen["bypass"]
+    assert response.headers[CACHE_HEADER] == "miss, memory-hit"
+
+
+def test_statuses_outside_a_request_are_ignored():
+    record_status(MISS)
+    assert not bypass_requested()
@@ -0,0 +1,122 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from app.services import llm_resilience
+from app.services.llm_resilience import (
+    CallDeadline, CallPolicy, CircuitBreaker, LatencyTracker, backoff_delay, is_rate_limited, is_retryable,
+)
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = SimpleNamespace(value=1000.0)
+    monkeypatch.setattr(llm_resilience, "time", SimpleNamespace(monotonic=lambda: now.value))
+    return now
+
+
+class ResourceExhausted(Exception):
+    pass
+
+
+@pytest.mark.parametrize("error, retryable, rate_limited", [
+    (asyncio.TimeoutError(), True, False),
+    (ConnectionError(), True, False),
+    (SimpleNamespace(code=503), True, False),
+    (SimpleNamespace(code=429), True, True),
+    (ResourceExhausted(), True, True),
+    (SimpleNamespace(code=400), False, False),
+    (ValueError("bad prompt"), False, False),
+])
+def test_error_classification(error, retryable, rate_limited):
+    assert is_retryable(error) == retryable
+    assert is_rate_limited(error) == rate_limited
+
+
+def test_backoff_delay_is_jittered_and_capped():
+    delays = [backoff_delay(attempt, 0.5, 3.0) for attempt in range(6) for _ in range(50)]
+    assert all(0 <= delay <= 3.0 for delay in delays)
+    assert all(0 <= backoff_delay(1, 0.5, 3.0) <= 1.0 for _ in range(50))
+    assert len(set(delays)) > 1
+
+
+def test_call_policy_overrides():
+    policy = CallPolicy(60.0, 2)
+    assert policy.overridden({"timeout": 120}).to_dict() == {"timeout": 120.0, "retries": 2}
+    assert policy.overridden({}).to_dict() == policy.to_dict()
+    with pytest.raises(ValueError, match="retry"):
+        policy.overridden({"retry": 3})
+
+
+def test_call_deadline_starts_on_admission(clock):
+    deadline = CallDeadline(5.0)
+    clock.value += 60
+    assert deadline.remaining() is None and not deadline.expired
+    deadline.start()
+    clock.value += 3
+    # A retry admitted later shares the running budget
+    deadline.start()
+    assert deadline.remaining() == 2.0
+    clock.value += 2
+    assert deadline.expired
+    unbounded = CallDeadline(0)
+    unbounded.start()
+    assert unbounded.remaining() is None and not unbounded.expired
+
+
+def test_breaker_opens_after_consecutive_failures(clock):
+    breaker = CircuitBreaker("model", threshold=3, reset_timeout=10)
+    breaker.record_failure()
+    breaker.record_failure()
+    breaker.record_success()
+    breaker.record_failure()
+    breaker.record_failure()
+    assert breaker.state == "closed" and breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == "open" and not breaker.allow()
+    assert breaker.stats()["opens"] == 1 and breaker.stats()["rejected"] == 1
+
+
+def test_half_open_breaker_lets_one_probe_through(clock):
+    breaker = CircuitBreaker("model", threshold=1, reset_timeout=10)
+    breaker.record_failure()
+    clock.value += 10
+    assert breaker.state == "half_open"
+    assert breaker.allow()
+    assert not breaker.allow()
+
+    # A failed probe opens the circuit again
+    breaker.record_failure()
+    assert breaker.state == "open" and breaker.opens == 2
+    clock.value += 10
+    assert breaker.allow()
+    breaker.record_success()
+    assert breaker.state == "closed" and breaker.allow()
+
+
+def test_abandoned_probe_frees_the_slot(clock):
+    breaker = CircuitBreaker("model", threshold=1, reset_timeout=10)
+    breaker.record_failure()
+    clock.value += 10
+    assert breaker.allow()
+    breaker.record_abandoned()
+    assert breaker.allow()
+
+
+def test_disabled_breaker_never_opens():
+    breaker = CircuitBreaker("model", threshold=0, reset_timeout=10)
+    for _ in range(10):
+        breaker.record_failure()
+    assert breaker.allow()
+
+
+def test_latency_percentile_needs_enough_samples():
+    tracker = LatencyTracker(samples=100)
+    for i in range(19):
+        tracker.record(i / 100)
+    assert tracker.percentile(0.95) is None
+    for i in range(19, 100):
+        tracker.record(i / 100)
+    assert tracker.percentile(0.95) == pytest.approx(0.94)
+    assert tracker.percentile(0.0) == 0.0
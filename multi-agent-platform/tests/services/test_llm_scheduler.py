@@ -0,0 +1,130 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from app.services import llm_scheduler
+from app.services.llm_scheduler import BACKGROUND, BULK, INTERACTIVE, LLMScheduler, TokenBucket, Ticket, is_overload
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """A fake time.monotonic for the scheduler module."""
+    now = SimpleNamespace(value=1000.0)
+    monkeypatch.setattr(llm_scheduler, "time", SimpleNamespace(monotonic=lambda: now.value))
+    return now
+
+
+def test_classes_are_served_in_priority_order_then_fifo():
+    async def run():
+        scheduler = LLMScheduler(max_concurrency=1)
+        first = await scheduler.acquire(INTERACTIVE, 10)
+        granted = []
+
+        async def call(priority, name):
+            ticket = await scheduler.acquire(priority, 10)
+            granted.append(name)
+            await asyncio.sleep(0)
+            scheduler.release(ticket)
+
+        tasks = [asyncio.ensure_future(call(priority, name)) for priority, name in [
+            (BACKGROUND, "background"), (BULK, "bulk 1"), (INTERACTIVE, "interactive 1"),
+            (BULK, "bulk 2"), (INTERACTIVE, "interactive 2"),
+        ]]
+        await asyncio.sleep(0)
+        assert scheduler.stats()["queue_depth"] == 5
+        scheduler.release(first)
+        await asyncio.gather(*tasks)
+        return granted, scheduler.stats()
+
+    granted, stats = asyncio.run(run())
+    assert granted == ["interactive 1", "interactive 2", "bulk 1", "bulk 2", "background"]
+    assert stats["in_flight"] == 0 and stats["queue_depth"] == 0
+    assert stats["classes"][INTERACTIVE]["dispatched"] == 3
+
+
+def test_unknown_priority():
+    with pytest.raises(ValueError):
+        asyncio.run(LLMScheduler().acquire("urgent", 1))
+
+
+def test_overloads_halve_the_cap_once_per_interval_and_successes_grow_it(clock):
+    scheduler = LLMScheduler(max_concurrency=8, min_concurrency=2, backoff_interval=1.0)
+
+    def finish(overloaded):
+        scheduler.in_flight += 1
+        ticket = Ticket(INTERACTIVE, 10)
+        ticket.overloaded = overloaded
+        scheduler.release(ticket)
+
+    finish(True)
+    assert scheduler.cap == 4
+    # Calls that were already in flight report the same overload
+    finish(True)
+    assert scheduler.cap == 4 and scheduler.overloads == 2
+    clock.value += 1.0
+    finish(True)
+    clock.value += 1.0
+    finish(True)
+    # Not below min_concurrency
+    assert scheduler.cap == 2 and scheduler.limit == 2.0
+
+    # Additive increase: about one slot per cap's worth of successes
+    for _ in range(3):
+        finish(False)
+    assert scheduler.cap == 3
+    for _ in range(50):
+        finish(False)
+    assert scheduler.cap == 8
+
+
+def test_is_overload():
+    assert is_overload(SimpleNamespace(code=429)) and is_overload(SimpleNamespace(code=503))
+    assert not is_overload(ValueError("bad request"))
+
+
+def test_token_bucket_delay(clock):
+    bucket = TokenBucket(60)
+    assert bucket.delay(60) == 0.0
+    bucket.take(60)
+    assert bucket.delay(1) == pytest.approx(1.0)
+    clock.value += 0.5
+    assert bucket.delay(1) == pytest.approx(0.5)
+    # Larger than the whole allowance: wait for a full bucket
+    assert bucket.delay(1000) == pytest.approx(59.5)
+    # Usage above the estimate drives the level negative
+    bucket.take(10)
+    assert bucket.available() == pytest.approx(-9.5)
+    assert TokenBucket(0).delay(10 ** 6) == 0.0
+
+
+def test_rate_limited_calls_wait_for_the_bucket():
+    async def run():
+        scheduler = LLMScheduler(rpm=60)
+        scheduler.rpm.level = 0.0
+        started = asyncio.get_running_loop().time()
+        ticket = await scheduler.acquire(INTERACTIVE, 1)
+        scheduler.release(ticket)
+        return asyncio.get_running_loop().time() - started
+
+    # One request per second
+    assert 0.9 <= asyncio.run(run()) < 2
+
+
+def test_cancelled_waiters_leave_the_queue():
+    async def run():
+        scheduler = LLMScheduler(max_concurrency=1)
+        first = await scheduler.acquire(INTERACTIVE, 1)
+        cancelled = asyncio.ensure_future(scheduler.acquire(INTERACTIVE, 1))
+        waiting = asyncio.ensure_future(scheduler.acquire(BULK, 1))
+        await asyncio.sleep(0)
+        cancelled.cancel()
+        await asyncio.sleep(0)
+        assert scheduler.queued[INTERACTIVE] == 0
+        scheduler.release(first)
+        ticket = await waiting
+        return scheduler, ticket
+
+    scheduler, ticket = asyncio.run(run())
+    assert ticket.priority == BULK
+    assert scheduler.in_flight == 1 and scheduler.dispatched[INTERACTIVE] == 1
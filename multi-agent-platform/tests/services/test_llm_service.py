@@ -0,0 +1,234 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+from fastapi import HTTPException
+
+pytest.importorskip("google.generativeai")
+
+from app.services.llm_service import LLMService  # noqa: E402
+
+
+def make_settings(**overrides):
+    values = dict(
+        GENAI_MODEL="test-model", GEMINI_API_KEY="", DATABASE_NAME="d",
+        LLM_CACHE_SIZE=16, LLM_CACHE_TTL=0, LLM_CACHE_MONGO=False, LLM_CACHE_COLLECTION="llm_cache",
+        LLM_CACHE_AGENTS=["criteria_agent"],
+        LLM_RPM_LIMIT=0, LLM_TPM_LIMIT=0, LLM_MAX_CONCURRENCY=8, LLM_MIN_CONCURRENCY=1, LLM_OUTPUT_TOKEN_ESTIMATE=100,
+        LLM_TIMEOUT=5.0, LLM_MAX_RETRIES=2, LLM_RETRY_BASE_DELAY=0.0, LLM_RETRY_MAX_DELAY=0.0,
+        LLM_AGENT_POLICIES={}, LLM_HEDGE=False, LLM_BREAKER_THRESHOLD=5, LLM_BREAKER_RESET=30.0,
+    )
+    values.update(overrides)
+    return SimpleNamespace(**values)
+
+
+class FakeModel:
+    """Answers "answer <n>" for the n-th call; `script` holds per-call errors or delays."""
+
+    def __init__(self, script=()):
+        self.script = list(script)
+        self.calls = 0
+
+    async def generate_content_async(self, contents, stream=False):
+        self.calls += 1
+        step = self.script.pop(0) if self.script else None
+        if isinstance(step, BaseException):
+            raise step
+        if step:
+            await asyncio.sleep(step)
+        return SimpleNamespace(text=f" answer {self.calls} ", usage_metadata=None)
+
+
+def make_service(model=None, **overrides):
+    service = LLMService(make_settings(**overrides))
+    service.model = model or FakeModel()
+    return service
+
+
+def test_cached_agents_reuse_responses():
+    service = make_service()
+
+    async def run():
+        first = await service.generate_text("Score this resume", agent="criteria_agent")
+        second = await service.generate_text("Score this resume", agent="criteria_agent")
+        return first, second
+
+    assert asyncio.run(run()) == ("answer 1", "answer 1")
+    assert service.model.calls == 1
+
+
+def test_agents_outside_llm_cache_agents_always_call_the_model():
+    service = make_service()
+
+    async def run():
+        return [await service.generate_text("Write a JD", agent="jd_agent") for _ in range(2)]
+
+    assert asyncio.run(run()) == ["answer 1", "answer 2"]
+    assert service.cache.stats()["memory"]["entries"] == 0
+
+
+def test_identical_calls_in_flight_share_one_model_call():
+    service = make_service(FakeModel(script=[0.05]))
+
+    async def run():
+        return await asyncio.gather(*(service.generate_text("Same prompt") for _ in range(5)))
+
+    assert asyncio.run(run()) == ["answer 1"] * 5
+    assert service.model.calls == 1
+    assert service.coalesced == 4
+    assert service._in_flight == {}
+
+
+def test_agents_outside_llm_cache_agents_are_coalesced_too():
+    service = make_service(FakeModel(script=[0.05, 0.05]))
+
+    async def run():
+        # A cached agent's identical call, made at the same time, does not share the uncached draft
+        drafts = await asyncio.gather(*(service.generate_text("Write a JD", agent="jd_agent") for _ in range(3)),
+                                      service.generate_text("Write a JD", agent="criteria_agent"))
+        calls = service.model.calls
+        # Once the call is over, asking again gives a new draft
+        return drafts[:3], calls, await service.generate_text("Write a JD", agent="jd_agent")
+
+    drafts, calls, later = asyncio.run(run())
+    assert len(set(drafts)) == 1 and service.coalesced == 2
+    assert calls == 2 and later == "answer 3"
+    assert service.cache.stats()["memory"]["entries"] == 1
+
+
+def test_errors_reach_every_coalesced_caller_and_are_not_cached():
+    service = make_service(FakeModel(script=[ValueError("bad prompt")]))
+
+    async def run():
+        results = await asyncio.gather(*(service.generate_text("Same prompt") for _ in range(3)),
+                                       return_exceptions=True)
+        return results, await service.generate_text("Same prompt")
+
+    results, retried = asyncio.run(run())
+    assert all(getattr(result, "status_code", None) == 502 for result in results)
+    assert retried == "answer 2"
+
+
+def test_a_cancelled_waiter_does_not_cancel_the_shared_call():
+    service = make_service(FakeModel(script=[0.05]))
+
+    async def run():
+        leader = asyncio.ensure_future(service.generate_text("Same prompt"))
+        follower = asyncio.ensure_future(service.generate_text("Same prompt"))
+        await asyncio.sleep(0.01)
+        leader.cancel()
+        return await follower
+
+    assert asyncio.run(run()) == "answer 1"
+    assert service.model.calls == 1
+
+
+def test_use_cache_false_makes_its_own_call():
+    service = make_service()
+
+    async def run():
+        await service.generate_text("Same prompt")
+        return await service.generate_text("Same prompt", use_cache=False)
+
+    assert asyncio.run(run()) == "answer 2"
+    assert service.cache.bypassed == 1
+
+
+
+class ServerError(Exception):
+    code = 503
+
+
+def test_transient_errors_are_retried():
+    service = make_service(FakeModel(script=[ConnectionError("reset"), ServerError()]))
+    assert asyncio.run(service.generate_text("Prompt")) == "answer 3"
+    assert service.retries == 2
+
+
+def test_retries_stop_at_the_agent_budget():
+    service = make_service(FakeModel(script=[ServerError()] * 3), LLM_AGENT_POLICIES={"criteria_agent": {"retries": 1}})
+    with pytest.raises(HTTPException) as raised:
+        asyncio.run(service.generate_text("Prompt", agent="criteria_agent"))
+    assert raised.value.status_code == 502
+    assert service.model.calls == 2
+
+
+def test_bad_requests_are_not_retried():
+    service = make_service(FakeModel(script=[ValueError("bad prompt")]))
+    with pytest.raises(HTTPException) as raised:
+        asyncio.run(service.generate_text("Prompt"))
+    assert raised.value.status_code == 502
+    assert service.model.calls == 1 and service.retries == 0
+
+
+def test_calls_are_bounded_by_the_timeout():
+    service = make_service(FakeModel(script=[1.0]), LLM_TIMEOUT=0.05)
+    with pytest.raises(HTTPException) as raised:
+        asyncio.run(service.generate_text("Prompt"))
+    assert raised.value.status_code == 504
+    assert service.timeouts == 1
+
+
+def test_time_queued_behind_the_scheduler_is_not_a_timeout():
+    service = make_service(FakeModel(script=[0.3, None]), LLM_MAX_CONCURRENCY=1, LLM_TIMEOUT=0.1,
+                           LLM_AGENT_POLICIES={"question_generator": {"timeout": 5}}, LLM_BREAKER_THRESHOLD=1)
+
+    async def run():
+        holder = asyncio.ensure_future(service.generate_text("Slow", agent="question_generator"))
+        await asyncio.sleep(0.01)
+        # Waits ~0.3s for the only slot, three times its timeout, then answers at once
+        queued = await service.generate_text("Quick")
+        return await holder, queued
+
+    assert asyncio.run(run()) == ("answer 1", "answer 2")
+    assert service.timeouts == 0
+    assert service.breaker.state == "closed" and service.breaker.failures == 0
+
+
+def test_a_call_cancelled_while_queued_is_not_a_failure():
+    service = make_service(FakeModel(script=[0.2]), LLM_MAX_CONCURRENCY=1, LLM_BREAKER_THRESHOLD=1)
+
+    async def run():
+        holder = asyncio.ensure_future(service.generate_text("Slow"))
+        await asyncio.sleep(0.01)
+        # The model call itself (generate_text would keep it going for coalesced callers)
+        queued = asyncio.ensure_future(service._call_model("Queued"))
+        await asyncio.sleep(0.01)
+        queued.cancel()
+        await asyncio.gather(queued, return_exceptions=True)
+        return await holder
+
+    assert asyncio.run(run()) == "answer 1"
+    assert service.model.calls == 1 and service.breaker.failures == 0
+
+
+def test_open_breaker_fails_fast():
+    service = make_service(FakeModel(script=[ServerError()] * 2), LLM_MAX_RETRIES=0, LLM_BREAKER_THRESHOLD=2)
+
+    async def run():
+        statuses = []
+        for prompt in ("a", "b", "c"):
+            try:
+                await service.generate_text(prompt)
+            except HTTPException as e:
+                statuses.append(e.status_code)
+        return statuses
+
+    assert asyncio.run(run()) == [502, 502, 503]
+    assert service.model.calls == 2
+    assert service.breaker.state == "open"
+
+
+def test_slow_calls_are_hedged_and_the_first_answer_wins():
+    service = make_service(FakeModel(script=[1.0, None]), LLM_HEDGE=True)
+    for _ in range(20):
+        service.latency.record(0.01)
+    assert asyncio.run(asyncio.wait_for(service.generate_text("Prompt"), 0.5)) == "answer 2"
+    assert (service.hedges, service.hedge_wins) == (1, 1)
+    assert service.scheduler.in_flight == 0
+
+
+def test_no_hedging_without_latency_history():
+    service = make_service(FakeModel(script=[0.05]), LLM_HEDGE=True)
+    assert asyncio.run(service.generate_text("Prompt")) == "answer 1"
+    assert service.hedges == 0
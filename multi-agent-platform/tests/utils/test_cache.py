@@ -0,0 +1,60 @@
+import pytest
+
+from app.utils import cache as cache_module
+from app.utils.cache import LRUCache
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """A settable stand-in for time.monotonic."""
+    now = [1000.0]
+    monkeypatch.setattr(cache_module.time, "monotonic", lambda: now[0])
+    return now
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = LRUCache(2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    assert cache.get("a") == 1
+    cache.put("c", 3)
+
+    assert cache.get("b") is None
+    assert (cache.get("a"), cache.get("c")) == (1, 3)
+    assert cache.stats()["evictions"] == 1
+
+
+def test_entries_expire_after_the_ttl(clock):
+    cache = LRUCache(10, ttl_seconds=60)
+    cache.put("jd", [0.1])
+    clock[0] += 60
+    assert cache.get("jd") == [0.1]
+    clock[0] += 1
+    assert cache.get("jd") is None
+    assert len(cache) == 0 and cache.stats()["expirations"] == 1
+
+
+def test_ttl_zero_never_expires(clock):
+    cache = LRUCache(10)
+    cache.put("jd", "vector")
+    clock[0] += 10 ** 9
+    assert cache.get("jd") == "vector"
+
+
+def test_a_cache_without_room_stores_nothing():
+    cache = LRUCache(0)
+    cache.put("jd", "vector")
+    assert not cache.enabled and cache.get("jd") is None and len(cache) == 0
+
+
+def test_clear_counts_invalidations_and_stats_add_up():
+    cache = LRUCache(10)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    cache.get("a")
+    cache.get("missing")
+    cache.clear()
+
+    stats = cache.stats()
+    assert (stats["entries"], stats["hits"], stats["misses"], stats["invalidations"]) == (0, 1, 1, 2)
+    assert stats["hit_rate"] == 0.5
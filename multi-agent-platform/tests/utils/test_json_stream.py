@@ -0,0 +1,56 @@
+import json
+
+import pytest
+
+from app.utils.json_stream import JSONFieldStream
+
+DOCUMENT = {
+    "title": "Data Engineer",
+    "overview": "Builds {pipelines}, \"reliably\", [at scale]\nwith a \\ backslash",
+    "skills": ["Python", {"name": "SQL", "level": 3}],
+    "remote": True,
+    "salary": None,
+}
+
+
+def feed_all(text, size):
+    stream = JSONFieldStream()
+    completed = []
+    for start in range(0, len(text), size):
+        completed.extend(stream.feed(text[start:start + size]))
+    return stream, completed
+
+
+@pytest.mark.parametrize("size", [1, 2, 7, 1000])
+def test_members_are_emitted_in_order_whatever_the_chunking(size):
+    stream, completed = feed_all("```json\n" + json.dumps(DOCUMENT, indent=2) + "\n```", size)
+    assert completed == list(DOCUMENT.items())
+    assert stream.fields == DOCUMENT
+    assert stream.done
+
+
+def test_a_member_is_emitted_as_soon_as_it_is_complete():
+    stream = JSONFieldStream()
+    assert stream.feed('{"title": "Data ') == []
+    assert stream.feed('Engineer", "overview": "Bui') == [("title", "Data Engineer")]
+    assert not stream.done
+    assert stream.feed('lds"}') == [("overview", "Builds")]
+    assert stream.done
+
+
+def test_text_after_the_object_is_ignored():
+    stream = JSONFieldStream()
+    assert stream.feed('{"a": 1} {"b": 2}') == [("a", 1)]
+    assert stream.feed('{"c": 3}') == []
+    assert stream.fields == {"a": 1}
+
+
+def test_empty_object():
+    stream = JSONFieldStream()
+    assert stream.feed("{ }") == []
+    assert stream.done
+
+
+def test_malformed_member_raises():
+    with pytest.raises(ValueError):
+        JSONFieldStream().feed('{"a": nope, "b": 1}')
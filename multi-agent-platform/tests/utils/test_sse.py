@@ -0,0 +1,16 @@
+import json
+
+from app.utils.sse import SSE_HEADERS, sse_event
+
+
+def test_event_framing():
+    frame = sse_event("field", {"name": "overview", "value": "line one\nline two"})
+    assert frame.endswith("\n\n")
+    lines = frame[:-2].split("\n")
+    # Newlines in the payload are escaped by JSON, so the data stays on one line
+    assert lines == ["event: field", 'data: {"name": "overview", "value": "line one\\nline two"}']
+    assert json.loads(lines[1][len("data: "):])["value"] == "line one\nline two"
+
+
+def test_streams_are_not_cached_or_buffered():
+    assert SSE_HEADERS == {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}